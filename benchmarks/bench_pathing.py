@@ -0,0 +1,64 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This benchmark measures the per-tick cost of the Minotaur's FlowField on
+             large grids. While the Player stands still, a tick only reads the next
+             step from the field, so its cost must stay flat no matter how big the
+             maze is. When the Player changes tile, the whole field is recomputed.
+
+             Run it from the root of the repository:
+                 python -m benchmarks.bench_pathing [size ...]
+"""
+
+import random, sys, time
+import src.labyrinthMaze, src.labyrinthPathing
+
+def make_grid(size, wall_chance=0.25, seed=0):
+    """This function returns a size x size MazeGrid surrounded by walls, with random
+    walls inside it. The spawn tile (1, 1) is always free."""
+    rng = random.Random(seed)
+    maze_arrangement = src.labyrinthMaze.MazeGrid(size, size)
+    for x in range(size):
+        for y in range(size):
+            if x in (0, size - 1) or y in (0, size - 1):
+                maze_arrangement.set_flag(x, y, src.labyrinthMaze.WALL)
+            elif rng.random() < wall_chance:
+                maze_arrangement.set_flag(x, y, src.labyrinthMaze.WALL)
+    maze_arrangement.clear_flag(1, 1, src.labyrinthMaze.WALL)
+    return maze_arrangement
+
+def time_ticks(flow_field, targets, start):
+    """This function calls set_target() and next_step() once per target, the way the
+    Minotaur does every tick, and returns the average time per tick in microseconds."""
+    x, y = start
+    begin = time.perf_counter()
+    for target_x, target_y in targets:
+        flow_field.set_target(target_x, target_y)
+        flow_field.next_step(x, y)
+    return (time.perf_counter() - begin) / len(targets) * 1000000
+
+def bench(size, ticks=1000):
+    """This function returns the per-tick cost on a size x size grid, both while the
+    Player stands still and while they change tile on every tick."""
+    maze_arrangement = make_grid(size)
+    flow_field = src.labyrinthPathing.FlowField(maze_arrangement)
+    start = (size - 2, size - 2)
+
+    # The first call builds the field, which every later tick then reuses
+    flow_field.set_target(1, 1)
+    still = time_ticks(flow_field, [(1, 1)] * ticks, start)
+
+    # Alternating between two tiles forces a recompute on every tick
+    moving_ticks = max(2, ticks // 100)
+    moving = time_ticks(flow_field, [(1, 1), (1, 2)] * (moving_ticks // 2), start)
+    return still, moving
+
+def main(sizes):
+    print("%10s %18s %18s" % ("grid", "still (us/tick)", "moving (us/tick)"))
+    for size in sizes:
+        still, moving = bench(size)
+        print("%10s %18.2f %18.2f" % ("%dx%d" % (size, size), still, moving))
+
+if __name__ == "__main__":
+    main([int(size) for size in sys.argv[1:]] or [16, 64, 256, 512])
@@ -0,0 +1,474 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This is the reproducible benchmark suite of the "Minotaur Labyrinth" game.
+             It times the hot paths of the game - drawing the maze, hiding the gear
+             pieces, building the sprites, the Minotaur following the Player, the
+             proximity of the growl and a full rendered frame of game() - and a few
+             stress scenarios: a large maze, many gear pieces and many monsters.
+
+             It runs without a window or a sound card, under SDL's dummy video and
+             audio drivers, and every random choice is seeded. The results are saved
+             as JSON, and the compare command flags every benchmark whose median time
+             grew by more than a threshold since a stored baseline.
+
+             Run it from the root of the repository:
+                 python -m benchmarks.suite run [--quick] [--filter text] [--output file]
+                 python -m benchmarks.suite compare baseline.json [results.json] [--threshold 0.1]
+
+             To store a baseline, run the suite with --output benchmarks/baseline.json.
+"""
+
+import os
+
+# The dummy drivers must be chosen before Pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse, csv, glob, json, platform, random, statistics, sys, tempfile, time
+import pygame
+import src.Minotaur_Labyrinth, src.labyrinthSprites, src.labyrinthSim, src.labyrinthMaze, \
+       src.labyrinthPathing, src.labyrinthAudio, src.labyrinthReplay, src.labyrinthLeaderboard, \
+       src.labyrinthAtlas
+
+# The file the results are written to, and the relative slowdown of the median time
+# flagged as a regression, when none is given on the command line
+DEFAULT_OUTPUT = "benchmark_results.json"
+DEFAULT_THRESHOLD = 0.10
+
+# The seed of every random choice made by the benchmarks
+SEED = 0
+
+# The size of the window, the size of the large maze and the number of gear pieces and
+# monsters in the stress scenarios
+SCREEN_SIZE = (800, 800)
+LARGE_MAZE_SIZE = 256
+MANY_GEAR_PIECES = 1000
+MANY_MONSTERS = 100
+
+# The sizes of the hordes timed in the large maze
+HORDE_SIZES = (10, 100, 1000)
+
+# The number of seconds game() is played for each rendered frame benchmark, and the
+# seed of those games. With this seed the flashlight first flickers off after more than
+# 5 seconds, so every timed frame draws the lit circle rather than a black screen
+FRAME_SECONDS = 3.0
+FRAME_SEED = 2
+
+# The number of ticks of the replay played back headless: 2 minutes of game time
+REPLAY_TICKS = 3600
+
+# The number of scores in the leaderboard whose top is read
+LEADERBOARD_SCORES = 10000
+
+def time_calls(function, number, repeat):
+    """This function calls function number times in a row, repeat times over, and
+    returns the time of a single call in milliseconds for each repetition. It is
+    called once beforehand, so the assets it loads are already cached."""
+    function()
+    times = []
+    for repetition in range(repeat):
+        begin = time.perf_counter()
+        for call in range(number):
+            function()
+        times.append((time.perf_counter() - begin) / number * 1000)
+    return times
+
+def summarize(times, **extra):
+    """This function returns the dictionary saved for one benchmark: the median,
+    minimum, mean and maximum of its times in milliseconds, their number, and any
+    extra values given as keyword arguments."""
+    result = {"median_ms": statistics.median(times), "min_ms": min(times),
+              "mean_ms": statistics.fmean(times), "max_ms": max(times), "samples": len(times)}
+    result.update(extra)
+    return result
+
+def bench_generate_maze(screen, quick):
+    """This function times generate_maze() on the original maze, together with the
+    first draw of the whole view, since the wall layer only draws its chunks once the
+    camera reaches them."""
+    background = pygame.Surface(SCREEN_SIZE)
+    layout = src.labyrinthMaze.default_layout()
+    maze_arrangement = layout.new_maze_arrangement()
+    def run():
+        wall_layer = src.Minotaur_Labyrinth.generate_maze(maze_arrangement, background)
+        wall_layer.draw(screen)
+    return summarize(time_calls(run, 5, 5 if quick else 20))
+
+def bench_hide_gear_pieces(screen, quick):
+    """This function times hiding the four gear pieces of a game, both in the
+    simulation and as sprites."""
+    layout = src.labyrinthMaze.default_layout()
+    maze_arrangement = layout.new_maze_arrangement()
+    rng = random.Random(SEED)
+    def run():
+        gear_pieces = src.labyrinthSim.hide_gear_pieces(maze_arrangement.copy(), layout, rng)
+        src.Minotaur_Labyrinth.hide_gear_pieces(pygame.sprite.Group(), gear_pieces)
+    return summarize(time_calls(run, 100, 5 if quick else 20))
+
+def bench_sprites(screen, quick):
+    """This function returns the times of building each of the Player and Minotaur
+    sprites."""
+    sim = src.labyrinthSim.LabyrinthSim(SEED)
+    repeat = 5 if quick else 20
+    return {"player": summarize(time_calls(lambda: src.labyrinthSprites.Player(screen, sim.get_player()), 50, repeat)),
+            "minotaur": summarize(time_calls(lambda: src.labyrinthSprites.Minotaur(screen, sim.get_minotaur()), 50, repeat))}
+
+def bench_follow_player(layout, quick):
+    """This function times the Minotaur following the Player through layout: a
+    flow field lookup while the Player stands still, and a whole new field each time
+    the Player changes tile."""
+    maze_arrangement = layout.new_maze_arrangement()
+    maze_arrangement.open_gates()
+    flow_field = src.labyrinthPathing.FlowField(maze_arrangement)
+    player_tiles = layout.get_free_cell_index().sample(random.Random(SEED), 2)
+    minotaur_x, minotaur_y = layout.get_minotaur_spawn()
+    repeat = 5 if quick else 20
+
+    flow_field.set_target(*player_tiles[0])
+    def still():
+        flow_field.set_target(*player_tiles[0])
+        flow_field.next_step(minotaur_x, minotaur_y)
+
+    # Switching between two tiles rebuilds the field on every call
+    targets = [player_tiles[0], player_tiles[1]]
+    def moving():
+        targets.reverse()
+        flow_field.set_target(*targets[0])
+        flow_field.next_step(minotaur_x, minotaur_y)
+
+    moving_number = max(2, 200 // (layout.get_size()[0] // 16) ** 2)
+    return {"still": summarize(time_calls(still, 1000, repeat)),
+            "moving": summarize(time_calls(moving, moving_number, repeat))}
+
+def bench_atlas(quick):
+    """This function times loading every frame of the Player and the Minotaur from
+    disk, without the asset cache: each frame from its own loose image, and all of
+    them from the sheets and manifests of their texture atlases."""
+    loose_paths = [path for pattern in src.labyrinthAtlas.ATLAS_SOURCES.values()
+                   for path in sorted(glob.glob(pattern))]
+    def loose():
+        for path in loose_paths:
+            pygame.image.load(path).convert_alpha()
+    def atlas():
+        for manifest_path in src.labyrinthAtlas.ATLAS_SOURCES:
+            image_path, frames = src.labyrinthAtlas.read_manifest(manifest_path)
+            src.labyrinthAtlas.TextureAtlas(pygame.image.load(image_path).convert_alpha(), frames)
+
+    repeat = 5 if quick else 20
+    return {"loose": summarize(time_calls(loose, 5, repeat), files=len(loose_paths)),
+            "atlas": summarize(time_calls(atlas, 5, repeat), files=2 * len(src.labyrinthAtlas.ATLAS_SOURCES))}
+
+def bench_is_close(quick):
+    """This function times the proximity check of the Minotaur's growl, with the
+    Minotaur changing tile on every call, so the band is never read from its cache."""
+    layout = src.labyrinthMaze.default_layout()
+    maze_arrangement = layout.new_maze_arrangement()
+    proximity_map = src.labyrinthAudio.ProximityMap(src.labyrinthPathing.FlowField(maze_arrangement))
+    player_tile = layout.get_player_spawn()
+    minotaur_tiles = layout.get_free_cell_index().get_cells()
+    index = [0]
+    def run():
+        index[0] = (index[0] + 1) % len(minotaur_tiles)
+        proximity_map.get_band(minotaur_tiles[index[0]], player_tile)
+    return summarize(time_calls(run, 1000, 5 if quick else 20))
+
+def bench_sim_step(layout, quick, seed=SEED):
+    """This function times a tick of the simulation played in layout, with the gates
+    already open and the Player walking in random directions."""
+    sim = src.labyrinthSim.LabyrinthSim(seed, layout=layout, grace_period=0)
+    rng = random.Random(seed)
+    directions = [{rng.choice(src.labyrinthSim.MOVE_ORDER)} for action in range(997)]
+    index = [0]
+    def run():
+        index[0] = (index[0] + 1) % len(directions)
+        sim.step(directions[index[0]])
+        if sim.get_result() is not None:
+            sim.reset()
+    return summarize(time_calls(run, 300, 5 if quick else 20))
+
+def bench_many_gear_pieces(screen, quick):
+    """This function times hiding MANY_GEAR_PIECES gear pieces in the large maze, both
+    in the simulation and as sprites, and drawing all of their sprites."""
+    layout = src.labyrinthMaze.generate_layout(LARGE_MAZE_SIZE, SEED)
+    maze_arrangement = layout.new_maze_arrangement()
+    rng = random.Random(SEED)
+    gear_powerups = pygame.sprite.Group()
+    def hide():
+        gear_powerups.empty()
+        gear_pieces = src.labyrinthSim.hide_gear_pieces(maze_arrangement.copy(), layout, rng, MANY_GEAR_PIECES)
+
+        # There are only four gear images, so the pieces take turns using them
+        for tile, gear_item in gear_pieces.items():
+            gear_pieces[tile] = gear_item % src.labyrinthSim.NUM_GEAR_PIECES
+        src.Minotaur_Labyrinth.hide_gear_pieces(gear_powerups, gear_pieces)
+    repeat = 3 if quick else 10
+    hide_times = time_calls(hide, 1, repeat)
+    draw_times = time_calls(lambda: gear_powerups.draw(screen), 10, repeat)
+    return {"hide": summarize(hide_times, pieces=MANY_GEAR_PIECES),
+            "draw": summarize(draw_times, pieces=MANY_GEAR_PIECES)}
+
+def bench_many_monsters(screen, quick):
+    """This function times MANY_MONSTERS Minotaurs chasing the Player through the
+    large maze: one tick of their pathing and movement, sharing a single flow field,
+    and one update and draw of all of their sprites."""
+    layout = src.labyrinthMaze.generate_layout(LARGE_MAZE_SIZE, SEED)
+    maze_arrangement = layout.new_maze_arrangement()
+    maze_arrangement.open_gates()
+    flow_field = src.labyrinthPathing.FlowField(maze_arrangement)
+    player_x, player_y = layout.get_player_spawn()
+    walkers = []
+    for x, y in layout.get_free_cell_index().sample(random.Random(SEED), MANY_MONSTERS):
+        walkers.append(src.labyrinthSim.Walker(x, y, 3, 0))
+    def tick():
+        flow_field.set_target(player_x, player_y)
+        for walker in walkers:
+            if not walker.is_animating():
+                x, y = walker.get_tile_position()
+                direction = flow_field.next_step(x, y)
+                if direction:
+                    walker.walk(direction, maze_arrangement)
+            walker.tick()
+
+    sprites = pygame.sprite.OrderedUpdates([src.labyrinthSprites.Minotaur(screen, walker) for walker in walkers])
+    def draw():
+        sprites.update(0.5)
+        sprites.draw(screen)
+
+    repeat = 5 if quick else 20
+    return {"tick": summarize(time_calls(tick, 30, repeat), monsters=MANY_MONSTERS),
+            "draw": summarize(time_calls(draw, 30, repeat), monsters=MANY_MONSTERS)}
+
+def bench_horde(screen, quick, size):
+    """This function times a Horde of size Minotaurs chasing the Player through the
+    large maze: one tick of the whole horde, and one draw of the Minotaurs in view.
+    The Player stands still, as in bench_many_monsters(), so the flow field is built
+    once and the tick only times the horde. Its time is also given per Minotaur, in
+    microseconds."""
+    layout = src.labyrinthMaze.generate_layout(LARGE_MAZE_SIZE, SEED)
+    maze_arrangement = layout.new_maze_arrangement()
+    maze_arrangement.open_gates()
+    flow_field = src.labyrinthPathing.FlowField(maze_arrangement)
+    tiles = layout.get_spawn_cell_index().sample(random.Random(SEED), size)
+    horde = src.labyrinthSim.Horde(maze_arrangement, flow_field, tiles)
+
+    player_x, player_y = layout.get_player_spawn()
+    def tick():
+        horde.update(player_x, player_y)
+
+    # The view is centred on the middle Minotaur, so the draw shows some of the horde
+    # however it has spread out
+    horde_sprites = src.labyrinthSprites.MinotaurHorde(horde, src.labyrinthSim.TILE_SIZE)
+    def draw():
+        x, y = horde.get_pixel_position(size // 2)
+        horde_sprites.draw(screen, screen.get_rect(), (x - SCREEN_SIZE[0] // 2, y - SCREEN_SIZE[1] // 2))
+
+    repeat = 5 if quick else 20
+    tick_times = time_calls(tick, 30, repeat)
+    return {"tick": summarize(tick_times, monsters=size,
+                              per_monster_us=statistics.median(tick_times) * 1000 / size),
+            "draw": summarize(time_calls(draw, 30, repeat), monsters=size)}
+
+def bench_frame(screen, quick, maze_size=None):
+    """This function plays game() for FRAME_SECONDS with an uncapped frame rate, and
+    returns the times of its frames as recorded by the game's own FrameProfiler. The
+    window is closed by a QUIT event, and no key is pressed, so the Player stands at
+    the spawn point while the lit circle and the sprites are redrawn. The game is not
+    recorded to a replay file, even if LABYRINTH_REPLAY is set."""
+    csv_path = os.path.join(tempfile.mkdtemp(), "frames.csv")
+    saved_environment = {name: os.environ.get(name) for name in ("LABYRINTH_PROFILE", "LABYRINTH_PROFILE_CSV",
+                                                                 src.labyrinthReplay.REPLAY_VARIABLE)}
+    saved_settings = (src.Minotaur_Labyrinth.MAZE_SIZE, src.Minotaur_Labyrinth.MAX_FRAME_RATE,
+                      src.Minotaur_Labyrinth.GAME_SEED)
+    os.environ["LABYRINTH_PROFILE"] = "csv"
+    os.environ["LABYRINTH_PROFILE_CSV"] = csv_path
+    os.environ[src.labyrinthReplay.REPLAY_VARIABLE] = ""
+    src.Minotaur_Labyrinth.MAZE_SIZE = maze_size
+    src.Minotaur_Labyrinth.MAX_FRAME_RATE = 0
+    src.Minotaur_Labyrinth.GAME_SEED = FRAME_SEED
+    try:
+        pygame.event.clear()
+        pygame.time.set_timer(pygame.QUIT, int(FRAME_SECONDS * (0.3 if quick else 1) * 1000), 1)
+        src.Minotaur_Labyrinth.game(screen)
+        pygame.mixer.music.stop()
+        pygame.mouse.set_visible(True)
+    finally:
+        (src.Minotaur_Labyrinth.MAZE_SIZE, src.Minotaur_Labyrinth.MAX_FRAME_RATE,
+         src.Minotaur_Labyrinth.GAME_SEED) = saved_settings
+        for name, value in saved_environment.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    with open(csv_path, newline="") as frames_file:
+        times = [int(row["total_us"]) / 1000 for row in csv.DictReader(frames_file)]
+    os.remove(csv_path)
+    os.rmdir(os.path.dirname(csv_path))
+
+    # The first frames load the assets and draw the first chunks of the maze, so they
+    # are timed apart from the steady frames
+    first = times[:10]
+    steady = times[10:] or times
+    result = summarize(steady, first_frames_ms=sum(first))
+    result["p99_ms"] = sorted(steady)[min(len(steady) - 1, len(steady) * 99 // 100)]
+    return result
+
+def bench_replay(quick):
+    """This function records a replay of REPLAY_TICKS ticks of the Player walking in
+    random directions, saves and loads it, and times playing it back headless (checked
+    against every keyframe) and seeking to its last tick."""
+    rng = random.Random(SEED)
+    replay = src.labyrinthReplay.Replay(SEED, settings={"grace_period": 0, "movement_delay": 0,
+                                                        "flicker_chance": 100, "lives": 1000})
+    sim = replay.new_sim()
+    for tick in range(REPLAY_TICKS):
+        actions = {rng.choice(src.labyrinthSim.MOVE_ORDER)}
+        replay.record(actions, sim)
+        sim.step(actions)
+
+    replay_path = os.path.join(tempfile.mkdtemp(), "bench.replay")
+    replay.save(replay_path)
+    file_bytes = os.path.getsize(replay_path)
+    replay = src.labyrinthReplay.load(replay_path)
+    os.remove(replay_path)
+    os.rmdir(os.path.dirname(replay_path))
+
+    repeat = 3 if quick else 10
+    return {"play_headless": summarize(time_calls(replay.play_headless, 1, repeat),
+                                       ticks=REPLAY_TICKS, file_bytes=file_bytes),
+            "seek": summarize(time_calls(lambda: replay.seek(REPLAY_TICKS - 1), 1, repeat),
+                              ticks=REPLAY_TICKS)}
+
+def bench_leaderboard(quick):
+    """This function fills a leaderboard in a temporary database with LEADERBOARD_SCORES
+    scores, and times recording a score, which only queues it for the writer thread,
+    and reading the top of the leaderboard once every score has been written."""
+    database_path = os.path.join(tempfile.mkdtemp(), "leaderboard.db")
+    leaderboard = src.labyrinthLeaderboard.Leaderboard(database_path)
+    rng = random.Random(SEED)
+    def record():
+        leaderboard.record("survivor", rng.uniform(30, 600), rng.randint(1, 3), rng.getrandbits(32))
+
+    repeat = 5 if quick else 20
+    record_times = time_calls(record, LEADERBOARD_SCORES // repeat, repeat)
+    leaderboard.flush()
+    top_times = time_calls(leaderboard.top, 100, repeat)
+    leaderboard.close()
+    database_directory = os.path.dirname(database_path)
+    for file_name in os.listdir(database_directory):
+        os.remove(os.path.join(database_directory, file_name))
+    os.rmdir(database_directory)
+
+    return {"record": summarize(record_times),
+            "top": summarize(top_times, scores=LEADERBOARD_SCORES, count=src.labyrinthLeaderboard.TOP_SIZE)}
+
+def get_benchmarks(screen, quick):
+    """This function returns the list of (name, function) pairs of the suite. Each
+    function returns either the result of one benchmark, or a dictionary of results
+    named after the parts it times."""
+    default_layout = src.labyrinthMaze.default_layout()
+    return [("generate_maze", lambda: bench_generate_maze(screen, quick)),
+            ("hide_gear_pieces", lambda: bench_hide_gear_pieces(screen, quick)),
+            ("sprites", lambda: bench_sprites(screen, quick)),
+            ("atlas", lambda: bench_atlas(quick)),
+            ("follow_player", lambda: bench_follow_player(default_layout, quick)),
+            ("is_close", lambda: bench_is_close(quick)),
+            ("sim_step", lambda: bench_sim_step(default_layout, quick)),
+            ("frame", lambda: bench_frame(screen, quick)),
+            ("replay", lambda: bench_replay(quick)),
+            ("leaderboard", lambda: bench_leaderboard(quick)),
+            ("stress.large_maze.follow_player",
+             lambda: bench_follow_player(src.labyrinthMaze.generate_layout(LARGE_MAZE_SIZE, SEED), quick)),
+            ("stress.large_maze.sim_step",
+             lambda: bench_sim_step(src.labyrinthMaze.generate_layout(LARGE_MAZE_SIZE, SEED), quick)),
+            ("stress.large_maze.frame", lambda: bench_frame(screen, quick, LARGE_MAZE_SIZE)),
+            ("stress.many_gear_pieces", lambda: bench_many_gear_pieces(screen, quick)),
+            ("stress.many_monsters", lambda: bench_many_monsters(screen, quick))] + \
+           [("stress.horde.%d" % size, lambda size=size: bench_horde(screen, quick, size))
+            for size in HORDE_SIZES]
+
+def run(arguments):
+    """This function runs every benchmark whose name contains the filter, prints its
+    median time, and saves the results as JSON."""
+    pygame.init()
+    pygame.display.set_caption("Minotaur Labyrinth benchmarks")
+    screen = pygame.display.set_mode(SCREEN_SIZE)
+
+    results = {}
+    for name, benchmark in get_benchmarks(screen, arguments.quick):
+        if arguments.filter and arguments.filter not in name:
+            continue
+        random.seed(SEED)
+        result = benchmark()
+        if "median_ms" in result:
+            result = {name: result}
+        else:
+            result = {name + "." + part: part_result for part, part_result in result.items()}
+        for result_name, part_result in result.items():
+            print("%-40s %12.4f ms" % (result_name, part_result["median_ms"]))
+        results.update(result)
+
+    report = {"meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "quick": arguments.quick,
+                       "python": platform.python_version(), "pygame": pygame.version.ver,
+                       "platform": platform.platform(), "machine": platform.machine(), "seed": SEED},
+              "results": results}
+    with open(arguments.output, "w") as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+    print("Results saved to %s" % arguments.output)
+    return 0
+
+def compare(arguments):
+    """This function compares the median times of a results file against a baseline,
+    prints the change of each benchmark, and returns 1 if any of them is slower by
+    more than the threshold."""
+    with open(arguments.baseline) as baseline_file:
+        baseline = json.load(baseline_file)["results"]
+    with open(arguments.results) as results_file:
+        results = json.load(results_file)["results"]
+
+    regressions = []
+    print("%-40s %12s %12s %9s" % ("benchmark", "baseline", "current", "change"))
+    for name in sorted(set(baseline) | set(results)):
+        if name not in baseline or name not in results:
+            print("%-40s %s" % (name, "only in the baseline" if name in baseline else "new"))
+            continue
+        before = baseline[name]["median_ms"]
+        after = results[name]["median_ms"]
+        change = after / before - 1 if before else 0.0
+        flag = ""
+        if change > arguments.threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print("%-40s %9.4f ms %9.4f ms %+8.1f%%%s" % (name, before, after, change * 100, flag))
+
+    if regressions:
+        print("%d regression(s) slower than %+.0f%%: %s" % (len(regressions), arguments.threshold * 100,
+                                                          ", ".join(regressions)))
+        return 1
+    print("No regressions")
+    return 0
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite", description=__doc__.split("\n\n")[0].strip())
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks and save the results as JSON")
+    run_parser.add_argument("--quick", action="store_true", help="fewer repetitions, for a quick check")
+    run_parser.add_argument("--filter", default="", help="only run the benchmarks whose name contains this text")
+    run_parser.add_argument("--output", default=DEFAULT_OUTPUT, help="the JSON file the results are saved to")
+    run_parser.set_defaults(function=run)
+
+    compare_parser = commands.add_parser("compare", help="flag the regressions against a stored baseline")
+    compare_parser.add_argument("baseline", help="the JSON file of the baseline results")
+    compare_parser.add_argument("results", nargs="?", default=DEFAULT_OUTPUT, help="the JSON file of the new results")
+    compare_parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                                help="the relative slowdown flagged as a regression (0.1 is 10%%)")
+    compare_parser.set_defaults(function=compare)
+
+    arguments = parser.parse_args(argv)
+    return arguments.function(arguments)
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -5,8 +5,9 @@ Date: Oct 30, 2024
 Description: "Minotaur Labyrinth" is a survival-maze game in which the player, Theseus,
               must survive the trials of the Labyrinth by finding and killing the Minotaur.
               
-              The Player is controlled using the arrow keys, and the Minotaur is controlled
-              by a very simple pathing AI.
+              The Player is controlled using the arrow keys, and the Minotaur chases the
+              Player along the shortest path through the maze. The rules of the game
+              are played by the labyrinthSim module, which this module renders.
               
               In order to win the game, the player must collect all four pieces of 
               gear, after which they must find the Minotaur and walk into him, 
@@ -21,61 +22,148 @@ Description: "Minotaur Labyrinth" is a survival-maze game in which the player, T
 """
 
 # I - IMPORT AND INITIALIZE ====================================================
-import pygame, src.labyrinthSprites, random
+# The startup is timed from before Pygame is imported, since importing it is part of
+# the cold start
+import time
+START_TIME = time.perf_counter()
 
-pygame.init()
-pygame.mixer.init()
+import pygame, src.labyrinthSprites, src.labyrinthAssets, src.labyrinthRender, src.labyrinthAudio, src.labyrinthSim, src.labyrinthMaze, \
+       src.labyrinthProfiler, src.labyrinthMixer, src.labyrinthReplay, src.labyrinthLeaderboard, \
+       src.labyrinthAtlas, random
 
-def generate_maze(maze_wall, maze_arrangement):
- 
-    for row in range(len(maze_arrangement)):
-        for col in range(len(maze_arrangement[row])):
-            if maze_arrangement[row][col] == 1: 
-                if (row == 7 and col == 6) or (row == 6 and col == 8) or \
-                   (row == 8 and col == 9):
-                    stone = src.labyrinthSprites.Stone(random.randint(0,3), row*50, col*50, True)
-                    maze_wall.add(stone)
-                else:
-                    stone = src.labyrinthSprites.Stone(random.randint(0,3), row*50, col*50, False)
-                    maze_wall.add(stone)                    
+# Pygame is initialized by main(), a module at a time: only the display is needed to
+# show the introduction screen, and the fonts and the mixer are initialized after it
+# is shown, while the game's assets are preloaded
 
-def hide_gear_pieces(gear_powerups, maze_arrangement):
-    
-    for gear_item in range(4):
-        valid_place = False
-        
-        while not valid_place:
-            
-            row = random.randint(0, len(maze_arrangement) - 1)
-            col = random.randint(0, len(maze_arrangement[:]) - 1)
-        
-            # Ensuring the gear pieces do not spawn in the Minotaur's spawn point
-            if (row == 7 or row == 8) and (col == 7 or col == 8):
-                valid_place = False
-            
-            # Ensuring the gear pieces do not spawn on the player's spawn point    
-            elif (row == 1 or col == 1):
-                valid_place = False
-                
-            # Ensuring the gear pieces do not spawn on a tile where a gear piece already exists
-            elif maze_arrangement[row][col] == 2:
-                valid_place = False
-            
-            # Ensuring the gear pieces only spawn on a valid pathway block
-            elif maze_arrangement[row][col] == 0:
-                maze_arrangement[row][col] = 2
-                powerup = src.labyrinthSprites.GearPieces(gear_item, row*50, col*50)
-                gear_powerups.add(powerup)
-                valid_place = True                
+# When True, only the regions of the screen that changed are pushed to the display
+# on each frame. When False, the whole screen is flipped on every frame
+DIRTY_RECT_RENDERING = True
+
+# The number of tiles along each side of a procedurally generated maze. When None,
+# the original 16x16 maze is played, which fits the window exactly. Bigger mazes
+# scroll with the camera
+MAZE_SIZE = None
+
+# The seed of the game's random choices: the generated maze, the hidden gear pieces and
+# the flickering of the flashlight. When None, every game is different
+GAME_SEED = None
+
+# The number of seconds the leaderboard is shown after a won game, unless a key is
+# pressed
+END_SCREEN_SECONDS = 10
+
+# The largest seed picked for a game when GAME_SEED is None
+MAX_SEED = 2**32
 
-def game_instructions(screen):
+# The number of Minotaurs in the horde released with the Minotaur, which roam the maze
+# and cost the Player a life when they catch them, but cannot be killed. 0 plays the
+# original game with the Minotaur alone
+HORDE_SIZE = 0
+
+# The most frames drawn per second, which may be more than the ticks per second of
+# the simulation, since the characters are drawn between ticks. 0 draws as many
+# frames as the machine can
+MAX_FRAME_RATE = 144
+
+# The length of a tick of the simulation in milliseconds, and the most ticks played
+# to catch up on a single slow frame
+TICK_MS = 1000 / src.labyrinthSim.TICK_RATE
+MAX_TICKS_PER_FRAME = 5
+
+# The phases of a frame timed by the profiler, in the order they run. The movement,
+# collision, audio, pathing and tick phases are timed inside LabyrinthSim.step()
+FRAME_PHASES = ("events", "movement", "collision", "audio", "pathing", "tick", "sounds",
+                "update", "world", "vision", "hud", "present")
+
+# The assets used by game(), which are read on a background thread while the
+# introduction screen is shown. The frames of the Player and the Minotaur are each
+# loaded as the single sheet of their texture atlas. The music is streamed by the
+# mixer, so it is only loaded by game() itself, on the main thread
+GAME_IMAGES = ["./misc/MiscImages/background.jpg", "./misc/MiscImages/Game_Over_Screen.jpg",
+               "./misc/MiscImages/vision_limiter.png", "./misc/MiscImages/heart.png",
+               "./misc/MiscImages/stone_brick.jpg", "./misc/MiscImages/cobble_stone.png",
+               "./misc/MiscImages/moss_stone.png", "./misc/MiscImages/diamondchestplate.png",
+               "./misc/MiscImages/diamondhelmet.png", "./misc/MiscImages/diamondsword.png",
+               "./misc/MiscImages/diamondboots.png",
+               src.labyrinthAtlas.get_sheet_path(src.labyrinthAtlas.PLAYER_ATLAS),
+               src.labyrinthAtlas.get_sheet_path(src.labyrinthAtlas.MINOTAUR_ATLAS)]
+# The sound cue played for each event of the simulation: its sound, volume, priority,
+# cooldown in milliseconds and most voices at once. The deaths and the full set of gear
+# are never cut off, and the footsteps give way to every other sound
+AUDIO_CUES = {"walk": ("./misc/Sounds/player_walking.wav", 0.5, 0, 0, 1),
+              "click": ("./misc/Sounds/click.wav", 0.5, 1, 100, 1),
+              "shock": ("./misc/Sounds/shock.wav", 0.5, 1, 250, 1),
+              "growl": ("./misc/Sounds/monster_snarl.wav", 1.0, 2, 0, 1),
+              "gear": ("./misc/Sounds/sword_clash.wav", 0.7, 2, 0, 2),
+              "all_gear": ("./misc/Sounds/player_full_gear.wav", 0.8, 3, 0, 1),
+              "player_death": ("./misc/Sounds/player_death.wav", 0.8, 3, 0, 1),
+              "minotaur_death": ("./misc/Sounds/minotaur_death.wav", 1.0, 3, 0, 1)}
+GAME_SOUNDS = [path for path, volume, priority, cooldown, max_voices in AUDIO_CUES.values()]
+GAME_FONTS = [("./misc/Fonts/DIOGENES.ttf", 40), ("./misc/Fonts/greekhouse.ttf", 18),
+              ("./misc/Fonts/geek.ttf", 22)]
+GAME_MUSIC = "./misc/Sounds/eerie_music.mp3"
+
+# The arrow key that moves the Player in each direction
+ARROW_KEYS = (("DOWN", pygame.K_DOWN), ("UP", pygame.K_UP),
+              ("RIGHT", pygame.K_RIGHT), ("LEFT", pygame.K_LEFT))
+
+def generate_maze(maze_arrangement, background, seed=None):
+    """This function returns the WallLayer that draws every wall of maze_arrangement
+    onto the background, a chunk at a time as the camera reaches it. The gates stay
+    drawn until open_gates() is called. The seed picks the stones of the walls, so a
+    replayed game looks the same too."""
+    return src.labyrinthRender.WallLayer(maze_arrangement, background, src.labyrinthSim.TILE_SIZE,
+                                         seed=seed)
+
+def open_gates(wall_layer, gate_cells):
+    """This function patches the gates of the Minotaur's chamber out of the wall layer,
+    once the simulation has opened them. It accepts the gate tiles opened by the
+    simulation, and returns the list of rects that changed."""
+    changed_rects = []
+    for x, y in gate_cells:
+        changed_rects.append(wall_layer.open_cell(x, y))
+    return changed_rects
+
+def hide_gear_pieces(gear_powerups, gear_pieces):
+    """This function creates a GearPieces sprite for each gear piece hidden by the
+    simulation, and adds it to gear_powerups. It accepts gear_pieces, a dictionary
+    mapping each tile (x, y) to the number of the gear piece hidden on it, and returns
+    a dictionary mapping each tile to its sprite."""
+    gear_sprites = {}
+    for (x, y), gear_item in gear_pieces.items():
+        powerup = src.labyrinthSprites.GearPieces(gear_item, x*src.labyrinthSim.TILE_SIZE,
+                                                  y*src.labyrinthSim.TILE_SIZE)
+        gear_powerups.add(powerup)
+        gear_sprites[(x, y)] = powerup
+    return gear_sprites
+
+def game_instructions(screen, preloader=None, startup_timer=None):
+    """This function shows the introduction screen until the player presses SPACE.
+    Only the introduction screen is loaded before it is shown; the fonts and the
+    mixer are initialized afterwards, the first time it is shown, and the preloader,
+    if any, starts reading the game's assets on its own thread while the player
+    reads the instructions."""
     # DISPLAY ==================================================================
-    background = pygame.image.load("./misc/MiscImages/Introduction_Screen.jpg")
+    background = src.labyrinthAssets.load_image("./misc/MiscImages/Introduction_Screen.jpg")
     screen.blit(background, (0, 0))    
     
+    # Nothing moves on the introduction screen, so it is presented only once
+    pygame.display.flip()
+    if startup_timer:
+        startup_timer.mark("first frame")
+    
     # ENTITIES ================================================================= 
-    start_game_sound = pygame.mixer.Sound("./misc/Sounds/metal_gong.wav")
-    start_game_sound.set_volume(0.7)
+    # Pygame stays initialized from one game to the next, so the fonts and sounds in
+    # the asset cache stay valid
+    if not pygame.font.get_init():
+        pygame.font.init()
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    if preloader:
+        preloader.start()
+    # The gong is decoded now, so it plays as soon as SPACE is pressed
+    start_game_sound = "./misc/Sounds/metal_gong.wav"
+    src.labyrinthAssets.load_sound(start_game_sound)
     
     # ASSIGN ===================================================================
     clock = pygame.time.Clock()
@@ -95,310 +183,311 @@ def game_instructions(screen):
                 return False
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE:
-                    start_game_sound.play()
+                    src.labyrinthAssets.play_sound(start_game_sound, 0.7)
                     keep_going = False
                     return True, 1
-                
-        # REFRESH SCREEN ===========================================================
-        pygame.display.flip()
 
-def game(screen):
-    """This function defines the mainline logic for "The Labyrinth" Game"""
+def save_replay(recording):
+    """This function saves the Replay recorded of a game to the file chosen by the
+    LABYRINTH_REPLAY environment variable, unless recording is None."""
+    if recording:
+        recording.save(src.labyrinthReplay.get_replay_path())
+
+def game(screen, startup_timer=None, replay=None, start_tick=0):
+    """This function defines the mainline logic for "The Labyrinth" Game. The rules of
+    the game are played by a LabyrinthSim, so this function only reads the keyboard,
+    plays the sounds for the events of each tick, and renders the game. It accepts
+    the StartupTimer of the game, if any, which is reported once the first frame of
+    the game has been shown. The game is recorded to the replay file named by the
+    LABYRINTH_REPLAY environment variable, if it is set; when a Replay is given, it is played back instead of the keyboard,
+    from start_tick on. It returns a tuple (game_ended, user_survived, score), where
+    score is the tuple (seconds, lives, seed) of a won game, and None otherwise."""
     
     # DISPLAY ==================================================================
-    background = pygame.image.load("./misc/MiscImages/background.jpg")
-    background = background.convert()
+    background = src.labyrinthAssets.load_image("./misc/MiscImages/background.jpg")
     screen.blit(background, (0, 0))
   
     # ENTITIES ================================================================= 
     
-    # Set the variable indicating the arrangement of the maze
-    # X's represent walls
-    # O's represent the pathway blocks on which the minotaur and player can traverse
-    X, O = 1, 0
-    maze_arrangement = [[X,X,X,X,X,X,X,X,X,X,X,X,X,X,X,X], \
-                        [X,O,X,X,O,O,O,O,O,O,X,X,O,O,O,X], \
-                        [X,O,O,O,O,X,X,X,O,X,X,X,X,X,O,X], \
-                        [X,O,X,X,O,X,O,O,O,O,O,O,O,O,O,X], \
-                        [X,O,O,O,O,X,O,X,O,X,X,O,X,X,X,X], \
-                        [X,O,X,X,O,O,O,X,O,X,X,O,O,O,O,X], \
-                        [X,O,X,X,X,X,X,X,X,X,X,X,X,X,O,X], \
-                        [X,O,O,O,O,O,X,O,O,X,X,X,O,O,O,X], \
-                        [X,O,X,O,X,X,X,O,O,X,O,O,O,X,O,X], \
-                        [X,O,X,O,O,O,X,X,X,X,O,X,O,X,O,X], \
-                        [X,O,X,X,X,O,X,X,O,X,X,X,O,X,O,X], \
-                        [X,O,O,O,O,O,O,O,O,O,O,O,O,X,O,X], \
-                        [X,O,X,O,X,O,X,O,X,X,X,O,O,O,O,X], \
-                        [X,X,X,O,X,O,X,O,O,O,X,X,X,X,O,X], \
-                        [X,O,O,O,X,O,O,O,X,O,X,O,O,O,O,X], \
-                        [X,X,X,X,X,X,X,X,X,X,X,X,X,X,X,X]] 
-    
-    # Any position occupied by a hidden_gear_piece will be equal to 2
-    hidden_gear_piece = 2
+    # The simulation owns the maze, the Player, the Minotaur, the gear pieces,
+    # the lives, the countdown and the flashlight
+    # Every game has a seed, even when GAME_SEED is None, so that it can be replayed
+    recording = None
+    if replay:
+        sim = replay.seek(start_tick)
+    else:
+        seed = GAME_SEED
+        if seed is None:
+            seed = random.randrange(MAX_SEED)
+        layout = None
+        if MAZE_SIZE:
+            layout = src.labyrinthMaze.generate_layout(MAZE_SIZE, seed)
+        sim = src.labyrinthSim.LabyrinthSim(seed, layout=layout, horde_size=HORDE_SIZE)
+        if src.labyrinthReplay.get_replay_path():
+            recording = src.labyrinthReplay.Replay(seed, MAZE_SIZE or 0, sim.get_settings())
+    maze_arrangement = sim.get_maze_arrangement()
         
     # Music and Sound Effects
     
-    pygame.mixer.music.load("./misc/Sounds/eerie_music.mp3")
+    src.labyrinthAssets.load_music(GAME_MUSIC)
     pygame.mixer.music.set_volume(0.4)
     pygame.mixer.music.play(-1) 
     
-    # The Minotaur's growl when his distance is "far" from the player
-    far_minotaur_growl = pygame.mixer.Sound("./misc/Sounds/monster_snarl.wav")
-    far_minotaur_growl.set_volume(0.1)
-
-    # Light Click
-    click = pygame.mixer.Sound("./misc/Sounds/click.wav")
-    click.set_volume(0.5)
-    shock = pygame.mixer.Sound("./misc/Sounds/shock.wav")
-    shock.set_volume(0.5)
-    # The Minotaur's growl when his distance is "somewhat far" from the player
-    med_minotaur_growl = pygame.mixer.Sound("./misc/Sounds/monster_snarl.wav")
-    med_minotaur_growl.set_volume(0.25) 
-    
-    # The Minotaur's growl when his distance is "close" to the player
-    close_minotaur_growl = pygame.mixer.Sound("./misc/Sounds/monster_snarl.wav")
-    close_minotaur_growl.set_volume(0.5)       
-    
-    equip_gear_sound = pygame.mixer.Sound("./misc/Sounds/sword_clash.wav")
-    equip_gear_sound.set_volume(0.7)
-    
-    minotaur_death_sound = pygame.mixer.Sound("./misc/Sounds/minotaur_death.wav")
-    minotaur_death_sound.set_volume(1.0)
-    
-    minotaur_spawn_sound = pygame.mixer.Sound("./misc/Sounds/metal_gong.wav")
-    minotaur_spawn_sound.set_volume(1.0)
-    
-    player_death_sound = pygame.mixer.Sound("./misc/Sounds/player_death.wav")
-    player_death_sound.set_volume(0.8)
-    
-    player_walking_sound = pygame.mixer.Sound("./misc/Sounds/player_walking.wav")
-    player_walking_sound.set_volume(0.5)
-    
-    # The sound played when the player collects all four pieces of gear
-    all_gear_sound = pygame.mixer.Sound("./misc/Sounds/player_full_gear.wav")
-    all_gear_sound.set_volume(0.8)
+    # The sound effects play on a fixed pool of channels, where each event's cue
+    # decides whether it may cut off another sound. The sounds are decoded once by
+    # the sound bank, and the volume of each playback is set on its channel
+    audio_scheduler = src.labyrinthMixer.AudioScheduler(src.labyrinthAssets.cache.get_sound_bank())
+    for event, cue in AUDIO_CUES.items():
+        audio_scheduler.add_cue(event, *cue)
 
     # Images
     
-    game_over_message = pygame.image.load("./misc/MiscImages/Game_Over_Screen.jpg")
+    game_over_message = src.labyrinthAssets.load_image("./misc/MiscImages/Game_Over_Screen.jpg")
     
-    vision_space = pygame.image.load("./misc/MiscImages/vision_limiter.png")
-    vision_off = pygame.image.load("./misc/MiscImages/vision_limiter_off.png")
+    vision_space = src.labyrinthAssets.load_image("./misc/MiscImages/vision_limiter.png")
 
-    player = src.labyrinthSprites.Player(screen, maze_arrangement)
-    minotaur = src.labyrinthSprites.Minotaur(screen, maze_arrangement)
+    player = src.labyrinthSprites.Player(screen, sim.get_player())
+    minotaur = src.labyrinthSprites.Minotaur(screen, sim.get_minotaur())
     visible_area = src.labyrinthSprites.VisionLimiter(screen, vision_space)
-    visible_off = src.labyrinthSprites.NoVisionLimiter(screen, vision_off)
-    maze_wall = pygame.sprite.Group()
+    visible_off = src.labyrinthSprites.NoVisionLimiter(screen)
     gear_powerups = pygame.sprite.Group()
     
-    generate_maze(maze_wall, maze_arrangement)
-    hide_gear_pieces(gear_powerups, maze_arrangement)
+    # The walls are drawn into chunks of a single layer, which replaces the background,
+    # and the camera shows the part of the maze around the Player
+    wall_layer = generate_maze(maze_arrangement, background, sim.get_seed())
+    camera = src.labyrinthRender.Camera(screen.get_size(), wall_layer.get_size())
+    camera.follow(player.get_center_position())
+    wall_layer.draw(screen, camera.get_offset())
+    gear_sprites = hide_gear_pieces(gear_powerups, sim.get_gear_pieces())
     
-    health_tracker = src.labyrinthSprites.HealthKeeper(screen)
+    health_tracker = src.labyrinthSprites.HealthKeeper(screen, sim.get_lives())
     gear_tracker = src.labyrinthSprites.GearTracker()
     countdown = src.labyrinthSprites.Countdown()
     
-    allSprites = pygame.sprite.OrderedUpdates(maze_wall, gear_powerups, minotaur, player, visible_area)
-    allSprites2 = pygame.sprite.OrderedUpdates(gear_tracker, health_tracker, countdown)
+    # A replay sought past its first tick may start with gear collected and the gates
+    # of the Minotaur's chamber open
+    for gear_item in range(sim.get_num_gear()):
+        gear_tracker.add_gear_piece()
+    if replay and not maze_arrangement.is_wall(*sim.get_layout().get_gate_cells()[0]):
+        open_gates(wall_layer, sim.get_layout().get_gate_cells())
+    
+    allSprites = pygame.sprite.OrderedUpdates(gear_powerups, minotaur, player)
+    
+    # The horde is drawn by a single object, rather than by a sprite per Minotaur
+    horde = None
+    if sim.get_horde():
+        horde = src.labyrinthSprites.MinotaurHorde(sim.get_horde(), src.labyrinthSim.TILE_SIZE)
+    
+    # The HUD is composited into one layer, which is only built again when the gear,
+    # the lives or the countdown change
+    hud = src.labyrinthRender.HUDLayer([gear_tracker, health_tracker, countdown])
+    
+    # Only the regions of the screen that change are pushed to the display
+    dirty_tracker = src.labyrinthRender.DirtyTracker(screen, DIRTY_RECT_RENDERING)
+    
+    # Times each phase of every frame while it is switched on (F3 or LABYRINTH_PROFILE=1)
+    profiler = src.labyrinthProfiler.FrameProfiler(phases=FRAME_PHASES)
+    sim.set_profiler(profiler)
     
     # ASSIGN ===================================================================
     clock = pygame.time.Clock()
     keep_going = True 
-    grace_period_countdown = 15
-    time_tracker = 0
     
-    growl_sound_counter = 0
+    # The simulation advances in fixed ticks of TICK_MS, however long each frame
+    # takes, and the time left over is carried to the next frame
+    accumulator = 0.0
+    light_presses = 0
     
     pygame.mouse.set_visible(False)
     
     # LOOP =====================================================================
-    def toggle_light(light_state):
-        """Alterna o estado da lanterna"""
-        return not light_state
-
-    # Inicializa o estado da lanterna
-    light_state = False
-    movement_cooldown = 0  # Tempo restante para permitir o próximo movimento
-    movement_delay = 15
-    random_chance = 100
     while keep_going:
          
         # TIME =================================================================
-        clock.tick(30) 
+        # A frame slower than MAX_TICKS_PER_FRAME ticks slows the game down rather
+        # than making the next frame even slower to catch up
+        accumulator += min(clock.tick(MAX_FRAME_RATE), MAX_TICKS_PER_FRAME * TICK_MS)
+        profiler.begin_frame()
     
         # EVENT HANDLING =======================================================
-        if movement_cooldown > 0:
-            movement_cooldown -= 1
         for event in pygame.event.get():
             
             if event.type == pygame.QUIT:
                 keep_going = False
 
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE:
+                if event.key == pygame.K_SPACE and not replay:
                     # Alterna o estado da lanterna
-                    light_state = toggle_light(light_state)
-                    click.play()
+                    light_presses += 1
+                
+                # The overlay is removed from the whole screen when switched off
+                elif event.key == src.labyrinthProfiler.TOGGLE_KEY:
+                    profiler.toggle()
+                    dirty_tracker.invalidate()
 
-        # 
         keys = pygame.key.get_pressed()  # Obtém o estado de todas as teclas
-        if movement_cooldown == 0:
-            if keys[pygame.K_DOWN]:  # Se a tecla para baixo estiver pressionada
-                player.walk_down(player_walking_sound)  # Mova o jogador para baixo
-                movement_cooldown = movement_delay
-            if keys[pygame.K_UP]:  # Se a tecla para cima estiver pressionada
-                player.walk_up(player_walking_sound)  # Mova o jogador para cima
-                movement_cooldown = movement_delay
-            if keys[pygame.K_RIGHT]:  # Se a tecla direita estiver pressionada
-                player.walk_right(player_walking_sound)  # Mova o jogador para a direita
-                movement_cooldown = movement_delay
-            if keys[pygame.K_LEFT]:  # Se a tecla esquerda estiver pressionada
-                player.walk_left(player_walking_sound)  # Mova o jogador para a esquerda
-                movement_cooldown = movement_delay
-
-
-        # If the player collides with any of the gear powerups,
-        # the gear sprite is killed and the add_gear_piece() method is called
-        if pygame.sprite.spritecollide(player, gear_powerups, False):
-            for gear in pygame.sprite.spritecollide(player, gear_powerups, False):
-                gear.kill()
-                gear_tracker.add_gear_piece()
-                equip_gear_sound.play()  # Toca o som de equipar
-
-                # If all four pieces of gear have been collected, play the 
-                # "I will find you" sound effect
-                if gear_tracker.get_num_gear() == 4:
-                    all_gear_sound.play()
+        held_directions = set()
+        for direction, key in ARROW_KEYS:
+            if keys[key]:
+                held_directions.add(direction)
+        profiler.mark("events")
+        
+        # SIMULATION ===========================================================
+        # Advances the game by as many ticks as fit in the elapsed time, and reacts
+        # to everything that happened. Each press of the flashlight key is given to
+        # a single tick, while the arrow keys are held for every tick
+        # A replay plays the inputs it recorded instead, and ends when they run out
+        while accumulator >= TICK_MS:
+            accumulator -= TICK_MS
+            if replay:
+                if sim.get_tick() >= replay.get_num_ticks():
+                    keep_going = False
+                    break
+                actions = replay.get_actions(sim.get_tick())
+            else:
+                actions = set(held_directions)
+                if light_presses:
+                    actions.add("LIGHT")
+                    light_presses -= 1
+                if recording:
+                    recording.record(actions, sim)
+            
+            for event, detail in sim.step(actions):
+                # The Minotaur's growl and death are heard from his side of the Player
+                if event in ("growl", "minotaur_death"):
+                    pan = src.labyrinthMixer.get_pan(sim.get_minotaur().get_pixel_position()[0],
+                                                     sim.get_player().get_pixel_position()[0])
+                    volume = None
+                    if event == "growl":
+                        volume = src.labyrinthAudio.GROWL_VOLUMES[detail]
+                    audio_scheduler.play(event, volume, pan)
+                elif event in AUDIO_CUES:
+                    audio_scheduler.play(event)
+                
+                # The gear sprite is killed and the add_gear_piece() method is called
+                if event == "gear":
+                    gear_sprites.pop(detail).kill()
+                    gear_tracker.add_gear_piece()
                 
-                # Play the gear equip sound effect every time a gear piece is collected 
-                #equip_gear_sound.play()
+                # The player lost a life, and was respawned at their starting position
+                elif event == "player_death":
+                    health_tracker.lose_life()
                 
-            # Check if the player collides with the minotaur
-        if player.rect.colliderect(minotaur.rect):
+                # The gates surrounding the Minotaur within his contained center space
+                # are no longer drawn
+                elif event == "gates_open":
+                    for rect in open_gates(wall_layer, detail):
+                        dirty_tracker.add(camera.to_screen(rect))
                 
-                # Checks if the player has obtained all four pieces of gear
-                # If no, then the player is unable to kill the minotaur
-                # The player loses a life, and is respawned at their starting position
-                # The Minotaur is repositioned in its original spawn point 
-            if gear_tracker.get_num_gear() < 4 and not player_hit:
-                player_death_sound.play()
-                player.respawn_player()
-                minotaur.reset_position()
-                health_tracker.lose_life()
-                player_hit = True
-                # Checks if the player has obtained all four pieces of gear
-                # If yes, then the player is able to kill the minotaur
-                # The minotaur sprite is killed, and a death sound is played
-            elif gear_tracker.get_num_gear() == 4:
-                minotaur_death_sound.play()
+                # The flashlight was switched, so the whole screen changes
+                elif event in ("click", "shock"):
+                    dirty_tracker.invalidate()
+            profiler.mark("sounds")
+            
+            # End the game if the Minotaur has been killed and
+            # return True and 1 to game_ended, user_survived, along with the score:
+            # the seconds of game time it took to win, the lives left and the seed
+            if sim.get_result() == "win":
                 minotaur.kill()
-                    
-                    # End the game if the Minotaur has been killed and
-                    # return True and 1 to game_ended, user_survived
+                profiler.write_csv()
+                save_replay(recording)
                 keep_going = False
-                return True, 1
-        else:
-            player_hit = False  # Resetar a variável se não houver colisão
+                return True, 1, (sim.get_tick() / src.labyrinthSim.TICK_RATE, sim.get_lives(), sim.get_seed())
 
-        if health_tracker.get_lives() <= 0:
-            screen.blit(game_over_message, (0, 0))
-            pygame.display.flip()
-            pygame.time.wait(3000)
-            keep_going = False
-            return True, False
-        
-        # Checking the Proximity of the Minotaur to the Player in order to 
-        # determine the volume of the minotaur's growl that will be played
-        # If the proximity is returned as "close", and the counter is 0, the volume will be 0.5
-        if minotaur.is_close(player.get_x_position(), player.get_y_position()) == "close" and growl_sound_counter == 0:
-            close_minotaur_growl.play()
-        
-        # If the proximity is returned as "medium", and the counter is 0, the volume will be 0.3  
-        elif minotaur.is_close(player.get_x_position(), player.get_y_position()) == "medium" and growl_sound_counter == 0:
-            med_minotaur_growl.play()
-                      
-        # If the proximity is returned as "far", and the counter is 0, the volume will be 0.1
-        elif minotaur.is_close(player.get_x_position(), player.get_y_position()) == "far" and growl_sound_counter == 0:
-            far_minotaur_growl.play()
+            if sim.get_result() == "lose":
+                screen.blit(game_over_message, (0, 0))
+                pygame.display.flip()
+                pygame.time.wait(3000)
+                profiler.write_csv()
+                save_replay(recording)
+                keep_going = False
+                return True, False, None
         
-        # Increases the growl sound counter by 1 each iteration of the game loop (1 frame)    
-        growl_sound_counter += 1
+        countdown.decrease_time(sim.get_countdown())
+                        
+        # REFRESH SCREEN =======================================================
+        # Everything outside the lit circle is covered in black, so only the lit
+        # circle (where it was, and where it is now) can change on the screen
+        if not sim.is_blackout():
+            dirty_tracker.add(visible_area.get_lit_rect())
         
-        # If the growl sound counter is equal to 120 (4 seconds of staying within a proximity
-        # of the minotaur) or the Player exits the a valid proximity to the Minotaur, the
-        # counter is set to 0
-        if growl_sound_counter >= 120 or not minotaur.is_close(player.get_x_position(), player.get_y_position()):
-            growl_sound_counter = 0
-            
-        # Increase the time tracker by 1 every iteration of the game loop
-        time_tracker += 1
-          
-        # Reduces the grace period timer by one second every 30 frames
-        grace_period_countdown = 15 - int(time_tracker/30)
-        countdown.decrease_time(grace_period_countdown)
+        # The Player and the Minotaur are drawn between their positions on the last
+        # two ticks, by the fraction of a tick that has elapsed since the last one
+        allSprites.update(accumulator / TICK_MS)
+        hud.update()
         
-        # Checks if the countdown timer has hit 0
-        if countdown.get_time() <= 0:
-            
-            # Specifies the same blocks that can be killed by the Flag can_disappear
-            # and sets them to 0 in order to FUNCTIONALLY update them and make them
-            # invisible - These blocks are the tiles surrounding the Minotaur within
-            # His contained center space
-            maze_arrangement[6][8] = 0
-            maze_arrangement[7][6] = 0
-            maze_arrangement[8][9] = 0
-            
-        # Call the Minotaur follow algorithm, that takes the player's x and y position
-        minotaur.follow_player(player.get_x_position(), player.get_y_position())  
+        # The lit circle stays on the Player, who stays in the middle of the window
+        # unless the camera has reached an edge of the maze
+        camera.follow(player.get_center_position())
+        offset = camera.get_offset()
+        player_x, player_y = player.get_center_position()
+        visible_area.set_center((player_x - offset[0], player_y - offset[1]))
+        visible_area.update()
+        profiler.mark("update")
         
-        visible_area.set_center(player.get_center_position())
-                        
-        # REFRESH SCREEN ====================ss===================================
-        allSprites.clear(screen, background)
-        allSprites2.clear(screen, background)
-        allSprites.update()
-        allSprites2.update()
-        allSprites.draw(screen)
+        if sim.is_blackout():
+            visible_off.draw(screen)  # Exibir a tela preta cobrindo tudo
+        else:
+            # Only the maze and the sprites inside the lit circle are redrawn, and
+            # the darkness around it is filled in afterwards
+            src.labyrinthRender.draw_visible_world(screen, wall_layer, allSprites,
+                                                   visible_area.get_lit_rect(), offset)
+            if horde:
+                horde.draw(screen, visible_area.get_lit_rect(), offset, accumulator / TICK_MS)
+            profiler.mark("world")
+            dirty_tracker.add(visible_area.draw(screen))
+        profiler.mark("vision")
         
-        if light_state:
-            screen.blit(vision_off, (0, 0))  # Exibir a imagem preta cobrindo tudo
-            
-        if not light_state:  # Só apagar se a lanterna estiver ligada
-            if random.randint(1, random_chance) == 1:
-                light_state = True
-                shock.play()
+        dirty_tracker.add_rects(hud.draw(screen))
+        profiler.mark("hud")
         
-        allSprites2.draw(screen)
+        overlay_rect = profiler.draw(screen)
+        if overlay_rect:
+            dirty_tracker.add(overlay_rect)
         
         # Atualizar a tela
-        pygame.display.flip() 
+        dirty_tracker.present()
+        profiler.mark("present")
+        profiler.end_frame()
+        
+        # The game can be played from its first frame on
+        if startup_timer:
+            startup_timer.mark("playable")
+            startup_timer.report()
+            startup_timer = None
     
     # Display a "Game Over" message and unhide the mouse pointer    
     #screen.blit(game_over_message, (0, 0))
     pygame.display.flip()
     pygame.mouse.set_visible(True) 
     #pygame.time.wait(2000)
+    profiler.write_csv()
+    save_replay(recording)
         
-    return False, 0
+    return False, 0, None
 
-def save_user_name(screen):
+def save_user_name(screen, leaderboard, score):
+    """This function asks the survivor for their name, and records it on the
+    leaderboard with the score of their game, a tuple (seconds, lives, seed). The
+    score is written by the leaderboard's own thread, so the screen never waits for
+    the disk. It returns the score tuple recorded, or None if the window was closed."""
     # DISPLAY ==================================================================
-    background = pygame.image.load("./misc/MiscImages/Player_Name_Screen.jpg")
+    background = src.labyrinthAssets.load_image("./misc/MiscImages/Player_Name_Screen.jpg")
     screen.blit(background, (0, 0))    
         
     # ENTITIES ================================================================= 
-    survivors_file = open("survivors.txt", "a")
-    
     player_name = " "
     
-    survivor_font = pygame.font.Font("./misc/Fonts/PressStart2P.ttf", 18)
+    survivor_font = src.labyrinthAssets.load_font("./misc/Fonts/PressStart2P.ttf", 18)
     
     text = survivor_font.render(player_name, 1, (255, 255, 255))
     text_rect = text.get_rect()
     
     text_rect.center = (400, 400)
     
+    # The name screen is presented once, and message holds the name on display
+    drawn_rect = screen.blit(text, text_rect)
+    pygame.display.flip()
     message = player_name
     
     # ASSIGN ===================================================================
@@ -414,38 +503,113 @@ def save_user_name(screen):
         # EVENT HANDLING =======================================================
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                keepGoing = False
-                return False, 0
+                return None
             elif event.type == pygame.KEYDOWN:
                 if event.unicode.isalpha():
                     player_name += event.unicode
                 elif event.key == pygame.K_BACKSPACE:
                     player_name = player_name[:-1]
-                    screen.blit(background, (0, 0))
-                elif event.key == pygame.K_RETURN:
-                    survivors_file.write(str(player_name))
-                    keepGoing = False
+                elif event.key == pygame.K_RETURN and player_name.strip():
+                    keep_going = False
                 
         # REFRESH SCREEN ===========================================================
-        text = survivor_font.render(player_name, 1, (255, 255, 255))
-        screen.blit(text, text_rect)
-        pygame.display.flip()
+        # The name is only redrawn, and pushed to the display, when it changes
+        if player_name != message:
+            screen.blit(background, drawn_rect, drawn_rect)
+            text = survivor_font.render(player_name, 1, (255, 255, 255))
+            new_rect = screen.blit(text, text_rect)
+            pygame.display.update(drawn_rect.union(new_rect))
+            drawn_rect = new_rect
+            message = player_name
         
-    survivors_file.close()
+    return leaderboard.record(player_name.strip(), *score)
+
+def show_leaderboard(screen, leaderboard, highlight=None):
+    """This function shows the best scores of the leaderboard until a key is pressed,
+    or END_SCREEN_SECONDS have passed. It accepts the score tuple to highlight, the
+    one just recorded, as a parameter. It returns False if the window was closed."""
+    # DISPLAY ==================================================================
+    background = src.labyrinthAssets.load_image("./misc/MiscImages/Player_Name_Screen.jpg")
+    screen.blit(background, (0, 0))
+    
+    # The question of the name screen is covered by the panel of scores
+    panel = pygame.Surface((700, 560), pygame.SRCALPHA)
+    panel.fill((0, 0, 0, 245))
+    panel_rect = screen.blit(panel, panel.get_rect(center=(400, 400)))
+    
+    # ENTITIES ================================================================= 
+    title = src.labyrinthAssets.render_text("./misc/Fonts/PressStart2P.ttf", 24, "SURVIVORS", (255, 255, 255))
+    screen.blit(title, title.get_rect(midtop=(400, panel_rect.top + 30)))
+    
+    row_top = panel_rect.top + 100
+    for rank, score in enumerate(leaderboard.top(src.labyrinthLeaderboard.TOP_SIZE)):
+        name, seconds, lives = score[:3]
+        colour = (255, 215, 0) if score == highlight else (255, 255, 255)
+        minutes, seconds = divmod(int(seconds), 60)
+        row = "%2d %-12s %2d:%02d %s" % (rank + 1, name[:12], minutes, seconds, "*" * lives)
+        row_image = src.labyrinthAssets.render_text("./misc/Fonts/PressStart2P.ttf", 16, row, colour)
+        screen.blit(row_image, (panel_rect.left + 40, row_top + rank * 42))
+    pygame.display.flip()
+    
+    # LOOP =====================================================================
+    clock = pygame.time.Clock()
+    shown_time = pygame.time.get_ticks()
+    while pygame.time.get_ticks() - shown_time < END_SCREEN_SECONDS * 1000:
+        clock.tick(30)
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            elif event.type == pygame.KEYDOWN:
+                return True
+    return True
     
 def main():
     
+    pygame.display.init()
     pygame.display.set_caption("Minotaur Labyrinth")
     screen = pygame.display.set_mode((800, 800))
     
-    status = game_instructions(screen)
+    startup_timer = src.labyrinthProfiler.StartupTimer(START_TIME)
+    
+    # The leaderboard's database is opened by its own thread, while the introduction
+    # screen is shown
+    leaderboard = src.labyrinthLeaderboard.Leaderboard()
     
-    if status:
-        game_ended, user_survived = game(screen)
+    # A new game starts from the introduction screen after each one, with Pygame and
+    # the asset cache kept as they are, until the window is closed
+    keep_playing = True
+    while keep_playing:
+        preloader = src.labyrinthAssets.Preloader(GAME_IMAGES, GAME_SOUNDS, GAME_FONTS)
+        status = game_instructions(screen, preloader, startup_timer)
+        keep_playing = False
         
-    if user_survived:
-        save_user_name(screen)
+        if status:
+            # Whatever the preloader has not loaded yet is loaded now, before the game
+            # starts, rather than one asset at a time as the game asks for them
+            press_time = time.perf_counter()
+            preloader.wait()
+            if startup_timer:
+                startup_timer.mark("preloaded in", preloader.get_load_time())
+                startup_timer.mark("waited after SPACE", time.perf_counter() - press_time)
+            game_ended, user_survived, score = game(screen, startup_timer)
+            keep_playing = game_ended
+            
+            if user_survived:
+                recorded = save_user_name(screen, leaderboard, score)
+                keep_playing = bool(recorded) and show_leaderboard(screen, leaderboard, recorded)
+        
+        # Only the first game's startup is timed
+        startup_timer = None
     
-    pygame.quit()
+    # The scores still waiting are written before the game closes
+    leaderboard.close()
+    src.labyrinthAssets.quit_pygame()
 
-    main()
+def play_replay(replay, start_tick=0):
+    """This function plays a Replay on screen, from start_tick on, without the
+    introduction screen and without recording it again."""
+    pygame.init()
+    pygame.display.set_caption("Minotaur Labyrinth - Replay")
+    screen = pygame.display.set_mode((800, 800))
+    game(screen, replay=replay, start_tick=start_tick)
+    src.labyrinthAssets.quit_pygame()
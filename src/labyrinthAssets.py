@@ -0,0 +1,501 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the asset cache used by the "Minotaur Labyrinth" game.
+             Every image, font and sound is loaded from disk only once, converted to the
+             display's pixel format, and then handed out as a shared reference to every
+             sprite that asks for it.
+
+             The sounds are kept in a SoundBank, which decodes each file once and sets
+             the volume on the channel of each playback, so a sound shared at several
+             volumes is held in memory only once. The decoded audio is kept within a
+             memory budget, by evicting the sounds that were played the longest ago,
+             and the decoded bytes of every sound are reported.
+
+             Surfaces built at run time, such as rendered text and the heart strip of
+             the HUD, are kept in a small keyed cache, so they are only built again
+             when the value they show changes to one that has not been seen lately.
+
+             The Preloader reads the game's assets on a background thread while the
+             player reads the introduction screen, rather than after they press SPACE.
+             The thread only reads files and decodes images into plain surfaces; the
+             fonts and sounds are made, and the images converted for the display, on
+             the main thread when the game waits for the Preloader.
+
+             The fonts, sounds and music of the cache belong to the Pygame modules they
+             were loaded by, and cannot be used once Pygame has been quit, so the cache
+             is emptied by quit_pygame() before Pygame is quit. It imports the
+             Collections, IO, OS, Pygame, Threading and Time modules.
+"""
+
+import collections, io, os, pygame, threading, time
+
+# The most bytes of decoded audio kept by the SoundBank, which can be changed with the
+# LABYRINTH_SOUND_BUDGET_MB environment variable. Every sound of the game, decoded for
+# a 44.1 kHz stereo mixer, takes about 3 MB
+SOUND_BUDGET_VARIABLE = "LABYRINTH_SOUND_BUDGET_MB"
+SOUND_BUDGET_BYTES = 8 * 1024 * 1024
+
+# The most surfaces built at run time that are kept, e.g. rendered text. The HUD only
+# shows a few dozen different values in a game
+SURFACE_CACHE_SIZE = 64
+
+def get_sound_budget():
+    """This function returns the memory budget of the decoded audio in bytes, read
+    from the LABYRINTH_SOUND_BUDGET_MB environment variable if it is set."""
+    megabytes = os.environ.get(SOUND_BUDGET_VARIABLE)
+    if megabytes:
+        return int(float(megabytes) * 1024 * 1024)
+    return SOUND_BUDGET_BYTES
+
+class SoundBank(object):
+    """This class represents the decoded sounds of the game, keyed by their file path,
+    kept within a memory budget. The sounds are ordered from the one used the longest
+    ago to the one used last, which is the order they are evicted in."""
+    def __init__(self, budget_bytes=None):
+        """This method instantiates the SoundBank class. It accepts the most bytes of
+        decoded audio to keep (read by get_sound_budget() if None) as a parameter."""
+        if budget_bytes is None:
+            budget_bytes = get_sound_budget()
+        self.__budget_bytes = budget_bytes
+        self.__sounds = collections.OrderedDict()
+        self.__decoded_bytes = {}
+        self.__total_bytes = 0
+        self.__lock = threading.RLock()
+
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def get(self, path, data=None):
+        """This accessor method returns the sound stored at path, decoding it if it is
+        not in the bank, and marks it as the sound used last. It accepts the path, and
+        optionally the bytes of the file already read from it, as parameters. Since
+        the Sound object is shared, its own volume is left at 1.0; the volume of each
+        playback is set on its channel by play()."""
+        with self.__lock:
+            if path in self.__sounds:
+                self.__hits += 1
+                self.__sounds.move_to_end(path)
+                return self.__sounds[path]
+
+            self.__misses += 1
+            sound = pygame.mixer.Sound(io.BytesIO(data) if data is not None else path)
+            self.__sounds[path] = sound
+            self.__decoded_bytes[path] = memoryview(sound).nbytes
+            self.__total_bytes += self.__decoded_bytes[path]
+            self.__enforce_budget()
+            return sound
+
+    def play(self, path, volume=1.0, loops=0):
+        """This method plays the sound stored at path at the given volume, from 0.0 to
+        1.0, and returns the Channel it plays on, or None if every channel is busy."""
+        channel = self.get(path).play(loops)
+        if channel:
+            channel.set_volume(volume)
+        return channel
+
+    def __enforce_budget(self):
+        """This helper method evicts the sounds used the longest ago until the decoded
+        audio fits in the budget. A sound that is playing, or the one just decoded, is
+        never evicted, so the budget may be exceeded while they are all in use."""
+        for path in list(self.__sounds)[:-1]:
+            if self.__total_bytes <= self.__budget_bytes:
+                return
+            if self.__sounds[path].get_num_channels() == 0:
+                self.__evict(path)
+
+    def __evict(self, path):
+        """This helper method removes the sound stored at path from the bank. Its
+        memory is freed once no sprite or channel refers to it any more."""
+        del self.__sounds[path]
+        self.__total_bytes -= self.__decoded_bytes.pop(path)
+        self.__evictions += 1
+
+    def set_budget(self, budget_bytes):
+        """This mutator method changes the memory budget of the decoded audio, and
+        evicts sounds until it is met."""
+        with self.__lock:
+            self.__budget_bytes = budget_bytes
+            self.__enforce_budget()
+
+    def get_budget(self):
+        """This accessor method returns the memory budget of the decoded audio in bytes."""
+        return self.__budget_bytes
+
+    def has_sound(self, path):
+        """This accessor method returns True if the sound stored at path is decoded."""
+        with self.__lock:
+            return path in self.__sounds
+
+    def get_decoded_bytes(self):
+        """This accessor method returns a dictionary mapping the path of each sound in
+        the bank to the bytes of its decoded audio."""
+        with self.__lock:
+            return dict(self.__decoded_bytes)
+
+    def get_total_bytes(self):
+        """This accessor method returns the bytes of decoded audio held by the bank."""
+        return self.__total_bytes
+
+    def get_stats(self):
+        """This accessor method returns a dictionary containing the hit, miss and
+        eviction counts of the bank, its number of sounds, its decoded bytes and its
+        budget."""
+        with self.__lock:
+            return {"sound_hits": self.__hits,
+                    "sound_misses": self.__misses,
+                    "sound_evictions": self.__evictions,
+                    "sounds": len(self.__sounds),
+                    "sound_bytes": self.__total_bytes,
+                    "sound_budget": self.__budget_bytes}
+
+    def clear(self):
+        """This mutator method empties the bank and resets its counters."""
+        with self.__lock:
+            self.__sounds.clear()
+            self.__decoded_bytes.clear()
+            self.__total_bytes = 0
+            self.__hits = 0
+            self.__misses = 0
+            self.__evictions = 0
+
+class AssetCache(object):
+    """This class represents a registry of loaded images, fonts and sounds, keyed
+    by their file path (and size, for fonts)."""
+    def __init__(self, sound_bank=None):
+        """This method instantiates the AssetCache class, and creates the empty
+        dictionaries that hold each kind of asset, along with the hit and miss
+        counters used to report the effectiveness of the cache. It accepts the
+        SoundBank that holds the sounds (a new one if None) as a parameter."""
+        self.__images = {}
+        self.__fonts = {}
+        self.__sounds = sound_bank or SoundBank()
+        self.__surfaces = collections.OrderedDict()
+        self.__music_path = None
+
+        # The cache is filled by the Preloader's thread while the game reads from it,
+        # so every lookup and load holds this lock
+        self.__lock = threading.RLock()
+
+        # Images loaded before the display mode was set cannot be converted yet,
+        # so their paths are remembered and they are converted on their next request
+        self.__unconverted = set()
+
+        self.__hits = 0
+        self.__misses = 0
+
+        # The number of times the cache has been emptied, which tells the assets read
+        # for an earlier initialization of Pygame from the current ones
+        self.__generation = 0
+
+    def __convert(self, path, image):
+        """This helper method converts an image to the pixel format of the display,
+        keeping per-pixel alpha for the images that have it. It accepts the path and
+        the image as parameters, and returns the converted image."""
+
+        # Conversion requires a display surface, so the image is left as it is
+        # until pygame.display.set_mode() has been called
+        if pygame.display.get_surface() is None:
+            self.__unconverted.add(path)
+            return image
+
+        self.__unconverted.discard(path)
+        if image.get_flags() & pygame.SRCALPHA:
+            return image.convert_alpha()
+        return image.convert()
+
+    def get_image(self, path, source=None):
+        """This accessor method returns the image stored at path, loading and
+        converting it the first time it is requested. It accepts the path, and
+        optionally the unconverted image already loaded from it, as parameters."""
+        with self.__lock:
+            return self.__get_image(path, source)
+
+    def __get_image(self, path, source):
+        """This helper method returns the image stored at path, while the lock is held."""
+        if path in self.__images:
+            self.__hits += 1
+            if path in self.__unconverted:
+                self.__images[path] = self.__convert(path, self.__images[path])
+            return self.__images[path]
+
+        self.__misses += 1
+        if source is None:
+            source = pygame.image.load(path)
+        self.__images[path] = self.__convert(path, source)
+        return self.__images[path]
+
+    def has_image(self, path):
+        """This accessor method returns True if the image stored at path is loaded."""
+        with self.__lock:
+            return path in self.__images
+
+    def get_font(self, path, size, data=None):
+        """This accessor method returns the font stored at path with the given
+        point size, loading it the first time it is requested. It accepts the path,
+        the size, and optionally the bytes of the file already read from it, as
+        parameters."""
+        with self.__lock:
+            return self.__get_font(path, size, data)
+
+    def __get_font(self, path, size, data):
+        """This helper method returns the font stored at path with the given point
+        size, while the lock is held."""
+        key = (path, size)
+        if key in self.__fonts:
+            self.__hits += 1
+            return self.__fonts[key]
+
+        self.__misses += 1
+        self.__fonts[key] = pygame.font.Font(io.BytesIO(data) if data is not None else path, size)
+        return self.__fonts[key]
+
+    def has_font(self, path, size):
+        """This accessor method returns True if the font stored at path is loaded in
+        the given point size."""
+        with self.__lock:
+            return (path, size) in self.__fonts
+
+    def get_surface(self, key, build):
+        """This accessor method returns the surface stored under key, calling build()
+        to make it the first time it is requested. Only the SURFACE_CACHE_SIZE
+        surfaces used last are kept."""
+        with self.__lock:
+            if key in self.__surfaces:
+                self.__hits += 1
+                self.__surfaces.move_to_end(key)
+                return self.__surfaces[key]
+
+            self.__misses += 1
+            self.__surfaces[key] = build()
+            if len(self.__surfaces) > SURFACE_CACHE_SIZE:
+                self.__surfaces.popitem(last=False)
+            return self.__surfaces[key]
+
+    def get_text(self, path, size, text, colour=(255, 255, 255)):
+        """This accessor method returns text rendered, antialiased, in colour with the
+        font stored at path in the given point size, rendering it the first time it
+        is requested."""
+        font = self.get_font(path, size)
+        return self.get_surface(("text", path, size, text, colour), lambda: font.render(text, 1, colour))
+
+    def get_sound(self, path, data=None):
+        """This accessor method returns the sound stored at path from the SoundBank,
+        decoding it (from data, the bytes of its file, if given) if it is not there.
+        Since the Sound object is shared, callers should play it through
+        play_sound(), which sets the volume on the channel, rather than setting the
+        volume of the Sound itself."""
+        return self.__sounds.get(path, data)
+
+    def play_sound(self, path, volume=1.0, loops=0):
+        """This method plays the sound stored at path at the given volume, and returns
+        the Channel it plays on, or None if every channel is busy."""
+        return self.__sounds.play(path, volume, loops)
+
+    def get_sound_bank(self):
+        """This accessor method returns the SoundBank that holds the sounds."""
+        return self.__sounds
+
+    def load_music(self, path):
+        """This mutator method loads the music stored at path into the mixer's music
+        stream, unless it is already loaded. There is only one music stream, so this
+        only remembers the last music loaded."""
+        with self.__lock:
+            if path == self.__music_path:
+                self.__hits += 1
+                return
+
+            self.__misses += 1
+            pygame.mixer.music.load(path)
+            self.__music_path = path
+
+    def get_generation(self):
+        """This accessor method returns the number of times the cache has been
+        emptied."""
+        return self.__generation
+
+    def get_stats(self):
+        """This accessor method returns a dictionary containing the hit and miss
+        counts of the cache, the number of assets of each kind, and the memory held
+        by the cached images and decoded sounds, in bytes. The hit and miss counts of
+        the sounds are kept apart, along with their evictions and budget."""
+        with self.__lock:
+            return self.__get_stats()
+
+    def __get_stats(self):
+        """This helper method returns the statistics of the cache, while the lock is
+        held."""
+        image_bytes = 0
+        for image in self.__images.values():
+            image_bytes += image.get_pitch() * image.get_height()
+
+        stats = {"hits": self.__hits,
+                 "misses": self.__misses,
+                 "images": len(self.__images),
+                 "fonts": len(self.__fonts),
+                 "surfaces": len(self.__surfaces),
+                 "image_bytes": image_bytes}
+        stats.update(self.__sounds.get_stats())
+        return stats
+
+    def clear(self):
+        """This mutator method empties the cache and resets its counters."""
+        with self.__lock:
+            self.__images.clear()
+            self.__fonts.clear()
+            self.__sounds.clear()
+            self.__surfaces.clear()
+            self.__music_path = None
+            self.__unconverted.clear()
+            self.__hits = 0
+            self.__misses = 0
+            self.__generation += 1
+
+class Preloader(object):
+    """This class represents a background thread that reads a list of assets from
+    disk before they are needed, and adds them to an AssetCache once the game waits
+    for it."""
+    def __init__(self, images=(), sounds=(), fonts=(), asset_cache=None):
+        """This method instantiates the Preloader class. It accepts the paths of the
+        images and sounds, the (path, size) pairs of the fonts and the AssetCache to
+        fill (the shared cache if None), as parameters."""
+        self.__cache = asset_cache or cache
+        self.__images = list(images)
+        self.__sounds = list(sounds)
+        self.__fonts = list(fonts)
+        self.__thread = None
+        self.__generation = None
+        self.__load_time = None
+        self.__error = None
+
+        # The unconverted images and the bytes of the sound and font files read by the
+        # thread, by their path
+        self.__read_images = {}
+        self.__read_files = {}
+
+    def start(self):
+        """This mutator method starts reading the assets on a daemon thread, so that
+        a game closed before it has finished does not wait for it. The assets already
+        in the cache are left out."""
+        if self.__thread is None:
+            asset_cache = self.__cache
+            self.__images = [path for path in self.__images if not asset_cache.has_image(path)]
+            self.__sounds = [path for path in self.__sounds if not asset_cache.get_sound_bank().has_sound(path)]
+            self.__fonts = [(path, size) for path, size in self.__fonts if not asset_cache.has_font(path, size)]
+            self.__generation = asset_cache.get_generation()
+            self.__thread = threading.Thread(target=self.__run, name="asset preloader", daemon=True)
+            self.__thread.start()
+
+    def __run(self):
+        """This helper method reads every asset, and records how long it took. It
+        makes no call that needs the display, the mixer or the font module, none of
+        which may be used from another thread. An asset that fails to load stops the
+        preloading; the error is kept, and raised again by the game when it loads
+        that asset itself."""
+        begin = time.perf_counter()
+        try:
+            for path in self.__images:
+                self.__read_images[path] = pygame.image.load(path)
+            for path in self.__sounds + [path for path, size in self.__fonts]:
+                if path not in self.__read_files:
+                    with open(path, "rb") as asset_file:
+                        self.__read_files[path] = asset_file.read()
+        except (pygame.error, OSError) as error:
+            self.__error = error
+        self.__load_time = time.perf_counter() - begin
+
+    def __install(self):
+        """This helper method adds every asset read by the thread to the cache, on the
+        calling thread, unless the cache has been emptied since the thread started:
+        its fonts and sounds would then belong to a Pygame that has been quit."""
+        asset_cache = self.__cache
+        if asset_cache.get_generation() == self.__generation:
+            for path, image in self.__read_images.items():
+                asset_cache.get_image(path, image)
+            for path in self.__sounds:
+                if path in self.__read_files:
+                    asset_cache.get_sound(path, self.__read_files[path])
+            for path, size in self.__fonts:
+                if path in self.__read_files:
+                    asset_cache.get_font(path, size, self.__read_files[path])
+        self.__read_images.clear()
+        self.__read_files.clear()
+
+    def is_done(self):
+        """This accessor method returns True once every asset has been read."""
+        return self.__load_time is not None
+
+    def wait(self, timeout=None):
+        """This method blocks until every asset has been read, or timeout seconds have
+        passed, and returns True if the preloading has finished. The assets read are
+        then added to the cache, so it must be called from the main thread, with the
+        display mode set and the mixer and the font module initialized. The
+        preloading is started first if it has not been already."""
+        self.start()
+        self.__thread.join(timeout)
+        if not self.is_done():
+            return False
+        self.__install()
+        return True
+
+    def get_load_time(self):
+        """This accessor method returns the number of seconds it took to read every
+        asset, or None if the preloading has not finished."""
+        return self.__load_time
+
+    def get_error(self):
+        """This accessor method returns the error that stopped the preloading, or None
+        if every asset was read."""
+        return self.__error
+
+# The single cache shared by every module of the game
+cache = AssetCache()
+
+def load_image(path):
+    """This function returns the shared, converted image stored at path."""
+    return cache.get_image(path)
+
+def load_font(path, size):
+    """This function returns the shared font stored at path with the given size."""
+    return cache.get_font(path, size)
+
+def render_text(path, size, text, colour=(255, 255, 255)):
+    """This function returns the shared surface of text rendered in colour with the
+    font stored at path in the given size."""
+    return cache.get_text(path, size, text, colour)
+
+def get_surface(key, build):
+    """This function returns the shared surface stored under key, built by build()
+    the first time it is requested."""
+    return cache.get_surface(key, build)
+
+def load_sound(path):
+    """This function returns the shared sound stored at path."""
+    return cache.get_sound(path)
+
+def play_sound(path, volume=1.0, loops=0):
+    """This function plays the shared sound stored at path at the given volume, and
+    returns the Channel it plays on, or None if every channel is busy."""
+    return cache.play_sound(path, volume, loops)
+
+def get_sound_bytes():
+    """This function returns a dictionary mapping the path of each decoded sound to
+    the bytes of its decoded audio."""
+    return cache.get_sound_bank().get_decoded_bytes()
+
+def load_music(path):
+    """This function loads the music stored at path into the mixer, once."""
+    cache.load_music(path)
+
+def get_stats():
+    """This function returns the statistics of the shared asset cache."""
+    return cache.get_stats()
+
+def quit_pygame():
+    """This function empties the shared asset cache, then quits Pygame. Every call to
+    pygame.quit() goes through it, so that no font, sound or music of a previous
+    initialization of Pygame is handed out after Pygame is initialized again."""
+    cache.clear()
+    pygame.quit()
@@ -0,0 +1,154 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the texture atlases of the "Minotaur Labyrinth" game.
+             Every frame of a character's animations is packed into one sheet, so the
+             game opens and decodes a single image per character rather than one per
+             frame. The sheet is converted to the display's pixel format once, and each
+             frame is a subsurface of it: a view into the sheet's pixels rather than a
+             copy, so the frames of a character stay together in memory.
+
+             The frames of a sheet are described by a small JSON manifest next to it,
+             which gives the sheet's file and the rect (x, y, width, height) of each
+             frame, named after the image it was packed from. The sheets are packed from
+             the loose images of each character at build time. Run it from the root of
+             the repository after changing any of them:
+                 python -m src.labyrinthAtlas build
+
+             It imports the Glob, JSON, Math, OS, Sys and Threading modules, the Pygame
+             module and the labyrinthAssets module, whose cache holds the sheets.
+"""
+
+import glob, json, math, os, sys, threading
+import pygame, src.labyrinthAssets
+
+# The manifests of the atlases of the Player and the Minotaur
+PLAYER_ATLAS = "./misc/PlayerImages/player_atlas.json"
+MINOTAUR_ATLAS = "./misc/MinotaurImages/minotaur_atlas.json"
+
+# The loose images packed into each atlas by build()
+ATLAS_SOURCES = {PLAYER_ATLAS: "./misc/PlayerImages/*_face_*.png",
+                 MINOTAUR_ATLAS: "./misc/MinotaurImages/minotaur_*_*.png"}
+
+# The transparent pixels left between two frames of a sheet, so that a frame scaled or
+# rotated never bleeds into its neighbours
+PADDING = 1
+
+class TextureAtlas(object):
+    """This class represents a sheet of frames, each of which is handed out as a
+    subsurface of the sheet."""
+    def __init__(self, image, frames):
+        """This method instantiates the TextureAtlas class. It accepts the image of the
+        sheet, already converted for the display, and a dictionary mapping the name of
+        each frame to its rect (x, y, width, height) in the sheet, as parameters."""
+        self.__image = image
+        self.__frames = {name: image.subsurface(pygame.Rect(rect)) for name, rect in frames.items()}
+
+    def get_frame(self, name):
+        """This accessor method returns the subsurface of the frame called name. The
+        same subsurface is returned on every call."""
+        return self.__frames[name]
+
+    def get_names(self):
+        """This accessor method returns the sorted list of the names of the frames."""
+        return sorted(self.__frames)
+
+    def get_image(self):
+        """This accessor method returns the image of the whole sheet."""
+        return self.__image
+
+def read_manifest(manifest_path):
+    """This function reads the manifest stored at manifest_path, and returns a tuple of
+    the path of its sheet and the dictionary mapping each frame to its rect."""
+    with open(manifest_path) as manifest_file:
+        manifest = json.load(manifest_file)
+    image_path = os.path.join(os.path.dirname(manifest_path), manifest["image"])
+    return image_path, {name: tuple(rect) for name, rect in manifest["frames"].items()}
+
+# The atlases loaded so far, by the path of their manifest. The lock keeps a sheet from
+# being cut up twice when two threads ask for it at once
+atlases = {}
+atlas_lock = threading.Lock()
+
+def load_atlas(manifest_path):
+    """This function returns the shared TextureAtlas described by the manifest stored
+    at manifest_path. Its sheet is loaded through the asset cache the first time, so
+    the Preloader can decode it ahead of time."""
+    with atlas_lock:
+        if manifest_path not in atlases:
+            image_path, frames = read_manifest(manifest_path)
+            atlases[manifest_path] = TextureAtlas(src.labyrinthAssets.load_image(image_path), frames)
+        return atlases[manifest_path]
+
+def get_sheet_path(manifest_path):
+    """This function returns the path of the sheet of the manifest stored at
+    manifest_path, e.g. to preload it."""
+    return read_manifest(manifest_path)[0]
+
+def pack(images, padding=PADDING):
+    """This function packs the frames of a sheet, and returns a tuple of its size
+    (width, height) and a dictionary mapping the name of each frame to its rect. It
+    accepts a dictionary mapping the name of each frame to its size (width, height),
+    and the padding between two frames, as parameters.
+
+    The frames are laid out on shelves, tallest first, in a sheet about as wide as it
+    is tall; the frames of a character are all about the same height, so little of
+    the sheet is left empty."""
+    area = sum((width + padding) * (height + padding) for width, height in images.values())
+    sheet_width = max(max(width for width, height in images.values()) + padding,
+                      int(math.ceil(math.sqrt(area))))
+
+    frames = {}
+    x = y = shelf_height = 0
+    for name in sorted(images, key=lambda name: (-images[name][1], name)):
+        width, height = images[name]
+        if x + width > sheet_width:
+            x = 0
+            y += shelf_height + padding
+            shelf_height = 0
+        frames[name] = (x, y, width, height)
+        x += width + padding
+        shelf_height = max(shelf_height, height)
+
+    used_width = max(frame_x + width for frame_x, frame_y, width, height in frames.values())
+    return (used_width, y + shelf_height), frames
+
+def build_atlas(image_paths, manifest_path, padding=PADDING):
+    """This function packs the images stored at image_paths into one sheet, and writes
+    the sheet as a PNG image and its manifest next to each other. The sheet is named
+    after the manifest, and each frame after the file of its image. It returns the
+    dictionary mapping the name of each frame to its rect."""
+    images = {}
+    for path in image_paths:
+        images[os.path.splitext(os.path.basename(path))[0]] = pygame.image.load(path)
+    size, frames = pack({name: image.get_size() for name, image in images.items()}, padding)
+
+    # The frames are added onto the transparent sheet rather than blended, so that
+    # every pixel, and its alpha, is copied exactly
+    sheet = pygame.Surface(size, pygame.SRCALPHA, 32)
+    sheet.fill((0, 0, 0, 0))
+    for name, image in images.items():
+        sheet.blit(image, frames[name][:2], special_flags=pygame.BLEND_RGBA_ADD)
+
+    image_name = os.path.splitext(os.path.basename(manifest_path))[0] + ".png"
+    pygame.image.save(sheet, os.path.join(os.path.dirname(manifest_path), image_name))
+    # Each frame is written on a line of its own, so the changes to a sheet are easy
+    # to read in a diff
+    frame_lines = ["  %s: %s" % (json.dumps(name), json.dumps(list(rect))) for name, rect in sorted(frames.items())]
+    with open(manifest_path, "w") as manifest_file:
+        manifest_file.write('{\n "image": %s,\n "frames": {\n%s\n }\n}\n' %
+                            (json.dumps(image_name), ",\n".join(frame_lines)))
+    return frames
+
+def build():
+    """This function packs the loose images of every atlas in ATLAS_SOURCES."""
+    for manifest_path, pattern in ATLAS_SOURCES.items():
+        frames = build_atlas(sorted(glob.glob(pattern)), manifest_path)
+        print("%s: %d frames" % (manifest_path, len(frames)))
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["build"]:
+        print("usage: python -m src.labyrinthAtlas build")
+        sys.exit(2)
+    build()
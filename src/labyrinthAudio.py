@@ -0,0 +1,45 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the audio logic of the "Minotaur Labyrinth" game.
+             The ProximityMap decides how loudly the Minotaur's growl is heard by the
+             Player. The sound travels along the corridors of the maze rather than
+             through its walls, so the walking distance from the Minotaur's FlowField
+             is used, and the result is only recomputed when either of them changes
+             tile. It imports no modules.
+"""
+
+# The growl band heard at each walking distance, in tiles, from the Minotaur. Any
+# other distance is outside the audible range of the Minotaur
+CORRIDOR_BANDS = {2: "close", 3: "medium", 4: "far"}
+
+# The volume the growl is played at for each band
+GROWL_VOLUMES = {"close": 0.5, "medium": 0.25, "far": 0.1}
+
+class ProximityMap(object):
+    """This class represents the distance at which the Player hears the Minotaur,
+    measured through the corridors of the maze."""
+    def __init__(self, flow_field):
+        """This method instantiates the ProximityMap class. It accepts flow_field, the
+        FlowField towards the Player's tile that the Minotaur already follows, as a
+        parameter, so that no extra search of the maze is needed."""
+        self.__flow_field = flow_field
+        self.__cached_key = None
+        self.__cached_band = False
+
+    def get_band(self, minotaur_tile, player_tile):
+        """This accessor method returns the growl band ("close", "medium" or "far")
+        heard by the Player, or False if the Minotaur is out of earshot. It accepts
+        the tiles of the Minotaur and of the Player as (x, y) tuples. The band is
+        cached, and only looked up again when a tile or the field has changed."""
+        self.__flow_field.set_target(player_tile[0], player_tile[1])
+
+        # The recompute count changes whenever the field is rebuilt, which covers both
+        # the Player changing tile and walls being opened
+        key = (minotaur_tile, self.__flow_field.get_recompute_count())
+        if key != self.__cached_key:
+            distance = self.__flow_field.get_distance(minotaur_tile[0], minotaur_tile[1])
+            self.__cached_band = CORRIDOR_BANDS.get(distance, False)
+            self.__cached_key = key
+        return self.__cached_band
@@ -0,0 +1,208 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module is the balancing tool of the "Minotaur Labyrinth" game. It
+             plays headless games with a scripted Player across a pool of processes,
+             sweeping a grid of difficulty settings (the grace period, the movement
+             delay, the flashlight flicker chance and the number of lives) over many
+             seeds, and reports the win rate, time-to-death and time-to-win of each
+             setting as CSV or JSON.
+
+             Run it from the root of the repository, for example:
+                 python -m src.labyrinthBalance --grace-period 10 15 20 --seeds 200
+
+             It imports the Argparse, Concurrent.futures, CSV, Itertools, JSON, OS and
+             Sys modules, and the labyrinthSim and labyrinthPathing modules.
+"""
+
+import argparse, concurrent.futures, csv, itertools, json, os, sys
+import src.labyrinthSim, src.labyrinthPathing
+
+# The longest a game is played before it counts as a timeout: 5 minutes of game time
+MAX_TICKS = 5 * 60 * src.labyrinthSim.TICK_RATE
+
+# The corridor distance, in tiles, at which the scripted Player runs from the Minotaur
+FLEE_DISTANCE = 3
+
+# The columns of the report, in order
+REPORT_FIELDS = ("grace_period", "movement_delay", "flicker_chance", "lives", "games",
+                 "win_rate", "loss_rate", "timeout_rate", "mean_time_to_death",
+                 "mean_time_to_win")
+
+class ScriptedPlayer(object):
+    """This class represents a simple scripted Player. It walks to the nearest gear
+    piece, runs from the Minotaur when he gets close, and hunts him down once all
+    four pieces of gear have been collected."""
+    def __init__(self, sim):
+        """This method instantiates the ScriptedPlayer class. It accepts the LabyrinthSim
+        it plays, and builds one flow field towards its own tile, to measure distances,
+        and one towards the tile it is heading for."""
+        self.__sim = sim
+        maze_arrangement = sim.get_maze_arrangement()
+        self.__from_player = src.labyrinthPathing.FlowField(maze_arrangement)
+        self.__to_goal = src.labyrinthPathing.FlowField(maze_arrangement)
+        self.__gates_open = False
+
+    def get_actions(self):
+        """This method returns the actions of the Player for the next tick."""
+        sim = self.__sim
+
+        # The fields must be rebuilt once the gates of the Minotaur's chamber open
+        if not self.__gates_open and sim.get_countdown() <= 0:
+            self.__from_player.invalidate()
+            self.__to_goal.invalidate()
+            self.__gates_open = True
+
+        player_x, player_y = sim.get_player().get_tile_position()
+        minotaur_x, minotaur_y = sim.get_minotaur().get_tile_position()
+        self.__from_player.set_target(player_x, player_y)
+        minotaur_distance = self.__from_player.get_distance(minotaur_x, minotaur_y)
+        full_gear = sim.get_num_gear() == src.labyrinthSim.NUM_GEAR_PIECES
+
+        if full_gear:
+            goal = (minotaur_x, minotaur_y)
+
+        # Runs onto the neighbouring tile furthest from the Minotaur
+        elif minotaur_distance is not None and minotaur_distance <= FLEE_DISTANCE:
+            self.__to_goal.set_target(minotaur_x, minotaur_y)
+            best_direction, best_distance = None, minotaur_distance
+            for direction, x_offset, y_offset in src.labyrinthPathing.DIRECTIONS:
+                distance = self.__to_goal.get_distance(player_x + x_offset, player_y + y_offset)
+                if distance is not None and distance > best_distance:
+                    best_direction, best_distance = direction, distance
+            if best_direction:
+                return {best_direction}
+            return set()
+
+        # Heads for the nearest gear piece that can be reached
+        else:
+            goal = None
+            goal_distance = None
+            for x, y in sim.get_gear_pieces():
+                distance = self.__from_player.get_distance(x, y)
+                if distance is not None and (goal_distance is None or distance < goal_distance):
+                    goal, goal_distance = (x, y), distance
+            if goal is None:
+                return set()
+
+        self.__to_goal.set_target(goal[0], goal[1])
+        direction = self.__to_goal.next_step(player_x, player_y)
+        if direction:
+            return {direction}
+        return set()
+
+def play_game(settings, seed, max_ticks=MAX_TICKS):
+    """This function plays one headless game with the ScriptedPlayer. It accepts the
+    settings of the game as a dictionary of LabyrinthSim parameters, the seed and the
+    maximum number of ticks, and returns a dictionary with the result ("win", "lose"
+    or "timeout"), the number of ticks played and the ticks at which lives were lost."""
+    sim = src.labyrinthSim.LabyrinthSim(seed=seed, **settings)
+    player = ScriptedPlayer(sim)
+    death_ticks = []
+
+    while sim.get_result() is None and sim.get_tick() < max_ticks:
+        for event, detail in sim.step(player.get_actions()):
+            if event == "player_death":
+                death_ticks.append(sim.get_tick())
+
+    return {"result": sim.get_result() or "timeout",
+            "ticks": sim.get_tick(),
+            "death_ticks": death_ticks}
+
+def play_games(settings, seeds, max_ticks=MAX_TICKS):
+    """This function plays one game per seed with the same settings, and returns the
+    settings along with the list of results. A whole batch of seeds is played per
+    task, so that the processes spend their time playing rather than communicating."""
+    return settings, [play_game(settings, seed, max_ticks) for seed in seeds]
+
+def summarize(settings, results):
+    """This function returns one row of the report from the results of the games
+    played with the same settings. Times are in seconds of game time, and the rates
+    and means are None when there is nothing to average."""
+    games = len(results)
+    wins = [result for result in results if result["result"] == "win"]
+    losses = [result for result in results if result["result"] == "lose"]
+    deaths = [tick for result in results for tick in result["death_ticks"]]
+
+    row = dict(settings)
+    row["games"] = games
+    row["win_rate"] = None
+    row["loss_rate"] = None
+    row["timeout_rate"] = None
+    if games:
+        row["win_rate"] = len(wins) / games
+        row["loss_rate"] = len(losses) / games
+        row["timeout_rate"] = (games - len(wins) - len(losses)) / games
+    row["mean_time_to_death"] = None
+    row["mean_time_to_win"] = None
+    if deaths:
+        row["mean_time_to_death"] = sum(deaths) / len(deaths) / src.labyrinthSim.TICK_RATE
+    if wins:
+        row["mean_time_to_win"] = sum(result["ticks"] for result in wins) / len(wins) / src.labyrinthSim.TICK_RATE
+    return row
+
+def sweep(grid, num_seeds, workers=None, batch_size=25, max_ticks=MAX_TICKS):
+    """This function plays num_seeds games for every combination of the settings in
+    grid, a dictionary mapping each LabyrinthSim parameter to a list of values, over
+    a pool of worker processes (one per core if workers is None). It returns one
+    report row per combination, in the order of the grid."""
+    names = sorted(grid)
+    combinations = [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+    # Every combination is split into batches of seeds, so that the work is spread
+    # evenly over the processes however few combinations there are
+    tasks = []
+    for settings in combinations:
+        for first_seed in range(0, num_seeds, batch_size):
+            tasks.append((settings, range(first_seed, min(first_seed + batch_size, num_seeds))))
+
+    results = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(play_games, settings, seeds, max_ticks) for settings, seeds in tasks]
+        for future in concurrent.futures.as_completed(futures):
+            settings, batch = future.result()
+            results.setdefault(tuple(sorted(settings.items())), []).extend(batch)
+
+    return [summarize(settings, results[tuple(sorted(settings.items()))]) for settings in combinations]
+
+def write_report(rows, output, report_format):
+    """This function writes the report rows to output, a file object, as "csv" or "json"."""
+    if report_format == "json":
+        json.dump(rows, output, indent=2)
+        output.write("\n")
+    else:
+        writer = csv.DictWriter(output, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+def main(arguments=None):
+    parser = argparse.ArgumentParser(description="Sweep the difficulty settings of Minotaur Labyrinth "
+                                                 "over headless games with a scripted Player.")
+    parser.add_argument("--grace-period", type=int, nargs="+", default=[src.labyrinthSim.GRACE_PERIOD])
+    parser.add_argument("--movement-delay", type=int, nargs="+", default=[src.labyrinthSim.MOVEMENT_DELAY])
+    parser.add_argument("--flicker-chance", type=int, nargs="+", default=[src.labyrinthSim.FLICKER_CHANCE])
+    parser.add_argument("--lives", type=int, nargs="+", default=[src.labyrinthSim.STARTING_LIVES])
+    parser.add_argument("--seeds", type=int, default=100, help="games played per combination")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS)
+    parser.add_argument("--format", choices=("csv", "json"), default="csv")
+    parser.add_argument("--output", help="report file (standard output if omitted)")
+    arguments = parser.parse_args(arguments)
+    if arguments.seeds < 1:
+        parser.error("--seeds must be at least 1")
+
+    grid = {"grace_period": arguments.grace_period,
+            "movement_delay": arguments.movement_delay,
+            "flicker_chance": arguments.flicker_chance,
+            "lives": arguments.lives}
+    rows = sweep(grid, arguments.seeds, arguments.workers, max_ticks=arguments.max_ticks)
+
+    if arguments.output:
+        with open(arguments.output, "w", newline="") as output:
+            write_report(rows, output, arguments.format)
+    else:
+        write_report(rows, sys.stdout, arguments.format)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the leaderboard of the "Minotaur Labyrinth" game. The
+             scores of the players who escaped the maze are kept in a local SQLite
+             database: the player's name, the seconds of game time it took them to win,
+             the lives they had left and the seed of their game, so that the winning
+             game can be replayed.
+
+             Every score is written by a background thread, so the game never waits for
+             the disk: record() only puts the score on a queue. The scores are ranked by
+             an index on the time to win and the lives left, so the top of the
+             leaderboard is read without going through every score. The writer reads it
+             once the database is opened and after every write, and keeps a snapshot
+             of it, so that top() never touches the database: it merges the snapshot
+             with the scores still waiting to be written.
+
+             It imports the OS, Queue, SQLite3, Threading and Time modules.
+"""
+
+import os, queue, sqlite3, threading, time
+
+# The environment variable that chooses the database file, which is DEFAULT_DATABASE_PATH
+# if it is not set
+DATABASE_VARIABLE = "LABYRINTH_LEADERBOARD"
+DEFAULT_DATABASE_PATH = "leaderboard.db"
+
+# The number of scores shown by the end screen, and kept in the snapshot of the top of
+# the leaderboard
+TOP_SIZE = 10
+
+# The fastest wins come first, and the wins with more lives left come first among
+# equally fast ones
+SCHEMA = ("CREATE TABLE IF NOT EXISTS scores (id INTEGER PRIMARY KEY, name TEXT NOT NULL, "
+          "seconds REAL NOT NULL, lives INTEGER NOT NULL, seed INTEGER, recorded_at REAL NOT NULL)",
+          "CREATE INDEX IF NOT EXISTS scores_by_rank ON scores (seconds, lives DESC)")
+INSERT = "INSERT INTO scores (name, seconds, lives, seed, recorded_at) VALUES (?, ?, ?, ?, ?)"
+TOP_QUERY = ("SELECT name, seconds, lives, seed, recorded_at FROM scores "
+             "ORDER BY seconds, lives DESC LIMIT ?")
+
+def get_database_path():
+    """This function returns the path of the leaderboard's database, read from the
+    LABYRINTH_LEADERBOARD environment variable if it is set."""
+    return os.environ.get(DATABASE_VARIABLE) or DEFAULT_DATABASE_PATH
+
+def get_rank_key(score):
+    """This function returns the key the scores are sorted by, the same order as the
+    index of the database. It accepts a score tuple (name, seconds, lives, seed,
+    recorded_at) as a parameter."""
+    return score[1], -score[2]
+
+class Leaderboard(object):
+    """This class represents the leaderboard stored in a SQLite database, and the
+    background thread that writes its scores."""
+    def __init__(self, path=None, snapshot_size=TOP_SIZE):
+        """This method instantiates the Leaderboard class, and starts its writer thread,
+        which creates the database if it does not exist. It accepts the path of the
+        database (get_database_path() if None), and the number of the best scores
+        kept in the snapshot read by top(), as parameters."""
+        if path is None:
+            path = get_database_path()
+        self.__path = path
+        self.__snapshot_size = snapshot_size
+
+        # The best scores of the database, as of its last write, and the scores
+        # recorded but not yet committed. The writer changes both at once, while it
+        # holds the lock, so a score is always in exactly one of them
+        self.__snapshot = []
+        self.__pending = []
+        self.__lock = threading.Lock()
+
+        self.__queue = queue.Queue()
+        self.__loaded = threading.Event()
+        self.__written = 0
+
+        # An error opening the database leaves the queries with the pending scores
+        # only, while an error writing some scores is kept until a write succeeds
+        self.__open_error = None
+        self.__write_error = None
+        self.__thread = threading.Thread(target=self.__run, name="leaderboard writer", daemon=True)
+        self.__thread.start()
+
+    def __run(self):
+        """This helper method creates the database, then writes the scores put on the
+        queue until close() is called. The scores waiting on the queue together are
+        written in a single transaction. An error is kept and the score dropped, so
+        the game goes on without its leaderboard rather than stopping, and the scores
+        after it are still written."""
+        connection = None
+        snapshot = []
+        try:
+            connection = sqlite3.connect(self.__path)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            for statement in SCHEMA:
+                connection.execute(statement)
+            connection.commit()
+            snapshot = self.__read_top(connection)
+        except sqlite3.Error as error:
+            self.__open_error = error
+        with self.__lock:
+            self.__snapshot = snapshot
+        self.__loaded.set()
+
+        while True:
+            scores = [self.__queue.get()]
+            while True:
+                try:
+                    scores.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            closing = None in scores
+            scores = [score for score in scores if score is not None]
+
+            snapshot = None
+            if scores and connection is not None and self.__open_error is None:
+                try:
+                    with connection:
+                        connection.executemany(INSERT, scores)
+                    self.__written += len(scores)
+                    self.__write_error = None
+                    snapshot = self.__read_top(connection)
+                except sqlite3.Error as error:
+                    self.__write_error = error
+            # The scores are queued in the order they are pending, so the ones written
+            # are always the oldest pending ones
+            with self.__lock:
+                del self.__pending[:len(scores)]
+                if snapshot is not None:
+                    self.__snapshot = snapshot
+            for task in range(len(scores) + closing):
+                self.__queue.task_done()
+
+            if closing:
+                break
+        if connection is not None:
+            connection.close()
+
+    def __read_top(self, connection):
+        """This helper method returns the list of the best score tuples of the
+        database, read through connection, on the writer's thread."""
+        return [tuple(row) for row in connection.execute(TOP_QUERY, (self.__snapshot_size,))]
+
+    def record(self, name, seconds, lives, seed=None):
+        """This method records the score of a won game, without waiting for it to be
+        written, and returns the score tuple (name, seconds, lives, seed, recorded_at).
+        It accepts the player's name, the seconds of game time it took to win, the
+        lives left and the seed of the game as parameters."""
+        score = (name, float(seconds), int(lives), seed, time.time())
+        with self.__lock:
+            self.__pending.append(score)
+            self.__queue.put(score)
+        return score
+
+    def top(self, count=TOP_SIZE):
+        """This method returns the list of the count best score tuples (name, seconds,
+        lives, seed, recorded_at), best first, including the scores still waiting to
+        be written. It never waits for the database: it merges the snapshot of the
+        best scores written with the pending scores, so count may be at most the
+        snapshot's size. Until the writer has read the database (see flush()), only
+        the pending scores are returned."""
+        with self.__lock:
+            scores = self.__snapshot + self.__pending
+        scores.sort(key=get_rank_key)
+        return scores[:count]
+
+    def flush(self):
+        """This method blocks until the best scores of the database have been read, and
+        every score recorded so far has been written."""
+        self.__loaded.wait()
+        self.__queue.join()
+
+    def close(self):
+        """This method writes the scores still waiting, and stops the writer thread."""
+        if self.__thread.is_alive():
+            self.__queue.put(None)
+            self.__thread.join()
+
+    def get_path(self):
+        """This accessor method returns the path of the database."""
+        return self.__path
+
+    def get_written(self):
+        """This accessor method returns the number of scores written to the database."""
+        return self.__written
+
+    def get_error(self):
+        """This accessor method returns the error that kept the database from being
+        opened, or else the error of the last write if no write has succeeded since,
+        or None if the database is working."""
+        return self.__open_error or self.__write_error
@@ -0,0 +1,500 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the layouts of the mazes of the "Minotaur Labyrinth"
+             game. A MazeGrid stores every tile of a maze as one byte of flag bits in a
+             single contiguous bytearray (about 4 MB for a 2048x2048 maze), and can be
+             shared with NumPy and the renderer without being copied. A MazeLayout
+             holds the walls of a maze along with its spawn tiles, the Minotaur's
+             chamber and its gates, and the tiles on which the gear pieces may be
+             hidden.
+
+             default_layout() returns the original, hand-made 16x16 maze, and
+             generate_layout() builds a new maze of any size from a seed, with an
+             iterative depth-first search that runs in bounded time and memory. The
+             FreeCellIndex of a layout lists the tiles the gear pieces
+             may be hidden on, so a level is set up in the same time on any maze. It
+             imports the Collections and Random modules for use.
+"""
+
+import collections, random
+
+# The arrangement of the original maze, where MAZE_LAYOUT[x][y] is the tile at column
+# x and row y. X's represent walls and O's represent the pathway blocks on
+# which the minotaur and player can traverse
+X, O = 1, 0
+MAZE_LAYOUT = ((X,X,X,X,X,X,X,X,X,X,X,X,X,X,X,X),
+               (X,O,X,X,O,O,O,O,O,O,X,X,O,O,O,X),
+               (X,O,O,O,O,X,X,X,O,X,X,X,X,X,O,X),
+               (X,O,X,X,O,X,O,O,O,O,O,O,O,O,O,X),
+               (X,O,O,O,O,X,O,X,O,X,X,O,X,X,X,X),
+               (X,O,X,X,O,O,O,X,O,X,X,O,O,O,O,X),
+               (X,O,X,X,X,X,X,X,X,X,X,X,X,X,O,X),
+               (X,O,O,O,O,O,X,O,O,X,X,X,O,O,O,X),
+               (X,O,X,O,X,X,X,O,O,X,O,O,O,X,O,X),
+               (X,O,X,O,O,O,X,X,X,X,O,X,O,X,O,X),
+               (X,O,X,X,X,O,X,X,O,X,X,X,O,X,O,X),
+               (X,O,O,O,O,O,O,O,O,O,O,O,O,X,O,X),
+               (X,O,X,O,X,O,X,O,X,X,X,O,O,O,O,X),
+               (X,X,X,O,X,O,X,O,O,O,X,X,X,X,O,X),
+               (X,O,O,O,X,O,O,O,X,O,X,O,O,O,O,X),
+               (X,X,X,X,X,X,X,X,X,X,X,X,X,X,X,X))
+
+# The flag bits of a tile of a MazeGrid. A pathway tile has no flags, a gate is a
+# wall that opens once the grace period is over, and the spawn flag marks the
+# spawn tiles of the Player and of the Minotaur
+PATH = 0
+WALL = 1
+GATE = 2
+HIDDEN_GEAR_PIECE = 4
+SPAWN = 8
+
+# The tile offset of each neighbour, in the same order as labyrinthPathing.DIRECTIONS
+NEIGHBOURS = (("UP", 0, -1), ("DOWN", 0, 1), ("LEFT", -1, 0), ("RIGHT", 1, 0))
+
+# The wall tiles around the Minotaur's center chamber of the original maze, which
+# open once the grace period countdown is over
+GATE_CELLS = ((7, 6), (6, 8), (8, 9))
+
+# The spawn tiles of the Player, of the Minotaur, and of the Minotaur after he
+# has caught the Player, in the original maze
+PLAYER_SPAWN = (1, 1)
+MINOTAUR_SPAWN = (7, 8)
+MINOTAUR_RESPAWN = (8, 8)
+
+# The tiles of the Minotaur's chamber in the original maze
+MINOTAUR_CHAMBER = ((7, 7), (7, 8), (8, 7), (8, 8))
+
+# The number of gates opened into the chamber of a generated maze
+NUM_GATES = 3
+
+# The smallest maze that fits the spawn, the chamber and a corridor around it
+MIN_SIZE = 9
+
+# The number of gear pieces hidden in every maze, each on a tile of its own
+NUM_GEAR_PIECES = 4
+
+# The fewest steps from the Player's spawn to the spawn tile of a Minotaur of a horde,
+# so that the Player has time to get away before the first catch
+MIN_SPAWN_DISTANCE = 6
+
+def _flag_table(clear_flag, where_flag):
+    """This helper function returns a 256-byte translation table that clears
+    clear_flag from every tile value holding where_flag, for bytearray.translate()."""
+    return bytes(value & ~clear_flag if value & where_flag else value for value in range(256))
+
+# The translation tables of the bulk operations of a MazeGrid: opening every gate,
+# and turning the tiles into 1 for walkable and 0 for walls
+OPEN_GATES_TABLE = _flag_table(WALL, GATE)
+WALKABLE_TABLE = bytes(0 if value & WALL else 1 for value in range(256))
+
+class MazeGrid(object):
+    """This class represents the tiles of a maze as a single bytearray of flag bits,
+    where the tile at column x and row y is the byte at index x*rows + y. The bulk
+    operations run over the whole bytearray at once in C rather than tile by tile."""
+    def __init__(self, columns, rows, cells=None):
+        """This method instantiates the MazeGrid class. It accepts the number of columns
+        and rows, and optionally the bytes of the tiles to copy (every tile a pathway
+        if None), as parameters."""
+        self.__columns = columns
+        self.__rows = rows
+        if cells is None:
+            self.__cells = bytearray(columns * rows)
+        else:
+            self.__cells = bytearray(cells)
+            if len(self.__cells) != columns * rows:
+                raise ValueError("A %dx%d grid needs %d cells, not %d" %
+                                 (columns, rows, columns * rows, len(self.__cells)))
+
+    def copy(self):
+        """This method returns a new MazeGrid with the same tiles."""
+        return MazeGrid(self.__columns, self.__rows, self.__cells)
+
+    def get_size(self):
+        """This accessor method returns a tuple (columns, rows) of the size of the maze."""
+        return self.__columns, self.__rows
+
+    def get_cell(self, x, y):
+        """This accessor method returns the flag bits of the tile at column x and row y."""
+        return self.__cells[x*self.__rows + y]
+
+    def has_flag(self, x, y, flag):
+        """This accessor method returns True if the tile at column x and row y has flag."""
+        return bool(self.__cells[x*self.__rows + y] & flag)
+
+    def set_flag(self, x, y, flag):
+        """This mutator method sets flag on the tile at column x and row y."""
+        self.__cells[x*self.__rows + y] |= flag
+
+    def clear_flag(self, x, y, flag):
+        """This mutator method clears flag from the tile at column x and row y."""
+        self.__cells[x*self.__rows + y] &= ~flag & 0xFF
+
+    def is_wall(self, x, y):
+        """This accessor method returns True if the tile at column x and row y is a wall.
+        Any tile outside the maze counts as a wall."""
+        if not (0 <= x < self.__columns and 0 <= y < self.__rows):
+            return True
+        return bool(self.__cells[x*self.__rows + y] & WALL)
+
+    def get_open_neighbours(self, x, y):
+        """This accessor method returns a list of (direction, x, y) tuples of the
+        neighbouring tiles of the tile at column x and row y that are not walls."""
+        return [(direction, x + x_offset, y + y_offset) for direction, x_offset, y_offset in NEIGHBOURS
+                if not self.is_wall(x + x_offset, y + y_offset)]
+
+    def find(self, flag):
+        """This method returns a list of the tiles (x, y) that have flag, in order of
+        their index. The tiles are found by scanning a translated copy of the grid
+        with bytearray.find(), so only the matching tiles are visited in Python."""
+        marked = self.__cells.translate(bytes(1 if value & flag else 0 for value in range(256)))
+        tiles = []
+        index = marked.find(1)
+        while index != -1:
+            tiles.append(divmod(index, self.__rows))
+            index = marked.find(1, index + 1)
+        return tiles
+
+    def open_gates(self):
+        """This mutator method clears the wall flag from every gate of the maze at once,
+        and returns the list of gate tiles (x, y)."""
+        self.__cells[:] = self.__cells.translate(OPEN_GATES_TABLE)
+        return self.find(GATE)
+
+    def get_walkable(self):
+        """This method returns a new bytearray, in the same order as the grid, with 1
+        for every tile that is not a wall and 0 for every wall."""
+        return self.__cells.translate(WALKABLE_TABLE)
+
+    def get_buffer(self):
+        """This accessor method returns a writable memoryview of the tiles, shared with
+        the grid without a copy."""
+        return memoryview(self.__cells)
+
+    def get_column(self, x):
+        """This accessor method returns a memoryview of the tiles of column x, indexed by
+        row, shared with the grid without a copy."""
+        return memoryview(self.__cells)[x*self.__rows:(x + 1)*self.__rows]
+
+    def to_numpy(self):
+        """This method returns a (columns, rows) NumPy uint8 array that shares the
+        memory of the grid, so changes to either are seen by both. It requires the
+        NumPy module, which is not needed by the game itself."""
+        try:
+            import numpy
+        except ImportError:
+            raise ImportError("MazeGrid.to_numpy() requires NumPy (pip install numpy)")
+        return numpy.frombuffer(self.__cells, dtype=numpy.uint8).reshape(self.__columns, self.__rows)
+
+class MazeLayout(object):
+    """This class represents the layout of a maze: its walls, spawn tiles, chamber,
+    gates and gear slots. A layout is never changed by a game; each game plays in
+    its own copy of the walls, returned by new_maze_arrangement()."""
+    def __init__(self, columns, player_spawn, minotaur_spawn, minotaur_respawn,
+                 minotaur_chamber, gate_cells, gear_slots=None):
+        """This method instantiates the MazeLayout class. It accepts the walls as a list
+        of columns (any sequences of 0s and 1s), the spawn tiles of the Player, of the
+        Minotaur and of the Minotaur after a catch, the tiles of the Minotaur's chamber,
+        the gate tiles, and optionally the list of tiles on which gear may be hidden
+        (any free pathway tile if None), as parameters."""
+        self.__grid = MazeGrid(len(columns), len(columns[0]), b"".join(bytes(column) for column in columns))
+        for x, y in gate_cells:
+            self.__grid.set_flag(x, y, WALL | GATE)
+        for x, y in (player_spawn, minotaur_spawn):
+            self.__grid.set_flag(x, y, SPAWN)
+        self.__player_spawn = tuple(player_spawn)
+        self.__minotaur_spawn = tuple(minotaur_spawn)
+        self.__minotaur_respawn = tuple(minotaur_respawn)
+        self.__minotaur_chamber = tuple(tuple(tile) for tile in minotaur_chamber)
+        self.__gate_cells = tuple(tuple(tile) for tile in gate_cells)
+        self.__gear_slots = gear_slots
+        self.__free_cell_index = None
+        self.__spawn_cell_index = None
+
+    def new_maze_arrangement(self):
+        """This method returns a fresh, mutable MazeGrid of the maze, with the gates
+        and the spawn tiles flagged."""
+        return self.__grid.copy()
+
+    def get_size(self):
+        """This accessor method returns a tuple (columns, rows) of the size of the maze."""
+        return self.__grid.get_size()
+
+    def get_player_spawn(self):
+        """This accessor method returns the spawn tile (x, y) of the Player."""
+        return self.__player_spawn
+
+    def get_minotaur_spawn(self):
+        """This accessor method returns the spawn tile (x, y) of the Minotaur."""
+        return self.__minotaur_spawn
+
+    def get_minotaur_respawn(self):
+        """This accessor method returns the tile (x, y) the Minotaur is sent back to
+        after catching the Player."""
+        return self.__minotaur_respawn
+
+    def get_minotaur_chamber(self):
+        """This accessor method returns the tiles of the Minotaur's chamber."""
+        return self.__minotaur_chamber
+
+    def get_gate_cells(self):
+        """This accessor method returns the wall tiles that open out of the chamber."""
+        return self.__gate_cells
+
+    def get_gear_slots(self):
+        """This accessor method returns the list of tiles on which gear may be hidden,
+        or None if any free pathway tile may be used."""
+        return self.__gear_slots
+
+    def get_free_cell_index(self):
+        """This accessor method returns the FreeCellIndex of the layout, which is built
+        the first time it is needed and shared by every game played in the layout."""
+        if self.__free_cell_index is None:
+            self.__free_cell_index = FreeCellIndex(self)
+        return self.__free_cell_index
+
+    def get_spawn_cell_index(self):
+        """This accessor method returns the FreeCellIndex of every free pathway tile of
+        the layout, gear slots or not, at least MIN_SPAWN_DISTANCE steps from the
+        Player's spawn, on which the Minotaurs of a horde are spawned. It is built the
+        first time it is needed."""
+        if self.__spawn_cell_index is None:
+            self.__spawn_cell_index = FreeCellIndex(self, use_gear_slots=False, min_distance=MIN_SPAWN_DISTANCE)
+        return self.__spawn_cell_index
+
+class FreeCellIndex(object):
+    """This class represents the tiles of a layout on which an item may be placed:
+    the pathway tiles the Player can walk to from their spawn, outside of the
+    Minotaur's chamber and off the Player's spawn row and column. The tiles are found
+    once, and any number of them can then be drawn at random without replacement in
+    time proportional to that number."""
+    def __init__(self, layout, use_gear_slots=True, min_distance=0):
+        """This method instantiates the FreeCellIndex class. It accepts the MazeLayout
+        as a parameter. If the layout lists gear slots and use_gear_slots is True, only
+        those are indexed. Only the tiles at least min_distance steps from the Player's
+        spawn are indexed."""
+        maze_arrangement = layout.new_maze_arrangement()
+        columns, rows = layout.get_size()
+        player_x, player_y = layout.get_player_spawn()
+
+        # The tiles the Player can walk to while the gates of the chamber are still
+        # closed are the tiles an item may be placed on
+        tiles = maze_arrangement.get_buffer()
+        reached = _find_distances(tiles, rows, player_x*rows + player_y)
+
+        # Once the gates open the chamber may be a shortcut, so the distances to the
+        # Player's spawn are measured with the gates open
+        distances = reached
+        if min_distance:
+            maze_arrangement.open_gates()
+            distances = _find_distances(tiles, rows, player_x*rows + player_y)
+
+        # Ensuring items are never placed in the Minotaur's chamber, or on the Player's
+        # spawn row or column
+        chamber = set(layout.get_minotaur_chamber())
+        def is_valid(x, y):
+            return (reached[x*rows + y] >= 0 and distances[x*rows + y] >= min_distance and
+                    (x, y) not in chamber and x != player_x and y != player_y)
+
+        if use_gear_slots and layout.get_gear_slots():
+            candidates = layout.get_gear_slots()
+        else:
+            candidates = [divmod(index, rows) for index in range(len(tiles)) if not tiles[index] & WALL]
+        self.__cells = [(x, y) for x, y in candidates if is_valid(x, y)]
+
+    def get_cells(self):
+        """This accessor method returns the list of every tile in the index."""
+        return list(self.__cells)
+
+    def __len__(self):
+        return len(self.__cells)
+
+    def sample(self, rng, count):
+        """This method returns a list of count different tiles drawn at random with rng,
+        a Random instance. The first count steps of a Fisher-Yates shuffle are played
+        on the index and then undone, so the index is left as it was and the same rng
+        state always draws the same tiles. It raises a ValueError if the index holds
+        fewer than count tiles."""
+        cells = self.__cells
+        if count > len(cells):
+            raise ValueError("Only %d free cells for %d items" % (len(cells), count))
+
+        swaps = []
+        for index in range(count):
+            other = rng.randrange(index, len(cells))
+            cells[index], cells[other] = cells[other], cells[index]
+            swaps.append(other)
+        chosen = cells[:count]
+
+        for index in range(count - 1, -1, -1):
+            other = swaps[index]
+            cells[index], cells[other] = cells[other], cells[index]
+        return chosen
+
+def _find_distances(tiles, rows, start):
+    """This helper function returns the list of the number of steps from the tile at
+    start to every tile of the flat tiles, indexed by x*rows + y, found with a
+    breadth-first search. The tiles that cannot be reached from start are -1."""
+    distances = [-1] * len(tiles)
+    distances[start] = 0
+    queue = collections.deque([start])
+    while queue:
+        index = queue.popleft()
+        y = index % rows
+        for next_index in (index - 1 if y > 0 else -1, index + 1 if y < rows - 1 else -1,
+                           index - rows, index + rows):
+            if 0 <= next_index < len(tiles) and distances[next_index] < 0 and not tiles[next_index] & WALL:
+                distances[next_index] = distances[index] + 1
+                queue.append(next_index)
+    return distances
+
+def default_layout():
+    """This function returns the layout of the original, hand-made 16x16 maze."""
+    return MazeLayout(MAZE_LAYOUT, PLAYER_SPAWN, MINOTAUR_SPAWN, MINOTAUR_RESPAWN,
+                      MINOTAUR_CHAMBER, GATE_CELLS)
+
+def generate_layout(size, seed=None, loop_chance=0.05):
+    """This function generates a new maze. It accepts size, the number of columns and
+    rows of the maze (an integer for a square maze, or a tuple), the seed of the
+    random number generator, and loop_chance, the fraction of extra walls knocked down
+    so that the maze has loops to escape the Minotaur through, as parameters. It
+    returns a MazeLayout.
+
+    The corridors are carved by an iterative depth-first search over the tiles at odd
+    coordinates, using an explicit stack rather than recursion, so any size can be
+    generated in time and memory proportional to its number of tiles."""
+    if isinstance(size, int):
+        columns, rows = size, size
+    else:
+        columns, rows = size
+    if columns < MIN_SIZE or rows < MIN_SIZE:
+        raise ValueError("A maze must be at least %dx%d tiles" % (MIN_SIZE, MIN_SIZE))
+
+    rng = random.Random(seed)
+
+    # The maze is carved in a single flat bytearray indexed by x*rows + y, starting
+    # with every tile as a wall
+    tiles = bytearray(b"\x01") * (columns * rows)
+    dead_ends = []
+
+    # The chamber and its ring of walls are marked as already visited, so that the
+    # search carves its corridors around them rather than through them
+    center_x, center_y = columns // 2, rows // 2
+    for x in range(center_x - 2, center_x + 2):
+        for y in range(center_y - 2, center_y + 2):
+            tiles[x*rows + y] = PATH
+
+    start = 1*rows + 1
+    tiles[start] = PATH
+    stack = [start]
+    fresh = True
+    while stack:
+        index = stack[-1]
+        x, y = divmod(index, rows)
+
+        # The unvisited tiles two steps away, and the step that reaches them
+        steps = []
+        if y >= 3 and tiles[index - 2]:
+            steps.append(-1)
+        if y + 2 <= rows - 2 and tiles[index + 2]:
+            steps.append(1)
+        if x >= 3 and tiles[index - 2*rows]:
+            steps.append(-rows)
+        if x + 2 <= columns - 2 and tiles[index + 2*rows]:
+            steps.append(rows)
+
+        if not steps:
+            # A tile the search backs out of without carving any further is a dead end
+            if fresh:
+                dead_ends.append((x, y))
+            fresh = False
+            stack.pop()
+            continue
+
+        step = steps[rng.randrange(len(steps))]
+        tiles[index + step] = PATH
+        tiles[index + 2*step] = PATH
+        stack.append(index + 2*step)
+        fresh = True
+
+    # Knocks down random walls that separate two corridors, which adds loops
+    for _ in range(int(loop_chance * columns * rows / 4)):
+        x = rng.randrange(1, columns - 1)
+        y = rng.randrange(1, rows - 1)
+        index = x*rows + y
+        if tiles[index] != WALL:
+            continue
+
+        # The walls next to the chamber are left alone, as the chamber is walled off
+        if center_x - 3 <= x <= center_x + 2 and center_y - 3 <= y <= center_y + 2:
+            continue
+        if (not tiles[index - 1] and not tiles[index + 1]) or \
+           (not tiles[index - rows] and not tiles[index + rows]):
+            tiles[index] = PATH
+
+    maze_columns = [tiles[x*rows:(x + 1)*rows] for x in range(columns)]
+    chamber, gates = _build_chamber(maze_columns, rng)
+
+    # The gear slots are the dead ends outside the chamber, away from the Player's
+    # spawn row and column, which is where the original maze forbids gear
+    chamber_tiles = set(chamber)
+    def is_gear_slot(x, y):
+        return (x, y) not in chamber_tiles and x != 1 and y != 1 and maze_columns[x][y] == PATH
+    gear_slots = [tile for tile in dead_ends if is_gear_slot(*tile)]
+
+    # A small maze may have fewer dead ends than gear pieces, so the slots are topped
+    # up with random corridor tiles. Every pathway tile outside the chamber can be
+    # walked to from the Player's spawn while the gates are closed
+    if len(gear_slots) < NUM_GEAR_PIECES:
+        taken = set(gear_slots)
+        corridors = [(x, y) for x in range(columns) for y in range(rows)
+                     if is_gear_slot(x, y) and (x, y) not in taken]
+        if len(gear_slots) + len(corridors) < NUM_GEAR_PIECES:
+            raise ValueError("A %dx%d maze has room for only %d of the %d gear pieces" %
+                             (columns, rows, len(gear_slots) + len(corridors), NUM_GEAR_PIECES))
+        gear_slots.extend(rng.sample(corridors, NUM_GEAR_PIECES - len(gear_slots)))
+
+    return MazeLayout(maze_columns, (1, 1), (center_x - 1, center_y), (center_x, center_y),
+                      chamber, gates, gear_slots)
+
+def _build_chamber(maze_columns, rng):
+    """This helper function walls off a 2x2 chamber in the center of the maze for the
+    Minotaur, and picks the gates out of it. A gate is a wall on the side of the
+    chamber with a corridor behind it; if no side has one, a corridor is dug out.
+    It returns the tiles of the chamber and the gate tiles."""
+    columns, rows = len(maze_columns), len(maze_columns[0])
+    center_x, center_y = columns // 2, rows // 2
+    chamber = ((center_x - 1, center_y - 1), (center_x - 1, center_y),
+               (center_x, center_y - 1), (center_x, center_y))
+
+    # Surrounds the chamber with a ring of walls
+    for x in range(center_x - 2, center_x + 2):
+        for y in range(center_y - 2, center_y + 2):
+            maze_columns[x][y] = WALL
+    for x, y in chamber:
+        maze_columns[x][y] = PATH
+
+    # Each side tile of the ring, with the direction leading away from the chamber
+    sides = []
+    for x in (center_x - 1, center_x):
+        sides.append(((x, center_y - 2), (0, -1)))
+        sides.append(((x, center_y + 1), (0, 1)))
+    for y in (center_y - 1, center_y):
+        sides.append(((center_x - 2, y), (-1, 0)))
+        sides.append(((center_x + 1, y), (1, 0)))
+    rng.shuffle(sides)
+
+    gates = [gate for gate, (x_offset, y_offset) in sides
+             if maze_columns[gate[0] + x_offset][gate[1] + y_offset] == PATH][:NUM_GATES]
+
+    if not gates:
+        # Digs outwards from a gate until a corridor is met (or the outer wall)
+        (x, y), (x_offset, y_offset) = sides[0]
+        gates.append((x, y))
+        x, y = x + x_offset, y + y_offset
+        while 0 < x < columns - 1 and 0 < y < rows - 1 and maze_columns[x][y] == WALL:
+            maze_columns[x][y] = PATH
+            x, y = x + x_offset, y + y_offset
+
+    return chamber, tuple(gates)
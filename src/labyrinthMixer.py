@@ -0,0 +1,143 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the mixer channel pool of the "Minotaur Labyrinth"
+             game. The AudioScheduler plays every sound effect of the game on a fixed
+             pool of channels, so however many events fire in one tick, no more than
+             that many voices are ever mixed. Each cue has a priority, a cooldown and a
+             limit on the voices it plays at once: a cue over its limit restarts its
+             oldest voice, and a cue that finds every channel busy steals the channel
+             of the oldest voice of a lower priority, or is dropped.
+
+             Sounds coming from the Minotaur are panned to the left or right speaker by
+             where he stands relative to the Player; their loudness is the growl band
+             of the labyrinthAudio module, which follows the corridors of the maze.
+
+             It is kept apart from the labyrinthAudio module, which the simulation
+             imports, so the simulation still runs without Pygame. It imports the
+             Pygame module.
+"""
+
+import pygame
+
+# The number of channels in the pool
+NUM_CHANNELS = 8
+
+# The horizontal distance, in pixels, at which a sound is heard from one speaker only
+PAN_DISTANCE = 200
+
+def get_pan(source_x, listener_x, pan_distance=PAN_DISTANCE):
+    """This function returns the stereo position of a sound, from -1.0 (left speaker
+    only) through 0.0 (centred) to 1.0 (right speaker only). It accepts the horizontal
+    pixel positions of the sound's source and of its listener, and the distance at
+    which the sound is fully panned, as parameters."""
+    pan = (source_x - listener_x) / pan_distance
+    return max(-1.0, min(1.0, pan))
+
+def get_stereo_volumes(volume, pan):
+    """This function returns the (left, right) volumes of a sound played at volume
+    and panned to pan. A centred sound is played at full volume from both speakers,
+    and a panned sound fades out of the opposite speaker."""
+    return volume * min(1.0, 1.0 - pan), volume * min(1.0, 1.0 + pan)
+
+class AudioScheduler(object):
+    """This class represents the pool of mixer channels the sound effects play on, and
+    the cues that decide which sounds get a channel."""
+    def __init__(self, sound_bank, num_channels=NUM_CHANNELS):
+        """This method instantiates the AudioScheduler class. It accepts the SoundBank
+        the sounds are decoded by, and the number of channels in the pool, as
+        parameters. The mixer must already be initialized."""
+        pygame.mixer.set_num_channels(num_channels)
+        self.__sound_bank = sound_bank
+        self.__channels = [pygame.mixer.Channel(index) for index in range(num_channels)]
+
+        # The (cue, priority, start) of the voice on each channel, or None if the
+        # channel was free when it was last looked at
+        self.__voices = [None] * num_channels
+
+        # Each cue is a tuple (path, volume, priority, cooldown, max_voices)
+        self.__cues = {}
+        self.__last_played = {}
+
+        self.__plays = 0
+        self.__steals = 0
+        self.__drops = 0
+
+    def add_cue(self, name, path, volume=1.0, priority=0, cooldown=0, max_voices=1):
+        """This mutator method adds a cue that plays the sound stored at path. It
+        accepts the name the cue is played by, the path of its sound, its volume, its
+        priority (higher cues steal the channels of lower ones), the milliseconds it
+        waits before it can play again, and the most voices it plays at once, as
+        parameters."""
+        self.__cues[name] = (path, volume, priority, cooldown, max_voices)
+
+    def play(self, name, volume=None, pan=0.0, now=None):
+        """This method plays the cue called name, and returns the Channel it plays on,
+        or None if it was dropped. It accepts the volume to play it at (the cue's own
+        volume if None), its stereo pan from -1.0 to 1.0, and the current time in
+        milliseconds (pygame.time.get_ticks() if None), as parameters."""
+        path, cue_volume, priority, cooldown, max_voices = self.__cues[name]
+        if volume is None:
+            volume = cue_volume
+        if now is None:
+            now = pygame.time.get_ticks()
+
+        if name in self.__last_played and now - self.__last_played[name] < cooldown:
+            self.__drops += 1
+            return None
+
+        index = self.__find_channel(name, priority, max_voices)
+        if index is None:
+            self.__drops += 1
+            return None
+
+        channel = self.__channels[index]
+        channel.play(self.__sound_bank.get(path))
+        channel.set_volume(*get_stereo_volumes(volume, pan))
+        self.__voices[index] = (name, priority, now)
+        self.__last_played[name] = now
+        self.__plays += 1
+        return channel
+
+    def __find_channel(self, name, priority, max_voices):
+        """This helper method returns the index of the channel a cue should play on,
+        or None if it should be dropped. The cost is bounded by the size of the pool,
+        not by the number of sounds played."""
+        same_cue = []
+        for index, voice in enumerate(self.__voices):
+            if voice is None:
+                continue
+            if not self.__channels[index].get_busy():
+                self.__voices[index] = None
+            elif voice[0] == name:
+                same_cue.append(index)
+
+        # A cue already playing its most voices restarts the oldest of them
+        if len(same_cue) >= max_voices:
+            return min(same_cue, key=lambda index: self.__voices[index][2])
+
+        for index, voice in enumerate(self.__voices):
+            if voice is None:
+                return index
+
+        # Every channel is busy, so the oldest voice of the lowest priority below the
+        # cue's own is cut off
+        victims = [index for index, voice in enumerate(self.__voices) if voice[1] < priority]
+        if not victims:
+            return None
+        self.__steals += 1
+        return min(victims, key=lambda index: (self.__voices[index][1], self.__voices[index][2]))
+
+    def stop(self):
+        """This mutator method stops every voice in the pool."""
+        for index, channel in enumerate(self.__channels):
+            channel.stop()
+            self.__voices[index] = None
+
+    def get_stats(self):
+        """This accessor method returns a dictionary containing the number of cues
+        played, of voices stolen by a cue of a higher priority, of cues dropped by a
+        cooldown or a full pool, and of voices playing now."""
+        playing = sum(1 for channel in self.__channels if channel.get_busy())
+        return {"plays": self.__plays, "steals": self.__steals, "drops": self.__drops, "playing": playing}
@@ -0,0 +1,135 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the pathfinding used by the Minotaur in the
+             "Minotaur Labyrinth" game. The FlowField runs a breadth-first search
+             over the MazeGrid from the Player's tile, storing the walking
+             distance of every tile to the Player. The Minotaur then only has to step
+             onto the neighbouring tile with the smallest distance. The field is only
+             recomputed when the Player changes tile or when walls are opened. It
+             imports the Collections module for use.
+"""
+
+import collections
+
+# The tile offset of each direction, where x is the column and y the row of a tile.
+# The order decides which step is taken when two are equally short
+DIRECTIONS = (("UP", 0, -1), ("DOWN", 0, 1), ("LEFT", -1, 0), ("RIGHT", 1, 0))
+
+# The distance stored for the tiles that cannot reach the target
+UNREACHABLE = -1
+
+class FlowField(object):
+    """This class represents a distance field over the maze towards a target tile."""
+    def __init__(self, maze_arrangement):
+        """This method instantiates the FlowField class. It accepts the maze_arrangement,
+        a MazeGrid, as a parameter."""
+        self.__maze_arrangement = maze_arrangement
+        self.__columns, self.__rows = maze_arrangement.get_size()
+
+        # The distances and walkable tiles are kept in flat lists indexed by
+        # x*rows + y, in the same order as the tiles of the MazeGrid
+        self.__walkable = None
+        self.__distances = None
+        self.__target = None
+
+        self.__recompute_count = 0
+
+    def invalidate(self):
+        """This mutator method marks the walls of the maze as changed (e.g. when the
+        gates of the Minotaur's chamber open), so the field is rebuilt on the next
+        call to set_target()."""
+        self.__walkable = None
+
+    def __read_walls(self):
+        """This helper method reads which tiles of the maze_arrangement are walkable."""
+        self.__walkable = self.__maze_arrangement.get_walkable()
+
+    def __search(self, target_x, target_y):
+        """This helper method runs the breadth-first search from the target tile,
+        filling in the walking distance of every tile that can reach it."""
+        rows = self.__rows
+        walkable = self.__walkable
+        distances = [UNREACHABLE] * (self.__columns * rows)
+
+        start = target_x*rows + target_y
+        if 0 <= target_x < self.__columns and 0 <= target_y < rows and walkable[start]:
+            distances[start] = 0
+            queue = collections.deque([start])
+
+            # The maze is surrounded by walls, but the column bounds are still checked
+            # so that an open edge never wraps around to the other side
+            while queue:
+                index = queue.popleft()
+                distance = distances[index] + 1
+                y = index % rows
+                if y > 0 and walkable[index - 1] and distances[index - 1] == UNREACHABLE:
+                    distances[index - 1] = distance
+                    queue.append(index - 1)
+                if y < rows - 1 and walkable[index + 1] and distances[index + 1] == UNREACHABLE:
+                    distances[index + 1] = distance
+                    queue.append(index + 1)
+                if index >= rows and walkable[index - rows] and distances[index - rows] == UNREACHABLE:
+                    distances[index - rows] = distance
+                    queue.append(index - rows)
+                if index + rows < len(distances) and walkable[index + rows] and \
+                   distances[index + rows] == UNREACHABLE:
+                    distances[index + rows] = distance
+                    queue.append(index + rows)
+
+        self.__distances = distances
+        self.__recompute_count += 1
+
+    def set_target(self, target_x, target_y):
+        """This mutator method points the field towards the tile at column target_x and
+        row target_y. The field is only recomputed if the target tile has changed or
+        the walls have been invalidated, so calling it every tick is cheap. It returns
+        True if the field was recomputed."""
+        if self.__walkable is None:
+            self.__read_walls()
+        elif self.__target == (target_x, target_y):
+            return False
+
+        self.__target = (target_x, target_y)
+        self.__search(target_x, target_y)
+        return True
+
+    def get_target(self):
+        """This accessor method returns the target tile as a tuple (x, y)."""
+        return self.__target
+
+    def get_distances(self):
+        """This accessor method returns the flat list of the walking distance of every
+        tile to the target, indexed by x*rows + y, where the tiles that cannot reach it
+        are UNREACHABLE. It returns None until set_target() has been called. The list
+        is replaced, not changed, when the field is recomputed."""
+        return self.__distances
+
+    def get_distance(self, x, y):
+        """This accessor method returns the walking distance, in tiles, from the tile
+        at column x and row y to the target, or None if it cannot reach the target."""
+        if self.__distances is None or not (0 <= x < self.__columns and 0 <= y < self.__rows):
+            return None
+        distance = self.__distances[x*self.__rows + y]
+        if distance == UNREACHABLE:
+            return None
+        return distance
+
+    def next_step(self, x, y):
+        """This accessor method returns the direction ("UP", "DOWN", "LEFT" or "RIGHT")
+        of the neighbouring tile that is one step closer to the target, starting from
+        the tile at column x and row y. It returns None if the tile is the target or
+        cannot reach it."""
+        distance = self.get_distance(x, y)
+        if not distance:
+            return None
+
+        for direction, x_offset, y_offset in DIRECTIONS:
+            if self.get_distance(x + x_offset, y + y_offset) == distance - 1:
+                return direction
+        return None
+
+    def get_recompute_count(self):
+        """This accessor method returns the number of times the field was recomputed."""
+        return self.__recompute_count
@@ -0,0 +1,239 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the frame profiler of the "Minotaur Labyrinth" game.
+             The FrameProfiler times each phase of a frame - event handling, the
+             simulation's movement, collisions, growls and pathing, the sprite updates,
+             the drawing and the display update - with perf_counter_ns, and keeps the
+             last frames in a ring buffer. It draws a small overlay with the frame time,
+             its 50th and 99th percentiles and a bar per phase, and writes every frame
+             in the buffer to a CSV file when the game ends.
+
+             The profiler is toggled with the F3 key, or switched on from the start by
+             setting the LABYRINTH_PROFILE environment variable to 1, or to "csv" to
+             record the frames without drawing the overlay. While it is off,
+             each mark returns straight away without reading the clock.
+
+             The StartupTimer measures the cold start of the game: the time until the
+             first frame of the introduction screen is shown, and the time until the
+             first frame of the game itself can be played. It imports the
+             CSV, OS, Pygame and Time modules, and the labyrinthAssets module for the
+             overlay's font.
+"""
+
+import csv, os, pygame, time, src.labyrinthAssets
+
+# The key that switches the profiler on and off
+TOGGLE_KEY = pygame.K_F3
+
+# The environment variables that switch the profiler on from the start, and choose the
+# file its CSV is written to
+ENABLE_VARIABLE = "LABYRINTH_PROFILE"
+CSV_VARIABLE = "LABYRINTH_PROFILE_CSV"
+DEFAULT_CSV_PATH = "frame_profile.csv"
+
+# The value of LABYRINTH_PROFILE that records the frames without drawing the overlay,
+# so the overlay's own cost is left out of the frame times (e.g. in the benchmarks)
+QUIET_VALUE = "csv"
+
+# The number of frames kept in the ring buffer: 30 seconds at 120 frames per second
+CAPACITY = 3600
+
+# The percentiles shown on the overlay are refreshed once every this many frames,
+# since they sort the whole buffer
+STATS_INTERVAL = 30
+
+# The overlay's position, size and colours, and the frame time its bars are scaled to
+OVERLAY_POSITION = (10, 60)
+OVERLAY_WIDTH = 260
+BAR_SCALE_MS = 1000 / 30
+OVERLAY_COLOUR = (0, 0, 0)
+TEXT_COLOUR = (255, 255, 255)
+BAR_COLOUR = (230, 160, 40)
+
+class StartupTimer(object):
+    """This class represents the milestones of the game's startup, each timed from
+    the moment the game was launched."""
+    def __init__(self, start):
+        """This method instantiates the StartupTimer class. It accepts start, the
+        time.perf_counter() value at which the game was launched, as a parameter."""
+        self.__start = start
+        self.__milestones = []
+
+    def mark(self, milestone, seconds=None):
+        """This mutator method records a milestone reached now, or one that lasted
+        the given number of seconds (e.g. the preloading, on its own thread)."""
+        if seconds is None:
+            seconds = time.perf_counter() - self.__start
+        self.__milestones.append((milestone, seconds))
+
+    def get_milestones(self):
+        """This accessor method returns the list of (milestone, seconds) tuples in
+        the order they were recorded."""
+        return list(self.__milestones)
+
+    def report(self):
+        """This method prints every milestone in milliseconds, if profiling was
+        switched on with the LABYRINTH_PROFILE environment variable."""
+        if os.environ.get(ENABLE_VARIABLE, "") in ("", "0"):
+            return
+        print("startup: " + ", ".join("%s %.0f ms" % (milestone, seconds * 1000)
+                                      for milestone, seconds in self.__milestones))
+
+class FrameProfiler(object):
+    """This class represents the per-phase timer of the game's frames."""
+    def __init__(self, enabled=None, capacity=CAPACITY, csv_path=None, phases=(), overlay=None):
+        """This method instantiates the FrameProfiler class. It accepts enabled (read
+        from the LABYRINTH_PROFILE environment variable if None), the number of frames
+        kept in the ring buffer, the path of the CSV file (read from the
+        LABYRINTH_PROFILE_CSV environment variable, or frame_profile.csv, if None), and
+        the names of the phases in the order they are shown, and overlay (False if
+        LABYRINTH_PROFILE is "csv" when None), as parameters. Phases that are not
+        named are added in the order they are first marked."""
+        if enabled is None:
+            enabled = os.environ.get(ENABLE_VARIABLE, "") not in ("", "0")
+        if overlay is None:
+            overlay = os.environ.get(ENABLE_VARIABLE, "") != QUIET_VALUE
+        if csv_path is None:
+            csv_path = os.environ.get(CSV_VARIABLE, DEFAULT_CSV_PATH)
+        self.__enabled = enabled
+        self.__overlay = overlay
+        self.__csv_path = csv_path
+        self.__capacity = capacity
+
+        # The ring buffer holds one entry per frame: its total time and a dictionary of
+        # the time of each phase, all in nanoseconds
+        self.__frames = [None] * capacity
+        self.__next_frame = 0
+        self.__num_frames = 0
+        self.__phases = list(phases)
+
+        self.__frame_start = 0
+        self.__last_mark = 0
+        self.__current = None
+
+        self.__stats = None
+        self.__frames_since_stats = 0
+        self.__font = None
+
+    def is_enabled(self):
+        """This accessor method returns True if the profiler is timing frames."""
+        return self.__enabled
+
+    def toggle(self):
+        """This mutator method switches the profiler on or off. The frame in progress
+        is dropped, since only part of it was timed."""
+        self.__enabled = not self.__enabled
+        self.__current = None
+
+    def begin_frame(self):
+        """This mutator method starts timing a new frame."""
+        if not self.__enabled:
+            return
+        self.__frame_start = self.__last_mark = time.perf_counter_ns()
+        self.__current = {}
+
+    def mark(self, phase):
+        """This mutator method adds the time elapsed since the last mark to phase. A
+        phase marked several times in a frame (e.g. once per tick) adds up."""
+        if self.__current is None:
+            return
+        now = time.perf_counter_ns()
+        self.__current[phase] = self.__current.get(phase, 0) + now - self.__last_mark
+        self.__last_mark = now
+        if phase not in self.__phases:
+            self.__phases.append(phase)
+
+    def end_frame(self):
+        """This mutator method stores the frame being timed in the ring buffer,
+        overwriting the oldest frame once the buffer is full."""
+        if self.__current is None:
+            return
+        total = time.perf_counter_ns() - self.__frame_start
+        self.__frames[self.__next_frame] = (total, self.__current)
+        self.__next_frame = (self.__next_frame + 1) % self.__capacity
+        self.__num_frames = min(self.__num_frames + 1, self.__capacity)
+        self.__current = None
+        self.__frames_since_stats += 1
+
+    def get_frames(self):
+        """This accessor method returns the list of (total, phases) tuples in the ring
+        buffer, from the oldest frame to the newest, with times in nanoseconds."""
+        if self.__num_frames < self.__capacity:
+            return self.__frames[:self.__num_frames]
+        return self.__frames[self.__next_frame:] + self.__frames[:self.__next_frame]
+
+    def get_stats(self):
+        """This accessor method returns a dictionary of the frame statistics over the
+        ring buffer, in milliseconds: "last", "p50" and "p99" frame times, and "phases",
+        the mean time of each phase. It returns None if no frame has been timed."""
+        if self.__num_frames == 0:
+            return None
+        if self.__stats is None or self.__frames_since_stats >= STATS_INTERVAL:
+            frames = self.get_frames()
+            totals = sorted(total for total, phases in frames)
+            phases = {}
+            for phase in self.__phases:
+                phases[phase] = sum(times.get(phase, 0) for total, times in frames) / len(frames) / 1000000
+            self.__stats = {"p50": totals[len(totals) // 2] / 1000000,
+                            "p99": totals[min(len(totals) - 1, len(totals) * 99 // 100)] / 1000000,
+                            "phases": phases}
+            self.__frames_since_stats = 0
+        self.__stats["last"] = self.get_frames()[-1][0] / 1000000 if self.__num_frames else 0
+        return self.__stats
+
+    def draw(self, screen):
+        """This method draws the overlay onto the screen: the last frame time, the
+        50th and 99th percentiles, and a bar for the mean time of each phase. It
+        returns the rect it covered, or None if there is nothing to draw."""
+        if not self.__enabled or not self.__overlay:
+            return None
+        stats = self.get_stats()
+        if stats is None:
+            return None
+
+        if self.__font is None:
+            self.__font = src.labyrinthAssets.load_font("./misc/Fonts/PressStart2P.ttf", 8)
+        line_height = 12
+        lines = ["frame %.2f ms" % stats["last"],
+                 "p50 %.2f  p99 %.2f ms" % (stats["p50"], stats["p99"])]
+        height = (len(lines) + len(self.__phases)) * line_height + 8
+        overlay_rect = pygame.Rect(OVERLAY_POSITION, (OVERLAY_WIDTH, height))
+        screen.fill(OVERLAY_COLOUR, overlay_rect)
+
+        y = overlay_rect.y + 4
+        for line in lines:
+            screen.blit(self.__font.render(line, False, TEXT_COLOUR), (overlay_rect.x + 4, y))
+            y += line_height
+
+        # Each phase is labelled with its mean time, next to a bar scaled so that a
+        # full bar is one 30 Hz frame
+        bar_left = overlay_rect.x + 120
+        bar_width = overlay_rect.right - 4 - bar_left
+        for phase in self.__phases:
+            milliseconds = stats["phases"].get(phase, 0)
+            screen.blit(self.__font.render("%-10s%5.2f" % (phase[:10], milliseconds), False, TEXT_COLOUR),
+                        (overlay_rect.x + 4, y))
+            length = min(bar_width, int(bar_width * milliseconds / BAR_SCALE_MS))
+            if length:
+                screen.fill(BAR_COLOUR, (bar_left, y + 1, length, line_height - 4))
+            y += line_height
+        return overlay_rect
+
+    def write_csv(self, path=None):
+        """This method writes one row per frame in the ring buffer to the CSV file at
+        path (the profiler's csv_path if None), with the frame time and the time of
+        each phase in microseconds. It returns the path written, or None if no frame
+        was timed."""
+        if self.__num_frames == 0:
+            return None
+        if path is None:
+            path = self.__csv_path
+        with open(path, "w", newline="") as output:
+            writer = csv.writer(output)
+            writer.writerow(["frame", "total_us"] + ["%s_us" % phase for phase in self.__phases])
+            for index, (total, phases) in enumerate(self.get_frames()):
+                writer.writerow([index, total // 1000] +
+                                [phases.get(phase, 0) // 1000 for phase in self.__phases])
+        return path
@@ -0,0 +1,360 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the rendering layers used by the "Minotaur Labyrinth"
+             game. The Camera follows the Player through mazes bigger than the window.
+             The WallLayer splits the maze into square chunks, each pre-rendered into
+             its own surface the first time it comes into view and kept in a cache
+             with a memory cap, so only the chunks the camera sees are ever drawn. The
+             DirtyTracker pushes only the regions of the screen that changed to the
+             display, and draw_visible_world() redraws only what is visible through the
+             Player's lit circle. The HUDLayer composites the HUD's widgets into one
+             surface, built again only when one of them shows a new value. It imports
+             the Collections, Pygame and Random modules, and the labyrinthMaze and
+             labyrinthSprites modules for the walls and the stone images.
+"""
+
+import collections, pygame, random, src.labyrinthMaze, src.labyrinthSprites
+
+# The width and height of a chunk of the wall layer, in tiles
+CHUNK_TILES = 8
+
+# The most memory the cached chunk surfaces may take, in bytes. A chunk of 8x8 tiles
+# takes 640 KB, so 48 MB keeps about 75 chunks - several screens' worth
+CHUNK_CACHE_BYTES = 48 * 1024 * 1024
+
+class Camera(object):
+    """This class represents the view of the window onto the maze. It follows a
+    point of the maze (the Player), and stops at the edges of the maze so that
+    nothing outside of it is ever shown."""
+    def __init__(self, view_size, world_size):
+        """This method instantiates the Camera class. It accepts the size of the window
+        and the size of the whole maze, both in pixels, as parameters."""
+        self.__view_rect = pygame.Rect((0, 0), view_size)
+        self.__world_rect = pygame.Rect((0, 0), world_size)
+
+    def follow(self, position):
+        """This mutator method centers the view on position, a point (x, y) of the
+        maze, as far as the edges of the maze allow. It returns True if the view
+        moved."""
+        old_topleft = self.__view_rect.topleft
+
+        # A maze smaller than the window is shown from its top-left corner
+        x = position[0] - self.__view_rect.width // 2
+        y = position[1] - self.__view_rect.height // 2
+        self.__view_rect.x = max(0, min(x, self.__world_rect.width - self.__view_rect.width))
+        self.__view_rect.y = max(0, min(y, self.__world_rect.height - self.__view_rect.height))
+        return self.__view_rect.topleft != old_topleft
+
+    def get_offset(self):
+        """This accessor method returns the position (x, y) of the maze shown at the
+        top-left corner of the window."""
+        return self.__view_rect.topleft
+
+    def get_view_rect(self):
+        """This accessor method returns the rect of the maze shown in the window."""
+        return self.__view_rect.copy()
+
+    def to_screen(self, rect):
+        """This method returns rect, given in maze pixels, moved to window pixels."""
+        return pygame.Rect(rect).move(-self.__view_rect.x, -self.__view_rect.y)
+
+class WallLayer(object):
+    """This class represents the static layer of the maze: the background with
+    every wall tile already drawn on top of it. The layer is split into chunks of
+    CHUNK_TILES x CHUNK_TILES tiles, which are rendered on demand and kept in a
+    least-recently-used cache."""
+    def __init__(self, maze_arrangement, background, tile_size=50, chunk_tiles=CHUNK_TILES,
+                 cache_bytes=CHUNK_CACHE_BYTES, seed=None):
+        """This method instantiates the WallLayer class. It accepts the maze_arrangement,
+        the background image, the size of a tile in pixels, the size of a chunk in
+        tiles, the memory cap of the chunk cache in bytes, and the seed that picks the
+        stone of every wall tile (a random one if None), as parameters."""
+        self.__maze_arrangement = maze_arrangement
+        self.__background = background
+        self.__tile_size = tile_size
+        self.__chunk_tiles = chunk_tiles
+        self.__chunk_size = chunk_tiles * tile_size
+        self.__cache_bytes = cache_bytes
+
+        # Each chunk draws its stones from its own generator seeded from this one, so
+        # a chunk that was evicted looks the same when it is rendered again
+        if seed is None:
+            seed = random.getrandbits(32)
+        self.__seed = seed
+
+        # The layer covers the whole maze
+        columns, rows = maze_arrangement.get_size()
+        self.__width = columns * tile_size
+        self.__height = rows * tile_size
+
+        self.__chunks = collections.OrderedDict()
+        self.__used_bytes = 0
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+
+    def __tile_background(self, surface, area, position):
+        """This helper method blits the part of the background that covers area, a rect
+        of the maze, onto surface at position. The background is tiled across the maze
+        in case the maze is bigger than it, so area may span several copies of it."""
+        background_width, background_height = self.__background.get_size()
+        old_clip = surface.get_clip()
+        surface.set_clip(pygame.Rect(position, area.size))
+        for x in range(area.left - area.left % background_width, area.right, background_width):
+            for y in range(area.top - area.top % background_height, area.bottom, background_height):
+                surface.blit(self.__background, (position[0] + x - area.left, position[1] + y - area.top))
+        surface.set_clip(old_clip)
+
+    def __render_chunk(self, chunk_x, chunk_y):
+        """This helper method draws the background and a stone on every wall tile of
+        the chunk at column chunk_x and row chunk_y, and returns its surface."""
+        surface = pygame.Surface((self.__chunk_size, self.__chunk_size)).convert()
+        self.__tile_background(surface, pygame.Rect(chunk_x*self.__chunk_size, chunk_y*self.__chunk_size,
+                                                     self.__chunk_size, self.__chunk_size), (0, 0))
+
+        rng = random.Random(hash((self.__seed, chunk_x, chunk_y)))
+        first_x = chunk_x * self.__chunk_tiles
+        first_y = chunk_y * self.__chunk_tiles
+        columns, rows = self.__maze_arrangement.get_size()
+        for x in range(first_x, min(first_x + self.__chunk_tiles, columns)):
+            column = self.__maze_arrangement.get_column(x)
+            for y in range(first_y, min(first_y + self.__chunk_tiles, rows)):
+                # A stone is picked for every tile, so that opening a wall does not
+                # change the stones of the tiles after it
+                stone_type = rng.randint(0, 3)
+                if column[y] & src.labyrinthMaze.WALL:
+                    stone_image = src.labyrinthSprites.load_stone_image(stone_type)
+                    surface.blit(stone_image, ((x - first_x)*self.__tile_size, (y - first_y)*self.__tile_size))
+        return surface
+
+    def __get_chunk(self, chunk_x, chunk_y):
+        """This helper method returns the surface of a chunk from the cache, rendering
+        it if needed and evicting the least recently used chunks beyond the memory cap."""
+        key = (chunk_x, chunk_y)
+        surface = self.__chunks.get(key)
+        if surface is not None:
+            self.__chunks.move_to_end(key)
+            self.__hits += 1
+            return surface
+
+        self.__misses += 1
+        surface = self.__render_chunk(chunk_x, chunk_y)
+        self.__chunks[key] = surface
+        self.__used_bytes += surface.get_pitch() * surface.get_height()
+
+        # The chunk just rendered is always kept, even if it alone exceeds the cap
+        while self.__used_bytes > self.__cache_bytes and len(self.__chunks) > 1:
+            evicted = self.__chunks.popitem(last=False)[1]
+            self.__used_bytes -= evicted.get_pitch() * evicted.get_height()
+            self.__evictions += 1
+        return surface
+
+    def get_size(self):
+        """This accessor method returns the size (width, height) of the maze in pixels."""
+        return self.__width, self.__height
+
+    def get_cell_rect(self, x, y):
+        """This accessor method returns the pixel rect of the tile at column x and row y."""
+        return pygame.Rect(x*self.__tile_size, y*self.__tile_size, self.__tile_size, self.__tile_size)
+
+    def open_cell(self, x, y):
+        """This mutator method removes the wall drawn on the tile at column x and row y
+        by patching the background back over it, once the MazeGrid has opened it. It
+        returns the rect of the maze that changed."""
+        cell_rect = self.get_cell_rect(x, y)
+
+        # A chunk that is not cached is drawn from the MazeGrid when it is next
+        # needed, which no longer has the wall, so only a cached chunk is patched
+        chunk_x, chunk_y = x // self.__chunk_tiles, y // self.__chunk_tiles
+        surface = self.__chunks.get((chunk_x, chunk_y))
+        if surface is not None:
+            # The cell may straddle two copies of the tiled background
+            self.__tile_background(surface, cell_rect, (cell_rect.x - chunk_x*self.__chunk_size,
+                                                        cell_rect.y - chunk_y*self.__chunk_size))
+        return cell_rect
+
+    def draw_area(self, screen, screen_rect, offset=(0, 0)):
+        """This method blits the part of the layer seen through screen_rect, a rect of
+        the screen, when the top-left corner of the screen shows the pixel offset of
+        the maze. Only the chunks that overlap screen_rect are drawn."""
+        area = pygame.Rect(screen_rect).move(offset).clip(pygame.Rect(0, 0, self.__width, self.__height))
+        if not area.width or not area.height:
+            return
+
+        for chunk_x in range(area.left // self.__chunk_size, (area.right - 1) // self.__chunk_size + 1):
+            for chunk_y in range(area.top // self.__chunk_size, (area.bottom - 1) // self.__chunk_size + 1):
+                chunk_rect = pygame.Rect(chunk_x*self.__chunk_size, chunk_y*self.__chunk_size,
+                                         self.__chunk_size, self.__chunk_size)
+                visible = chunk_rect.clip(area)
+                screen.blit(self.__get_chunk(chunk_x, chunk_y),
+                            (visible.x - offset[0], visible.y - offset[1]),
+                            visible.move(-chunk_rect.x, -chunk_rect.y))
+
+    def draw(self, screen, offset=(0, 0)):
+        """This method blits the part of the layer that fills the screen, when the
+        top-left corner of the screen shows the pixel offset of the maze."""
+        self.draw_area(screen, screen.get_rect(), offset)
+
+    def get_cache_stats(self):
+        """This accessor method returns a dictionary of the chunk cache statistics: the
+        hits, misses and evictions, the number of chunks cached and the bytes used."""
+        return {"hits": self.__hits, "misses": self.__misses, "evictions": self.__evictions,
+                "chunks": len(self.__chunks), "bytes": self.__used_bytes}
+
+class HUDLayer(object):
+    """This class represents the HUD drawn over the game: the gear collected, the
+    lives and the countdown. Its widgets are sprites that only render a new image when
+    the value they show changes, and the layer composites them into a single surface,
+    which is only built again when one of their images has changed."""
+    def __init__(self, widgets):
+        """This method instantiates the HUDLayer class. It accepts the list of widget
+        sprites, drawn in order, as a parameter."""
+        self.__widgets = list(widgets)
+        self.__shown = None
+        self.__surface = None
+        self.__rect = pygame.Rect(0, 0, 0, 0)
+        self.__changed_rects = []
+        self.__builds = 0
+
+    def update(self):
+        """This mutator method updates every widget, and composites their images again
+        if any of them has changed."""
+        for widget in self.__widgets:
+            widget.update()
+
+        shown = [(widget.image, widget.rect.topleft) for widget in self.__widgets]
+        if shown == self.__shown:
+            return
+        self.__shown = shown
+
+        old_rect = self.__rect
+        self.__rect = self.__widgets[0].rect.unionall([widget.rect for widget in self.__widgets[1:]])
+        self.__surface = pygame.Surface(self.__rect.size, pygame.SRCALPHA)
+        for widget in self.__widgets:
+            self.__surface.blit(widget.image, widget.rect.move(-self.__rect.x, -self.__rect.y))
+        # Most of the layer is transparent, and run-length encoding lets each blit
+        # skip those pixels rather than blend them, which is several times faster
+        if pygame.display.get_surface() is not None:
+            self.__surface = self.__surface.convert_alpha()
+        self.__surface.set_alpha(255, pygame.RLEACCEL)
+
+        # Both where the HUD was and where it is now must be pushed to the display
+        self.__changed_rects = [old_rect, self.__rect]
+        self.__builds += 1
+
+    def draw(self, screen):
+        """This method blits the HUD onto the screen, and returns the list of rects
+        that changed since it was last drawn. The HUD is blitted on every frame, since
+        the darkness is drawn over it, but the same pixels only need to be pushed to
+        the display when it has changed."""
+        if self.__surface is None:
+            return []
+        screen.blit(self.__surface, self.__rect)
+        changed_rects = self.__changed_rects
+        self.__changed_rects = []
+        return changed_rects
+
+    def get_rect(self):
+        """This accessor method returns the rect of the screen the HUD covers."""
+        return self.__rect
+
+    def get_builds(self):
+        """This accessor method returns the number of times the HUD was composited."""
+        return self.__builds
+
+class DirtyTracker(object):
+    """This class collects the regions of the screen that changed during a frame,
+    and pushes only those regions to the display instead of flipping the whole
+    screen. It also counts the number of pixels pushed, so that the savings of
+    the dirty rectangle mode can be measured."""
+    def __init__(self, screen, enabled=True):
+        """This method instantiates the DirtyTracker class. It accepts the screen
+        and enabled, a boolean that selects the dirty rectangle mode (True) or the
+        full-screen flip on every frame (False), as parameters."""
+        self.__screen_rect = screen.get_rect()
+        self.__enabled = enabled
+        self.__rects = []
+
+        # The first frame always pushes the whole screen
+        self.__full_screen = True
+
+        self.__pixels_pushed = 0
+        self.__total_pixels_pushed = 0
+        self.__frames = 0
+
+    def add(self, rect):
+        """This mutator method marks rect as changed during the current frame."""
+        rect = pygame.Rect(rect).clip(self.__screen_rect)
+        if rect.width and rect.height:
+            self.__rects.append(rect)
+
+    def add_rects(self, rects):
+        """This mutator method marks every rect in rects as changed."""
+        for rect in rects:
+            self.add(rect)
+
+    def invalidate(self):
+        """This mutator method marks the whole screen as changed, for frames in
+        which everything is redrawn (e.g. the flashlight flickering off)."""
+        self.__full_screen = True
+
+    def __merge_rects(self):
+        """This helper method merges overlapping rects together, so that no pixel
+        is pushed twice, and returns the merged list."""
+        merged = []
+        for rect in self.__rects:
+            # Keeps absorbing the rects this one overlaps until it overlaps none
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect = rect.union(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+        return merged
+
+    def present(self):
+        """This method pushes the changed regions of the screen to the display, and
+        returns the number of pixels that were pushed."""
+        if not self.__enabled or self.__full_screen:
+            pygame.display.flip()
+            self.__pixels_pushed = self.__screen_rect.width * self.__screen_rect.height
+        else:
+            rects = self.__merge_rects()
+            if rects:
+                pygame.display.update(rects)
+            self.__pixels_pushed = 0
+            for rect in rects:
+                self.__pixels_pushed += rect.width * rect.height
+
+        self.__rects = []
+        self.__full_screen = False
+        self.__total_pixels_pushed += self.__pixels_pushed
+        self.__frames += 1
+        return self.__pixels_pushed
+
+    def get_pixels_pushed(self):
+        """This accessor method returns the number of pixels pushed on the last frame."""
+        return self.__pixels_pushed
+
+    def get_average_pixels_pushed(self):
+        """This accessor method returns the average number of pixels pushed per frame."""
+        if self.__frames == 0:
+            return 0
+        return self.__total_pixels_pushed / self.__frames
+
+def draw_visible_world(screen, wall_layer, world_sprites, lit_rect, offset=(0, 0)):
+    """This function redraws the part of the maze that is visible through the lit
+    circle, lit_rect, a rect of the screen whose top-left corner shows the pixel
+    offset of the maze. The wall layer is blitted only inside the circle, and the
+    world sprites that do not overlap it are skipped entirely, since they would be
+    covered in darkness anyway. It returns the number of sprites drawn."""
+    wall_layer.draw_area(screen, lit_rect, offset)
+    
+    sprites_drawn = 0
+    for sprite in world_sprites:
+        sprite_rect = sprite.rect.move(-offset[0], -offset[1])
+        if sprite_rect.colliderect(lit_rect):
+            screen.blit(sprite.image, sprite_rect)
+            sprites_drawn += 1
+    return sprites_drawn
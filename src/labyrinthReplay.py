@@ -0,0 +1,289 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the replays of the "Minotaur Labyrinth" game. Every
+             random choice of a game comes from the seed of its LabyrinthSim (and of its
+             generated maze), so a game is replayed exactly from its seed, its maze size
+             and settings, and the inputs held on each tick.
+
+             A Replay records the inputs as one bit mask per tick, run-length encoded in
+             a small binary file, along with keyframes: snapshots of the whole game
+             every KEYFRAME_INTERVAL ticks, so a replay can be sought to any tick without
+             playing it from the start. A replay plays back headless, as fast as the CPU
+             allows, and checks the game against each keyframe it passes, or on screen
+             through the game() function of the Minotaur_Labyrinth module. A game is
+             only recorded when the LABYRINTH_REPLAY environment variable names the file
+             to save it to.
+
+             Run it from the root of the repository:
+                 python -m src.labyrinthReplay info replay_file
+                 python -m src.labyrinthReplay play replay_file [--headless] [--seek tick]
+
+             It imports the JSON, OS, Struct, Sys, Time and Zlib modules, and the
+             labyrinthSim and labyrinthMaze modules for the game itself.
+"""
+
+import json, os, struct, sys, time, zlib
+import src.labyrinthSim, src.labyrinthMaze
+
+# The first bytes of a replay file, and the version of its format. A replay of version
+# 2 is read too: its keyframes also hold the whole maze, which is left out
+MAGIC = b"LBRP"
+VERSION = 3
+READABLE_VERSIONS = (2, 3)
+
+# The header holds the magic bytes, the version, the seed, the maze size (0 for the
+# original maze), the grace period, the movement delay, the flicker chance, the number
+# of lives and the size of the horde
+HEADER_FORMAT = "<4sBQIIIIII"
+RUN_FORMAT = "<BH"
+KEYFRAME_FORMAT = "<II"
+COUNT_FORMAT = "<I"
+
+# The bit of each input in the mask of a tick
+ACTION_BITS = {"DOWN": 1, "UP": 2, "RIGHT": 4, "LEFT": 8, "LIGHT": 16}
+
+# The set of inputs of each mask, built once so decoding a tick allocates nothing
+MASK_ACTIONS = tuple(frozenset(action for action, bit in ACTION_BITS.items() if mask & bit)
+                     for mask in range(32))
+
+# The number of ticks between two keyframes: 10 seconds of game time
+KEYFRAME_INTERVAL = 300
+
+# The environment variable that chooses the file the game's replay is saved to. The
+# game is only recorded when it is set
+REPLAY_VARIABLE = "LABYRINTH_REPLAY"
+
+USAGE = """usage: python -m src.labyrinthReplay info replay_file
+       python -m src.labyrinthReplay play replay_file [--headless] [--seek tick]"""
+
+def get_replay_path():
+    """This function returns the path the game's replay is saved to, read from the
+    LABYRINTH_REPLAY environment variable, or None if it is not set."""
+    return os.environ.get(REPLAY_VARIABLE) or None
+
+def encode_actions(actions):
+    """This function returns the bit mask of a collection of inputs."""
+    mask = 0
+    for action in actions:
+        mask |= ACTION_BITS[action]
+    return mask
+
+class ReplayError(Exception):
+    """This class represents an error in a replay file, or a replay that no longer
+    plays the same game."""
+
+class Replay(object):
+    """This class represents the recording of one game: its seed, maze size and
+    settings, the inputs of every tick, and its keyframes."""
+    def __init__(self, seed, maze_size=0, settings=None, inputs=None, keyframes=None):
+        """This method instantiates the Replay class. It accepts the seed of the game,
+        the size of its generated maze (0 for the original maze), its settings (where
+        any missing setting is the default of LabyrinthSim), the bytearray of the input
+        mask of each tick and the dictionary mapping the tick of each keyframe to its
+        game state, as parameters."""
+        self.__settings = {"grace_period": src.labyrinthSim.GRACE_PERIOD,
+                           "movement_delay": src.labyrinthSim.MOVEMENT_DELAY,
+                           "flicker_chance": src.labyrinthSim.FLICKER_CHANCE,
+                           "lives": src.labyrinthSim.STARTING_LIVES,
+                           "horde_size": 0}
+        if settings:
+            self.__settings.update(settings)
+        self.__seed = seed
+        self.__maze_size = maze_size
+        self.__inputs = inputs if inputs is not None else bytearray()
+        self.__keyframes = keyframes if keyframes is not None else {}
+
+    def new_layout(self):
+        """This method returns the MazeLayout the game was played in."""
+        if self.__maze_size:
+            return src.labyrinthMaze.generate_layout(self.__maze_size, self.__seed)
+        return src.labyrinthMaze.default_layout()
+
+    def new_sim(self):
+        """This method returns a new LabyrinthSim of the game, on its first tick."""
+        return src.labyrinthSim.LabyrinthSim(self.__seed, layout=self.new_layout(), **self.__settings)
+
+    def record(self, actions, sim=None):
+        """This mutator method records the inputs of the next tick. It accepts the
+        collection of inputs held during the tick and, every KEYFRAME_INTERVAL ticks,
+        the LabyrinthSim before the tick is played, whose state is kept as a keyframe."""
+        tick = len(self.__inputs)
+        if sim is not None and tick % KEYFRAME_INTERVAL == 0:
+            self.__keyframes[tick] = sim.get_state()
+        self.__inputs.append(encode_actions(actions))
+
+    def get_actions(self, tick):
+        """This accessor method returns the frozenset of inputs held on tick."""
+        return MASK_ACTIONS[self.__inputs[tick]]
+
+    def get_num_ticks(self):
+        """This accessor method returns the number of ticks recorded."""
+        return len(self.__inputs)
+
+    def get_seed(self):
+        """This accessor method returns the seed of the game."""
+        return self.__seed
+
+    def get_maze_size(self):
+        """This accessor method returns the size of the generated maze, or 0 for the
+        original maze."""
+        return self.__maze_size
+
+    def get_settings(self):
+        """This accessor method returns the dictionary of the game's settings."""
+        return dict(self.__settings)
+
+    def get_keyframe_ticks(self):
+        """This accessor method returns the sorted list of the ticks of the keyframes."""
+        return sorted(self.__keyframes)
+
+    def seek(self, tick, sim=None):
+        """This method returns a LabyrinthSim of the game just before tick is played. It
+        starts from the last keyframe at or before tick, and plays the ticks from there
+        on. It accepts the tick, and the LabyrinthSim of this game to move (a new one
+        if None), as parameters. It raises a ReplayError if the tick is not within the
+        replay, from 0 up to its number of ticks."""
+        if not 0 <= tick <= len(self.__inputs):
+            raise ReplayError("Tick %d is outside the replay, which has %d ticks" % (tick, len(self.__inputs)))
+        if sim is None:
+            sim = self.new_sim()
+        else:
+            sim.reset()
+        start = 0
+        for keyframe_tick in self.__keyframes:
+            if start < keyframe_tick <= tick:
+                start = keyframe_tick
+        if start:
+            sim.load_state(self.__keyframes[start])
+        for played_tick in range(start, tick):
+            sim.step(MASK_ACTIONS[self.__inputs[played_tick]])
+        return sim
+
+    def play_headless(self, verify=True, start_tick=0):
+        """This method plays the replay from start_tick to its end without a display,
+        as fast as the CPU allows, and returns a dictionary of the number of ticks
+        played, the result of the game, the seconds it took and the ticks per second.
+        If verify is True, the game is compared with every keyframe it passes, and a
+        ReplayError is raised as soon as it differs."""
+        sim = self.seek(start_tick)
+        inputs = self.__inputs
+        keyframes = self.__keyframes if verify else {}
+
+        begin = time.perf_counter()
+        for tick in range(start_tick, len(inputs)):
+            if tick in keyframes and json.loads(json.dumps(sim.get_state())) != keyframes[tick]:
+                raise ReplayError("The game differs from the replay's keyframe at tick %d" % tick)
+            sim.step(MASK_ACTIONS[inputs[tick]])
+        seconds = time.perf_counter() - begin
+
+        played = len(inputs) - start_tick
+        return {"ticks": played, "result": sim.get_result(), "seconds": seconds,
+                "ticks_per_second": played / seconds if seconds else 0.0}
+
+    def save(self, path):
+        """This method writes the replay to a binary file at path."""
+        settings = self.__settings
+        chunks = [struct.pack(HEADER_FORMAT, MAGIC, VERSION, self.__seed, self.__maze_size,
+                              settings["grace_period"], settings["movement_delay"],
+                              settings["flicker_chance"], settings["lives"], settings["horde_size"])]
+
+        # The inputs are written as runs of the same mask, since they are held for
+        # many ticks at a time
+        runs = []
+        for mask in self.__inputs:
+            if runs and runs[-1][0] == mask and runs[-1][1] < 0xFFFF:
+                runs[-1][1] += 1
+            else:
+                runs.append([mask, 1])
+        chunks.append(struct.pack(COUNT_FORMAT, len(runs)))
+        chunks.extend(struct.pack(RUN_FORMAT, mask, length) for mask, length in runs)
+
+        # Each keyframe is its game state as compressed JSON, which stays safe to read
+        # from replays sent from other machines
+        chunks.append(struct.pack(COUNT_FORMAT, len(self.__keyframes)))
+        for tick in sorted(self.__keyframes):
+            blob = zlib.compress(json.dumps(self.__keyframes[tick], separators=(",", ":")).encode())
+            chunks.append(struct.pack(KEYFRAME_FORMAT, tick, len(blob)))
+            chunks.append(blob)
+
+        with open(path, "wb") as replay_file:
+            replay_file.write(b"".join(chunks))
+
+def load(path):
+    """This function reads the binary replay file at path, and returns its Replay. It
+    raises a ReplayError if the file is not a replay, or is of another version."""
+    with open(path, "rb") as replay_file:
+        data = replay_file.read()
+
+    try:
+        magic, version = struct.unpack_from("<4sB", data)
+        if magic != MAGIC:
+            raise ReplayError("%s is not a replay file" % path)
+        if version not in READABLE_VERSIONS:
+            raise ReplayError("%s is a replay of version %d, not %d" % (path, version, VERSION))
+        (magic, version, seed, maze_size, grace_period, movement_delay, flicker_chance,
+         lives, horde_size) = struct.unpack_from(HEADER_FORMAT, data)
+        offset = struct.calcsize(HEADER_FORMAT)
+
+        inputs = bytearray()
+        num_runs, = struct.unpack_from(COUNT_FORMAT, data, offset)
+        offset += struct.calcsize(COUNT_FORMAT)
+        for mask, length in struct.iter_unpack(RUN_FORMAT, data[offset:offset + num_runs * struct.calcsize(RUN_FORMAT)]):
+            inputs.extend(bytes((mask,)) * length)
+        offset += num_runs * struct.calcsize(RUN_FORMAT)
+
+        keyframes = {}
+        num_keyframes, = struct.unpack_from(COUNT_FORMAT, data, offset)
+        offset += struct.calcsize(COUNT_FORMAT)
+        for keyframe in range(num_keyframes):
+            tick, length = struct.unpack_from(KEYFRAME_FORMAT, data, offset)
+            offset += struct.calcsize(KEYFRAME_FORMAT)
+            keyframes[tick] = json.loads(zlib.decompress(data[offset:offset + length]))
+            keyframes[tick].pop("maze", None)
+            offset += length
+    except (struct.error, zlib.error, ValueError) as error:
+        raise ReplayError("%s is a damaged replay file: %s" % (path, error))
+
+    settings = {"grace_period": grace_period, "movement_delay": movement_delay,
+                "flicker_chance": flicker_chance, "lives": lives, "horde_size": horde_size}
+    return Replay(seed, maze_size, settings, inputs, keyframes)
+
+def main(arguments):
+    if len(arguments) < 2 or arguments[0] not in ("info", "play"):
+        print(USAGE)
+        return 2
+    replay = load(arguments[1])
+
+    if arguments[0] == "info":
+        print("seed %d, maze %s, %d ticks (%.1f s), %d keyframes, settings %s" %
+              (replay.get_seed(), replay.get_maze_size() or "original", replay.get_num_ticks(),
+               replay.get_num_ticks() / src.labyrinthSim.TICK_RATE, len(replay.get_keyframe_ticks()),
+               replay.get_settings()))
+        return 0
+
+    start_tick = 0
+    if "--seek" in arguments:
+        try:
+            start_tick = int(arguments[arguments.index("--seek") + 1])
+        except (IndexError, ValueError):
+            print(USAGE)
+            return 2
+        if not 0 <= start_tick <= replay.get_num_ticks():
+            print("Cannot seek to tick %d: the replay has %d ticks" % (start_tick, replay.get_num_ticks()))
+            return 2
+
+    if "--headless" in arguments:
+        stats = replay.play_headless(start_tick=start_tick)
+        print("%d ticks in %.3f s (%.0f ticks/s), result %s" %
+              (stats["ticks"], stats["seconds"], stats["ticks_per_second"], stats["result"]))
+        return 0
+
+    # The game module imports Pygame, so it is only imported to play on screen
+    from src import Minotaur_Labyrinth
+    Minotaur_Labyrinth.play_replay(replay, start_tick)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,778 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the simulation core of the "Minotaur Labyrinth" game.
+             It owns every rule of the game - the maze, the Player, the Minotaur and
+             his horde, the gear pieces, the lives, the grace period countdown and the
+             flickering of the flashlight - and advances them by one tick for each call
+             to step().
+
+             It does not use a window, audio or a frame cap, so it can run thousands
+             of games as fast as the CPU allows. The game() function in the
+             Minotaur_Labyrinth module renders it, and plays the sounds for the events
+             returned by step(). It imports the Random module, the labyrinthMaze module
+             for the layout of the maze, and the labyrinthPathing and labyrinthAudio
+             modules for the Minotaur's AI and growls.
+"""
+
+import random, src.labyrinthMaze, src.labyrinthPathing, src.labyrinthAudio
+
+# The number of gear pieces the Player must collect to kill the Minotaur
+NUM_GEAR_PIECES = src.labyrinthMaze.NUM_GEAR_PIECES
+
+# The number of ticks per second of game time
+TICK_RATE = 30
+
+# The default difficulty of a game: the grace period in seconds before the Minotaur
+# is released, the number of ticks between two Player moves, the 1-in-N chance per
+# tick of the flashlight flickering off, and the Player's number of lives
+GRACE_PERIOD = 15
+MOVEMENT_DELAY = 15
+FLICKER_CHANCE = 100
+STARTING_LIVES = 3
+
+# The number of ticks it takes to walk from one tile to the next, moving 5 pixels per tick
+TILE_SIZE = 50
+MOVE_TICKS = 10
+MOVE_SPEED = TILE_SIZE // MOVE_TICKS
+
+# The tile offset of each direction
+DIRECTION_OFFSETS = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+
+# The order in which held arrow keys are tried, matching the original controls
+MOVE_ORDER = ("DOWN", "UP", "RIGHT", "LEFT")
+
+# The number of ticks a Minotaur of a horde waits before looking for a path again when
+# it has none (e.g. it stands on the Player's tile, or is cut off from it)
+HORDE_IDLE_TICKS = 5
+
+def hide_gear_pieces(maze_arrangement, layout, rng, num_pieces=NUM_GEAR_PIECES):
+    """This function hides the gear pieces on random tiles of the layout's FreeCellIndex,
+    and marks each of their tiles as HIDDEN_GEAR_PIECE. It accepts the maze_arrangement,
+    its MazeLayout, a Random instance and the number of pieces as parameters, and
+    returns a dictionary mapping each tile (x, y) to the number of the gear piece
+    hidden on it."""
+    gear_pieces = {}
+    free_cells = layout.get_free_cell_index().sample(rng, num_pieces)
+    for gear_item, (x, y) in enumerate(free_cells):
+        maze_arrangement.set_flag(x, y, src.labyrinthMaze.HIDDEN_GEAR_PIECE)
+        gear_pieces[(x, y)] = gear_item
+    return gear_pieces
+
+class OccupancyGrid(object):
+    """This class represents an index of what stands on each tile of the maze. Every
+    occupant is a tuple (kind, number), e.g. ("player", 0), ("minotaur", 0) or
+    ("gear", 2), and is kept up to date by the moves, respawns and pickups of the
+    game, so finding what stands on a tile costs one lookup no matter how many
+    occupants the maze holds."""
+    def __init__(self):
+        """This method instantiates the OccupancyGrid class, with every tile empty.
+        Only the occupied tiles are stored, so any size of maze costs the same."""
+        self.__occupants = {}
+
+    def add(self, tile, occupant):
+        """This mutator method places occupant on tile, a tuple (x, y)."""
+        self.__occupants.setdefault(tile, []).append(occupant)
+
+    def remove(self, tile, occupant):
+        """This mutator method takes occupant off tile."""
+        occupants = self.__occupants[tile]
+        occupants.remove(occupant)
+        if not occupants:
+            del self.__occupants[tile]
+
+    def move(self, occupant, old_tile, new_tile):
+        """This mutator method moves occupant from old_tile onto new_tile."""
+        self.remove(old_tile, occupant)
+        self.add(new_tile, occupant)
+
+    def get_occupants(self, tile):
+        """This accessor method returns a tuple of the occupants of tile."""
+        return tuple(self.__occupants.get(tile, ()))
+
+    def get_occupant(self, tile, kind):
+        """This accessor method returns the first occupant of tile of the given kind,
+        or None if there is none."""
+        for occupant in self.__occupants.get(tile, ()):
+            if occupant[0] == kind:
+                return occupant
+        return None
+
+class Walker(object):
+    """This class represents the logical state of a character that walks through the
+    maze one tile at a time: its tile, its direction, and the progress of its move
+    animation. The Player and Minotaur sprites draw themselves from it."""
+    def __init__(self, tile_x, tile_y, x_offset, y_offset, occupancy=None, occupant=None):
+        """This method instantiates the Walker class. It accepts the spawn tile, the
+        pixel offset that centers the character's image on a tile, and optionally the
+        OccupancyGrid to keep the character's tile in and the occupant tuple that
+        stands for the character in it, as parameters."""
+        self.__x_offset = x_offset
+        self.__y_offset = y_offset
+        self.__direction = "DOWN"
+        self.__occupancy = occupancy
+        self.__occupant = occupant
+        self.__tile_x = tile_x
+        self.__tile_y = tile_y
+        if occupancy is not None:
+            occupancy.add((tile_x, tile_y), occupant)
+        self.respawn(tile_x, tile_y)
+
+    def respawn(self, tile_x, tile_y):
+        """This mutator method places the character on the tile at column tile_x and
+        row tile_y, cancelling any move in progress."""
+        if self.__occupancy is not None:
+            self.__occupancy.move(self.__occupant, (self.__tile_x, self.__tile_y), (tile_x, tile_y))
+        self.__previous_x = tile_x
+        self.__previous_y = tile_y
+        self.__tile_x = tile_x
+        self.__tile_y = tile_y
+        self.__animating = False
+        self.__move_length = 0
+        self.__frame_index = 0
+        self.__image_index = 0
+        self.__x = tile_x*TILE_SIZE + self.__x_offset
+        self.__y = tile_y*TILE_SIZE + self.__y_offset
+
+        # The character jumps to its spawn point, so there is nothing to interpolate
+        self.__last_x = self.__x
+        self.__last_y = self.__y
+
+    def walk(self, direction, maze_arrangement):
+        """This mutator method starts moving the character one tile in direction. It
+        checks if that tile is free and if the character is currently in an animation
+        cycle, and returns True if the move was started."""
+        if self.__animating:
+            return False
+
+        x_offset, y_offset = DIRECTION_OFFSETS[direction]
+        if maze_arrangement.is_wall(self.__tile_x + x_offset, self.__tile_y + y_offset):
+            return False
+
+        # Sets the direction, animating state to true, and moves the character onto
+        # the next tile. The pixel position catches up over the next MOVE_TICKS ticks
+        self.__direction = direction
+        self.__animating = True
+        self.__previous_x = self.__tile_x
+        self.__previous_y = self.__tile_y
+        self.__tile_x += x_offset
+        self.__tile_y += y_offset
+        if self.__occupancy is not None:
+            self.__occupancy.move(self.__occupant, (self.__previous_x, self.__previous_y),
+                                  (self.__tile_x, self.__tile_y))
+        return True
+
+    def tick(self):
+        """This mutator method advances the move animation by one tick, moving the
+        character 5 pixels towards its tile and stepping through the walk cycle."""
+        self.__last_x = self.__x
+        self.__last_y = self.__y
+        if not self.__animating:
+            return
+
+        # The walk cycle has 5 images, each shown for 2 ticks
+        self.__image_index = self.__frame_index // 2
+        x_offset, y_offset = DIRECTION_OFFSETS[self.__direction]
+        self.__x += x_offset * MOVE_SPEED
+        self.__y += y_offset * MOVE_SPEED
+
+        self.__move_length += 1
+        self.__frame_index = (self.__frame_index + 1) % MOVE_TICKS
+
+        if self.__move_length >= MOVE_TICKS:
+            self.__animating = False
+            self.__move_length = 0
+
+    def get_tile_position(self):
+        """This accessor method returns a tuple (x, y) representing the tile the
+        character is on, or is moving onto."""
+        return self.__tile_x, self.__tile_y
+
+    def get_previous_tile(self):
+        """This accessor method returns a tuple (x, y) representing the tile the
+        character left on its last move."""
+        return self.__previous_x, self.__previous_y
+
+    def get_pixel_position(self):
+        """This accessor method returns a tuple (x, y) representing the top-left pixel
+        position at which the character is drawn."""
+        return self.__x, self.__y
+
+    def get_interpolated_position(self, alpha):
+        """This accessor method returns a tuple (x, y) representing the top-left pixel
+        position of the character a fraction alpha (from 0 to 1) of the way from its
+        position on the previous tick to its position on this tick, so that it can be
+        drawn smoothly between ticks."""
+        return (round(self.__last_x + (self.__x - self.__last_x) * alpha),
+                round(self.__last_y + (self.__y - self.__last_y) * alpha))
+
+    def get_direction(self):
+        """This accessor method returns the direction the character is facing."""
+        return self.__direction
+
+    def get_image_index(self):
+        """This accessor method returns the index of the image of the walk cycle that
+        the character is showing."""
+        return self.__image_index
+
+    def is_animating(self):
+        """This accessor method returns True if the character is moving between tiles."""
+        return self.__animating
+
+    def get_state(self):
+        """This accessor method returns the state of the character as a list of plain
+        values, which set_state() restores."""
+        return [self.__tile_x, self.__tile_y, self.__previous_x, self.__previous_y,
+                self.__direction, self.__animating, self.__move_length, self.__frame_index,
+                self.__image_index, self.__x, self.__y, self.__last_x, self.__last_y]
+
+    def set_state(self, state):
+        """This mutator method restores a state returned by get_state(), moving the
+        character's occupant to its tile."""
+        old_tile = (self.__tile_x, self.__tile_y)
+        (self.__tile_x, self.__tile_y, self.__previous_x, self.__previous_y,
+         self.__direction, self.__animating, self.__move_length, self.__frame_index,
+         self.__image_index, self.__x, self.__y, self.__last_x, self.__last_y) = state
+        if self.__occupancy is not None:
+            self.__occupancy.move(self.__occupant, old_tile, (self.__tile_x, self.__tile_y))
+
+class Horde(object):
+    """This class represents a horde of Minotaurs chasing the Player together. Instead
+    of a Walker each, the state of the horde is kept in flat lists indexed by the
+    number of each Minotaur, so a single call to update() moves all of them. They all
+    follow the same FlowField, and each one only decides where to go on the tick its
+    last move ends, so the decisions of the horde are spread over the ticks of a move
+    and a tick only costs as much as the Minotaurs that are due on it."""
+    def __init__(self, maze_arrangement, flow_field, tiles, x_offset=3, y_offset=0, occupancy=None):
+        """This method instantiates the Horde class. It accepts the maze_arrangement,
+        the FlowField the horde shares (with the Minotaur, in a game), the list of the
+        spawn tiles (x, y) of its Minotaurs, the pixel offset that centers a Minotaur's
+        image on a tile, and the OccupancyGrid to keep the tile of each Minotaur in (a
+        new one if None), as parameters. Each Minotaur stands in the OccupancyGrid as
+        the occupant ("horde", number)."""
+        self.__flow_field = flow_field
+        self.__rows = maze_arrangement.get_size()[1]
+        self.__x_offset = x_offset
+        self.__y_offset = y_offset
+        if occupancy is None:
+            occupancy = OccupancyGrid()
+        self.__occupancy = occupancy
+        self.__tick = 0
+
+        # The tiles are flat indices x*rows + y, the same as those of the FlowField.
+        # The tick on which each move started is None until the Minotaur first moves
+        self.__tiles = [x*self.__rows + y for x, y in tiles]
+        self.__previous_tiles = list(self.__tiles)
+        self.__directions = ["DOWN"] * len(tiles)
+        self.__move_starts = [None] * len(tiles)
+
+        # The numbers of the Minotaurs that decide on each tick. Their first decisions
+        # are spread evenly over the ticks of one move
+        self.__schedule = {}
+        for number, tile in enumerate(tiles):
+            occupancy.add(tile, ("horde", number))
+            self.__schedule.setdefault(number % MOVE_TICKS + 1, []).append(number)
+
+        self.__decisions = 0
+
+    def update(self, target_x, target_y):
+        """This mutator method advances the horde by one tick. Every Minotaur whose
+        move has ended steps onto the neighbouring tile closest to the target tile at
+        column target_x and row target_y, or waits HORDE_IDLE_TICKS ticks if it cannot
+        get any closer. It returns the number of Minotaurs that decided on this tick."""
+        self.__tick += 1
+        tick = self.__tick
+        due = self.__schedule.pop(tick, None)
+        if not due:
+            return 0
+
+        self.__flow_field.set_target(target_x, target_y)
+        distances = self.__flow_field.get_distances()
+        rows = self.__rows
+        num_tiles = len(distances)
+        tiles = self.__tiles
+        schedule = self.__schedule
+
+        # The neighbours are tried in the order of the FlowField's next_step(), so a
+        # Minotaur of the horde takes the same path as the Minotaur would
+        for number in due:
+            index = tiles[number]
+            distance = distances[index]
+            direction = None
+            if distance > 0:
+                closer = distance - 1
+                y = index % rows
+                if y > 0 and distances[index - 1] == closer:
+                    direction, next_index = "UP", index - 1
+                elif y < rows - 1 and distances[index + 1] == closer:
+                    direction, next_index = "DOWN", index + 1
+                elif index >= rows and distances[index - rows] == closer:
+                    direction, next_index = "LEFT", index - rows
+                elif index + rows < num_tiles and distances[index + rows] == closer:
+                    direction, next_index = "RIGHT", index + rows
+
+            if direction is None:
+                schedule.setdefault(tick + HORDE_IDLE_TICKS, []).append(number)
+                continue
+
+            self.__previous_tiles[number] = index
+            tiles[number] = next_index
+            self.__directions[number] = direction
+            self.__move_starts[number] = tick
+            self.__occupancy.move(("horde", number), divmod(index, rows), divmod(next_index, rows))
+            schedule.setdefault(tick + MOVE_TICKS, []).append(number)
+
+        self.__decisions += len(due)
+        return len(due)
+
+    def __get_progress(self, number, tick):
+        """This helper method returns the number of ticks of its move the Minotaur has
+        walked on tick, which is MOVE_TICKS once it has reached its tile."""
+        move_start = self.__move_starts[number]
+        if move_start is None:
+            return MOVE_TICKS
+        return max(0, min(MOVE_TICKS, tick - move_start + 1))
+
+    def __get_position(self, number, tick):
+        """This helper method returns the top-left pixel position (x, y) of the Minotaur
+        on tick."""
+        previous_x, previous_y = divmod(self.__previous_tiles[number], self.__rows)
+        x_offset, y_offset = DIRECTION_OFFSETS[self.__directions[number]]
+        progress = self.__get_progress(number, tick) * MOVE_SPEED
+        return (previous_x*TILE_SIZE + self.__x_offset + x_offset*progress,
+                previous_y*TILE_SIZE + self.__y_offset + y_offset*progress)
+
+    def catches(self, player_tile, player_previous_tile, player_animating):
+        """This accessor method returns True if a Minotaur of the horde stands on the
+        Player's tile, or is walking through the Player in the opposite direction. It
+        accepts the tile the Player is on, the tile the Player left, and whether the
+        Player is moving, as parameters."""
+        if self.__occupancy.get_occupant(player_tile, "horde") is not None:
+            return True
+        if not player_animating:
+            return False
+
+        player_index = player_tile[0]*self.__rows + player_tile[1]
+        for kind, number in self.__occupancy.get_occupants(player_previous_tile):
+            if kind == "horde" and self.__previous_tiles[number] == player_index and \
+               self.__get_progress(number, self.__tick) < MOVE_TICKS:
+                return True
+        return False
+
+    def get_numbers_in(self, left, top, right, bottom):
+        """This accessor method returns the list of the numbers of the Minotaurs whose
+        tile is within the columns left to right and the rows top to bottom, both
+        included. It looks up the tiles of the OccupancyGrid, so its cost depends on
+        the size of the area and not on the size of the horde."""
+        numbers = []
+        for x in range(left, right + 1):
+            for y in range(top, bottom + 1):
+                for kind, number in self.__occupancy.get_occupants((x, y)):
+                    if kind == "horde":
+                        numbers.append(number)
+        return numbers
+
+    def get_size(self):
+        """This accessor method returns the number of Minotaurs in the horde."""
+        return len(self.__tiles)
+
+    def get_tile_position(self, number):
+        """This accessor method returns a tuple (x, y) representing the tile the
+        Minotaur is on, or is moving onto."""
+        return divmod(self.__tiles[number], self.__rows)
+
+    def get_pixel_position(self, number):
+        """This accessor method returns a tuple (x, y) representing the top-left pixel
+        position at which the Minotaur is drawn."""
+        return self.__get_position(number, self.__tick)
+
+    def get_interpolated_position(self, number, alpha):
+        """This accessor method returns a tuple (x, y) representing the top-left pixel
+        position of the Minotaur a fraction alpha (from 0 to 1) of the way from its
+        position on the previous tick to its position on this tick."""
+        last_x, last_y = self.__get_position(number, self.__tick - 1)
+        x, y = self.__get_position(number, self.__tick)
+        return round(last_x + (x - last_x) * alpha), round(last_y + (y - last_y) * alpha)
+
+    def get_direction(self, number):
+        """This accessor method returns the direction the Minotaur is facing."""
+        return self.__directions[number]
+
+    def get_image_index(self, number):
+        """This accessor method returns the index of the image of the walk cycle that
+        the Minotaur is showing, as a Walker would: each image is shown for 2 ticks."""
+        if self.__move_starts[number] is None:
+            return 0
+        return (self.__get_progress(number, self.__tick) - 1) // 2
+
+    def get_decisions(self):
+        """This accessor method returns the number of decisions made by the horde."""
+        return self.__decisions
+
+    def get_state(self):
+        """This accessor method returns the state of the horde as a dictionary of plain
+        values, which set_state() restores."""
+        return {"tick": self.__tick,
+                "tiles": list(self.__tiles),
+                "previous_tiles": list(self.__previous_tiles),
+                "directions": list(self.__directions),
+                "move_starts": list(self.__move_starts),
+                "schedule": [[tick, list(numbers)] for tick, numbers in sorted(self.__schedule.items())]}
+
+    def set_state(self, state):
+        """This mutator method restores a state returned by get_state() of a horde of
+        the same size, moving the occupant of each Minotaur to its tile."""
+        rows = self.__rows
+        for number, index in enumerate(self.__tiles):
+            self.__occupancy.remove(divmod(index, rows), ("horde", number))
+        self.__tick = state["tick"]
+        self.__tiles = list(state["tiles"])
+        self.__previous_tiles = list(state["previous_tiles"])
+        self.__directions = list(state["directions"])
+        self.__move_starts = list(state["move_starts"])
+        self.__schedule = {tick: list(numbers) for tick, numbers in state["schedule"]}
+        for number, index in enumerate(self.__tiles):
+            self.__occupancy.add(divmod(index, rows), ("horde", number))
+
+class LabyrinthSim(object):
+    """This class represents one game of "Minotaur Labyrinth", without any display."""
+    def __init__(self, seed=None, layout=None, grace_period=GRACE_PERIOD,
+                 movement_delay=MOVEMENT_DELAY, flicker_chance=FLICKER_CHANCE, lives=STARTING_LIVES,
+                 horde_size=0):
+        """This method instantiates the LabyrinthSim class. It accepts the seed of the
+        game's random number generator, the MazeLayout (the original maze if None),
+        the grace period in seconds before the Minotaur is released, the number of ticks
+        between two Player moves, the 1-in-N chance per tick of the flashlight flickering
+        off, the Player's number of lives, and the number of Minotaurs of the Horde
+        released with the Minotaur, as parameters."""
+        self.__seed = seed
+        if layout is None:
+            layout = src.labyrinthMaze.default_layout()
+        self.__layout = layout
+        self.__grace_period = grace_period
+        self.__movement_delay = movement_delay
+        self.__flicker_chance = flicker_chance
+        self.__starting_lives = lives
+        self.__horde_size = horde_size
+        self.__profiler = None
+        self.reset()
+
+    def reset(self):
+        """This mutator method starts the game over from its first tick, with the same
+        seed, so a game replays identically for the same actions."""
+        self.__rng = random.Random(self.__seed)
+
+        self.__maze_arrangement = self.__layout.new_maze_arrangement()
+        self.__gear_pieces = hide_gear_pieces(self.__maze_arrangement, self.__layout, self.__rng)
+
+        # Everything that can be picked up or run into is indexed by its tile
+        self.__occupancy = OccupancyGrid()
+        for tile, gear_item in self.__gear_pieces.items():
+            self.__occupancy.add(tile, ("gear", gear_item))
+
+        player_x, player_y = self.__layout.get_player_spawn()
+        minotaur_x, minotaur_y = self.__layout.get_minotaur_spawn()
+        self.__player = Walker(player_x, player_y, 14, 3, self.__occupancy, ("player", 0))
+        self.__minotaur = Walker(minotaur_x, minotaur_y, 3, 0, self.__occupancy, ("minotaur", 0))
+        self.__flow_field = src.labyrinthPathing.FlowField(self.__maze_arrangement)
+        self.__proximity_map = src.labyrinthAudio.ProximityMap(self.__flow_field)
+
+        # The horde waits wherever it was spawned until the gates open, and shares the
+        # Minotaur's flow field. It cannot be killed, and it does not growl
+        self.__horde = None
+        if self.__horde_size:
+            horde_tiles = self.__layout.get_spawn_cell_index().sample(self.__rng, self.__horde_size)
+            self.__horde = Horde(self.__maze_arrangement, self.__flow_field, horde_tiles, 3, 0, self.__occupancy)
+
+        self.__tick = 0
+        self.__countdown = self.__grace_period
+        self.__gates_open = False
+        self.__lives = self.__starting_lives
+        self.__num_gear_collected = 0
+        self.__movement_cooldown = 0
+        self.__growl_counter = 0
+        self.__player_hit = False
+        self.__blackout = False
+        self.__result = None
+
+    def step(self, actions=()):
+        """This method advances the game by one tick. It accepts actions, a collection
+        of the inputs held during the tick: "UP", "DOWN", "LEFT" and "RIGHT" for the
+        arrow keys, and "LIGHT" for a press of the flashlight key. It returns a list of
+        (event, detail) tuples describing what happened during the tick, which the
+        renderer uses to play sounds and update the display."""
+        events = []
+        if self.__result is not None:
+            return events
+        profiler = self.__profiler
+
+        if self.__movement_cooldown > 0:
+            self.__movement_cooldown -= 1
+
+        # Toggles the flashlight
+        if "LIGHT" in actions:
+            self.__blackout = not self.__blackout
+            events.append(("click", None))
+
+        # Moves the Player in the first free direction among the held arrow keys. Any
+        # held arrow key starts the cooldown, even when the Player cannot move
+        if self.__movement_cooldown == 0:
+            for direction in MOVE_ORDER:
+                if direction in actions:
+                    if self.__player.walk(direction, self.__maze_arrangement):
+                        events.append(("walk", direction))
+                    self.__movement_cooldown = self.__movement_delay
+        if profiler:
+            profiler.mark("movement")
+
+        self.__collect_gear(events)
+        self.__check_catch(events)
+        if profiler:
+            profiler.mark("collision")
+        if self.__result is not None:
+            return events
+
+        self.__play_growl(events)
+        if profiler:
+            profiler.mark("audio")
+
+        # Reduces the grace period timer by one second every 30 ticks, and opens the
+        # gates of the Minotaur's chamber once it has run out
+        self.__tick += 1
+        self.__countdown = self.__grace_period - self.__tick // TICK_RATE
+        if self.__countdown <= 0 and not self.__gates_open:
+            gate_cells = self.__maze_arrangement.open_gates()
+            self.__flow_field.invalidate()
+            self.__gates_open = True
+            events.append(("gates_open", gate_cells))
+
+        self.__follow_player()
+        if self.__horde and self.__gates_open:
+            self.__horde.update(*self.__player.get_tile_position())
+        if profiler:
+            profiler.mark("pathing")
+        self.__player.tick()
+        self.__minotaur.tick()
+
+        # The flashlight has a random chance of flickering off while it is on
+        if not self.__blackout:
+            if self.__rng.randint(1, self.__flicker_chance) == 1:
+                self.__blackout = True
+                events.append(("shock", None))
+        if profiler:
+            profiler.mark("tick")
+
+        return events
+
+    def __collect_gear(self, events):
+        """This helper method picks up the gear piece on the Player's tile, if any."""
+        tile = self.__player.get_tile_position()
+        gear = self.__occupancy.get_occupant(tile, "gear")
+        if gear is not None:
+            self.__occupancy.remove(tile, gear)
+            gear_item = self.__gear_pieces.pop(tile)
+            self.__maze_arrangement.clear_flag(tile[0], tile[1], src.labyrinthMaze.HIDDEN_GEAR_PIECE)
+            self.__num_gear_collected += 1
+            events.append(("gear", tile))
+
+            if self.__num_gear_collected == NUM_GEAR_PIECES:
+                events.append(("all_gear", gear_item))
+
+    def __check_catch(self, events):
+        """This helper method checks if the Player and the Minotaur have met. Without all
+        four pieces of gear, the Player loses a life and both are sent back to their
+        spawn points. With all four pieces, the Player kills the Minotaur and wins. A
+        Minotaur of the horde always costs the Player a life, and stays where it is."""
+        player_tile = self.__player.get_tile_position()
+        met = self.__occupancy.get_occupant(player_tile, "minotaur") is not None
+
+        # Two characters walking through each other swap tiles without ever sharing
+        # one, so they have also met if each is moving out of the other's tile
+        if not met and self.__player.is_animating() and self.__minotaur.is_animating():
+            met = (self.__minotaur.get_previous_tile() == player_tile and
+                   self.__player.get_previous_tile() == self.__minotaur.get_tile_position())
+
+        caught = met and self.__num_gear_collected < NUM_GEAR_PIECES
+        if self.__horde and not caught:
+            caught = self.__horde.catches(player_tile, self.__player.get_previous_tile(),
+                                          self.__player.is_animating())
+
+        if not met and not caught:
+            self.__player_hit = False
+            return
+
+        if met and self.__num_gear_collected == NUM_GEAR_PIECES:
+            self.__result = "win"
+            events.append(("minotaur_death", None))
+
+        elif caught and not self.__player_hit:
+            player_x, player_y = self.__layout.get_player_spawn()
+            self.__player.respawn(player_x, player_y)
+            if met:
+                minotaur_x, minotaur_y = self.__layout.get_minotaur_respawn()
+                self.__minotaur.respawn(minotaur_x, minotaur_y)
+            self.__lives -= 1
+            self.__player_hit = True
+            events.append(("player_death", self.__lives))
+
+            if self.__lives <= 0:
+                self.__result = "lose"
+                events.append(("game_over", None))
+
+    def __play_growl(self, events):
+        """This helper method decides if the Minotaur's growl is heard on this tick. The
+        growl repeats every 4 seconds while the Player stays within earshot."""
+        band = self.__proximity_map.get_band(self.__minotaur.get_tile_position(),
+                                             self.__player.get_tile_position())
+        if band and self.__growl_counter == 0:
+            events.append(("growl", band))
+
+        self.__growl_counter += 1
+        if self.__growl_counter >= 4 * TICK_RATE or not band:
+            self.__growl_counter = 0
+
+    def __follow_player(self):
+        """This helper method moves the Minotaur one tile along the flow field towards
+        the Player, once he has finished his previous move."""
+        if self.__minotaur.is_animating():
+            return
+
+        player_x, player_y = self.__player.get_tile_position()
+        self.__flow_field.set_target(player_x, player_y)
+        minotaur_x, minotaur_y = self.__minotaur.get_tile_position()
+        direction = self.__flow_field.next_step(minotaur_x, minotaur_y)
+        if direction:
+            self.__minotaur.walk(direction, self.__maze_arrangement)
+
+    def get_state(self):
+        """This accessor method returns a snapshot of the game as a dictionary of plain
+        values (numbers, strings, lists and dictionaries), which load_state() restores.
+        Only what changes during a game is saved: the walls come from the layout, and
+        the only changes made to them, the open gates and the gear pieces left, are
+        saved as they are. The flow field is not saved either, since it is rebuilt
+        from the maze."""
+        rng_version, rng_internal, rng_gauss = self.__rng.getstate()
+        return {"tick": self.__tick,
+                "countdown": self.__countdown,
+                "gates_open": self.__gates_open,
+                "lives": self.__lives,
+                "num_gear_collected": self.__num_gear_collected,
+                "movement_cooldown": self.__movement_cooldown,
+                "growl_counter": self.__growl_counter,
+                "player_hit": self.__player_hit,
+                "blackout": self.__blackout,
+                "result": self.__result,
+                "rng": [rng_version, list(rng_internal), rng_gauss],
+                "gear_pieces": [[x, y, gear_item] for (x, y), gear_item in sorted(self.__gear_pieces.items())],
+                "player": self.__player.get_state(),
+                "minotaur": self.__minotaur.get_state(),
+                "horde": self.__horde.get_state() if self.__horde else None}
+
+    def load_state(self, state):
+        """This mutator method restores the game to a snapshot returned by get_state()
+        of a game with the same layout and settings. The maze, the Walkers and the
+        OccupancyGrid are updated in place, so anything drawing them stays valid."""
+        rng_version, rng_internal, rng_gauss = state["rng"]
+        self.__rng.setstate((rng_version, tuple(rng_internal), rng_gauss))
+
+        # The maze is rebuilt from the layout, with the gear pieces left hidden in it
+        # and the gates opened if they were
+        self.__maze_arrangement.get_buffer()[:] = self.__layout.new_maze_arrangement().get_buffer()
+        if state["gates_open"]:
+            self.__maze_arrangement.open_gates()
+        self.__flow_field.invalidate()
+
+        for tile, gear_item in self.__gear_pieces.items():
+            self.__occupancy.remove(tile, ("gear", gear_item))
+        self.__gear_pieces = {(x, y): gear_item for x, y, gear_item in state["gear_pieces"]}
+        for (x, y), gear_item in self.__gear_pieces.items():
+            self.__maze_arrangement.set_flag(x, y, src.labyrinthMaze.HIDDEN_GEAR_PIECE)
+            self.__occupancy.add((x, y), ("gear", gear_item))
+        self.__player.set_state(state["player"])
+        self.__minotaur.set_state(state["minotaur"])
+        if self.__horde:
+            self.__horde.set_state(state["horde"])
+
+        self.__tick = state["tick"]
+        self.__countdown = state["countdown"]
+        self.__gates_open = state["gates_open"]
+        self.__lives = state["lives"]
+        self.__num_gear_collected = state["num_gear_collected"]
+        self.__movement_cooldown = state["movement_cooldown"]
+        self.__growl_counter = state["growl_counter"]
+        self.__player_hit = state["player_hit"]
+        self.__blackout = state["blackout"]
+        self.__result = state["result"]
+
+    def set_profiler(self, profiler):
+        """This mutator method sets the FrameProfiler that times the phases of each
+        tick, or None to stop timing them."""
+        self.__profiler = profiler
+
+    def get_seed(self):
+        """This accessor method returns the seed of the game."""
+        return self.__seed
+
+    def get_layout(self):
+        """This accessor method returns the MazeLayout the game is played in."""
+        return self.__layout
+
+    def get_maze_arrangement(self):
+        """This accessor method returns the MazeGrid the game is played in."""
+        return self.__maze_arrangement
+
+    def get_player(self):
+        """This accessor method returns the Walker of the Player."""
+        return self.__player
+
+    def get_minotaur(self):
+        """This accessor method returns the Walker of the Minotaur."""
+        return self.__minotaur
+
+    def get_horde(self):
+        """This accessor method returns the Horde of the game, or None if it has none."""
+        return self.__horde
+
+    def get_occupancy(self):
+        """This accessor method returns the OccupancyGrid of the game."""
+        return self.__occupancy
+
+    def get_gear_pieces(self):
+        """This accessor method returns a dictionary mapping the tile (x, y) of each gear
+        piece that has not been collected yet to its number."""
+        return self.__gear_pieces
+
+    def get_num_gear(self):
+        """This accessor method returns the number of gear pieces collected."""
+        return self.__num_gear_collected
+
+    def get_lives(self):
+        """This accessor method returns the number of lives the Player has left."""
+        return self.__lives
+
+    def get_countdown(self):
+        """This accessor method returns the seconds left in the grace period."""
+        return self.__countdown
+
+    def get_settings(self):
+        """This accessor method returns a dictionary of the difficulty settings of the
+        game: grace_period, movement_delay, flicker_chance, lives and horde_size."""
+        return {"grace_period": self.__grace_period,
+                "movement_delay": self.__movement_delay,
+                "flicker_chance": self.__flicker_chance,
+                "lives": self.__starting_lives,
+                "horde_size": self.__horde_size}
+
+    def get_tick(self):
+        """This accessor method returns the number of ticks played so far."""
+        return self.__tick
+
+    def is_blackout(self):
+        """This accessor method returns True if the flashlight is off."""
+        return self.__blackout
+
+    def get_result(self):
+        """This accessor method returns "win" or "lose" once the game is over, and None
+        while it is still being played."""
+        return self.__result
@@ -3,134 +3,46 @@ Name: proxlu
 Date: Oct 30, 2024
 
 Description: This module contains all of the sprites used in "Minotaur Labyrinth" game, 
-             including the Player, Stone, Countdown, GearPieces, GearTracker, HealthKeeper, 
-             and the Minotaur. It imports the Pygame and Random module for use.
+             including the Player, Countdown, GearPieces, GearTracker, HealthKeeper, and
+             the Minotaur and his horde, along with the stone images of the walls. It
+             imports the Pygame module for use, and loads every image and font through
+             the shared asset cache, and the frames of the characters from their texture
+             atlases.
 """
 
-import pygame, random
+import pygame, src.labyrinthAssets, src.labyrinthAtlas
+
+def load_walk_cycles(manifest_path, frame_name):
+    """This function returns a dictionary mapping each direction a character faces to
+    the list of the 5 frames of its walk cycle in that direction. It accepts the path
+    of the manifest of the character's TextureAtlas, and the pattern of the names of
+    its frames, e.g. "%s_face_%s", filled in with the pose and the direction, as
+    parameters."""
+    atlas = src.labyrinthAtlas.load_atlas(manifest_path)
+    walk_cycles = {}
+    for direction in ("down", "up", "right", "left"):
+        stand = atlas.get_frame(frame_name % ("stand", direction))
+        walk1 = atlas.get_frame(frame_name % ("walk1", direction))
+        walk2 = atlas.get_frame(frame_name % ("walk2", direction))
+        walk_cycles[direction.upper()] = [stand, walk1, stand, walk2, stand]
+    return walk_cycles
 
 class Player(pygame.sprite.Sprite):
-    """This class represents the Player Sprite, and inherits from the Sprite class."""
-    def __init__(self, screen, maze_arrangement):
+    """This class represents the Player Sprite, and inherits from the Sprite class.
+    It draws the Player from the Walker of the simulation, which owns the Player's
+    position and movement."""
+    def __init__(self, screen, walker):
         """This method instantiates the Player class, and loads 4 sets of images for
-        each animation cycle. It also sets many of the Player's attributes, such as 
-        the direrction of the player, its animation state, the frame index of each
-        animation cycle, the initial image of the player (Facing down), """
+        each animation cycle. It accepts walker, the Walker of the Player in the
+        LabyrinthSim, as a parameter. The initial image of the player is facing down."""
         pygame.sprite.Sprite.__init__(self)
     
-        self.__walk_down = [pygame.image.load("./misc/PlayerImages/stand_face_down.png"), \
-                            pygame.image.load("./misc/PlayerImages/walk1_face_down.png"), \
-                            pygame.image.load("./misc/PlayerImages/stand_face_down.png"), \
-                            pygame.image.load("./misc/PlayerImages/walk2_face_down.png"), \
-                            pygame.image.load("./misc/PlayerImages/stand_face_down.png")]
-        
-        self.__walk_up = [pygame.image.load("./misc/PlayerImages/stand_face_up.png"), \
-                          pygame.image.load("./misc/PlayerImages/walk1_face_up.png"), \
-                          pygame.image.load("./misc/PlayerImages/stand_face_up.png"), \
-                          pygame.image.load("./misc/PlayerImages/walk2_face_up.png"), \
-                          pygame.image.load("./misc/PlayerImages/stand_face_up.png")]    
-        
-        self.__walk_right = [pygame.image.load("./misc/PlayerImages/stand_face_right.png"), \
-                             pygame.image.load("./misc/PlayerImages/walk1_face_right.png"), \
-                             pygame.image.load("./misc/PlayerImages/stand_face_right.png"), \
-                             pygame.image.load("./misc/PlayerImages/walk2_face_right.png"), \
-                             pygame.image.load("./misc/PlayerImages/stand_face_right.png")]
-        
-        self.__walk_left = [pygame.image.load("./misc/PlayerImages/stand_face_left.png"), \
-                            pygame.image.load("./misc/PlayerImages/walk1_face_left.png"), \
-                            pygame.image.load("./misc/PlayerImages/stand_face_left.png"), \
-                            pygame.image.load("./misc/PlayerImages/walk2_face_left.png"), \
-                            pygame.image.load("./misc/PlayerImages/stand_face_left.png")]
-        
-        self.image = self.__walk_down[0]
-        self.rect = self.image.get_rect()
-        
-        # Set direction, current frame index, animation state, and 
-        self.__direction = "DOWN"
-        self.__frame_index = 0
-        self.__animating = False
-        self.__move_length = 0
-        
-        self.__maze_arrangement = maze_arrangement
-        
-        self.rect.x = 50
-        self.rect.y = 50  
-        
-        self.__user_x = self.rect.x // 50
-        self.__user_y = self.rect.y // 50        
-        self.__x = self.rect.x
-        self.__y = self.rect.y    
-    
-    def walk_down(self, sound):
-        """This mutator function moves the Player one tile down. It checks if the tile
-        below the Player is free and if the Player is currently in an animation cycle.
-        It accepts sound, representing the walking sound effect, as a parameter."""
-        
-        # Checks if tile below Player is free, and if they are not in an animation cycle
-        if (self.__maze_arrangement[self.__user_x][self.__user_y + 1] != 1) and not self.__animating:
-            
-            # Sets Player direction to down, animating state to true, moves the Player downwards
-            # by one tile, and plays the walking sound effect
-            self.__direction = "DOWN"
-            self.__animating = True
-            self.__user_y += 1
-            sound.play()
-        
-    def walk_up(self, sound):
-        """This mutator function moves the Player one tile up. It checks if the tile
-        above the Player is free and if the Player is currently in an animation cycle.
-        It accepts sound, representing the walking sound effect, as a parameter."""        
-        
-        # Checks if tile below Player is free, and if they are not in an animation cycle
-        if (self.__maze_arrangement[self.__user_x][self.__user_y - 1] != 1) and not self.__animating:
-            
-            # Sets Player direction to up, animating state to true, moves the Player upwards
-            # by one tile, and plays the walking sound effect            
-            self.__direction = "UP"
-            self.__animating = True
-            self.__user_y -= 1
-            sound.play()
-
-    def walk_right(self, sound):
-        """This mutator function moves the Player one tile right. It checks if the tile
-        to the right of the Player is free and if the Player is currently in an animation cycle.
-        It accepts sound, representing the walking sound effect, as a parameter."""      
+        self.__walk_cycles = load_walk_cycles(src.labyrinthAtlas.PLAYER_ATLAS, "%s_face_%s")
+        self.__walker = walker
         
-        # Checks if tile to the right of the Player is free, and if they are not in an animation cycle
-        if (self.__maze_arrangement[self.__user_x + 1][self.__user_y] != 1) and not self.__animating:
-            
-            # Sets Player direction to right, animating state to true, moves the Player to the
-            # right by one tile, and plays the walking sound effect              
-            self.__direction = "RIGHT"
-            self.__animating = True
-            self.__user_x += 1
-            sound.play()
-    
-    def walk_left(self, sound):
-        """This mutator function moves the Player one tile left. It checks if the tile
-        to the left of the Player is free and if the Player is currently in an animation cycle.
-        It accepts sound, representing the walking sound effect, as a parameter."""              
-        
-        # Checks if tile to the left of the Player is free, and if they are not in an animation cycle
-        if (self.__maze_arrangement[self.__user_x - 1][self.__user_y] != 1) and not self.__animating:
-            
-            # Sets Player direction to left, animating state to true, moves the Player to the
-            # left by one tile, and plays the walking sound effect                
-            self.__direction = "LEFT"
-            self.__animating = True
-            self.__user_x -= 1
-            sound.play()
-
-    def respawn_player(self):
-        """This mutator method resets the Player's sprite position to its original
-        spawn point in the maze, in the top-left corner tile."""
-        self.rect.x = 50
-        self.rect.y = 50
-        
-        # Specifies the Player's spawnpoint as maze_arrangement[1][1], representing
-        # the tile in the top-left corner of the maze
-        self.__user_x = 1
-        self.__user_y = 1
+        self.image = self.__walk_cycles["DOWN"][0]
+        self.rect = self.image.get_rect()
+        self.rect.topleft = self.__walker.get_pixel_position()
     
     def get_x_position(self):
         """This accessor method returns an integer representing the Player's 
@@ -144,145 +56,92 @@ class Player(pygame.sprite.Sprite):
     
     def get_center_position(self):
         return self.rect.center
-        
-    def set_position(self, x_position, y_position):
-        """This mutator method sets the NEW rect cordinates for the Player's sprite
-        acccording to their tile position in the maze. It accepts x_position, an integer
-        representing the Player's x tile, and y_position, an integer representing
-        the Player's y tile, as parameters. It returns the new rect.x and rect.y 
-        of the Player."""
-        
-        # Checks if the tile position is within the x boundaries of the maze
-        if x_position >= 0 and x_position <= 18: 
-            
-            # The new self.rect.x is determined by multiplying the tile value by 50,
-            # representing the pixel position of the sprite, and adding 14 as a slight
-            # offset to center the image more appropriately on the tile
-            self.rect.x = (x_position*50) + 14
-            
-        # Checks if the tile position is within the y boundaries of the maze    
-        if y_position >= 0 and y_position <= 18:
-        
-            # The new self.rect.y is determined by multiplying the tile value by 50,
-            # representing the pixel position of the sprite, and adding 3 as a slight
-            # offset to center the image more appropriately on the tile           
-            self.rect.y = (y_position*50) + 3
-
-        # Returns the updated self.rect.x and self.rect.y to the caller
-        return self.rect.x, self.rect.y
 
-    def animate(self, direction):
-        if direction == "DOWN" and self.__move_length < 10:
-            self.image = self.__walk_down[self.__frame_index // 2]
-            self.__y += 5 
-        if direction == "UP" and self.__move_length < 10:
-            self.image = self.__walk_up[self.__frame_index // 2]
-            self.__y -= 5
-        if direction == "LEFT" and self.__move_length < 10:
-            self.image = self.__walk_left[self.__frame_index // 2]
-            self.__x -= 5
-        if direction == "RIGHT" and self.__move_length < 10:
-            self.image = self.__walk_right[self.__frame_index // 2]
-            self.__x += 5 
-     
-        self.__move_length += 1
-        self.__frame_index += 1
-        self.__frame_index %= 10
-
-        if self.__move_length >= 10:
-            self.__animating = False
-            self.__move_length = 0           
-
-    def update(self):
-        if self.__animating:
-            self.animate(self.__direction)
-            self.rect = self.image.get_rect()
-            self.rect.x = self.__x
-            self.rect.y = self.__y
-        else:
-            self.set_position(self.__user_x, self.__user_y)
-            self.__x, self.__y = self.rect.x, self.rect.y   
+    def update(self, alpha=1.0):
+        """This method shows the image of the walk cycle the Walker is on, facing
+        its direction. It accepts alpha, the fraction of the way from the previous
+        tick to the next one the frame is drawn at, and places the image between
+        the Walker's pixel positions on those two ticks."""
+        walk_cycle = self.__walk_cycles[self.__walker.get_direction()]
+        self.image = walk_cycle[self.__walker.get_image_index()]
+        self.rect = self.image.get_rect()
+        self.rect.topleft = self.__walker.get_interpolated_position(alpha)
             
 class VisionLimiter(pygame.sprite.Sprite):
-    
+    """This class represents the darkness around the Player, through which only
+    a small circle around the Player is visible."""
     def __init__(self, screen, vision_limiter):
+        """This method instantiates the VisionLimiter class. It accepts the screen and
+        the vision limiter image, a black image with a transparent circle in its
+        center, as parameters. Only the circle is kept as a small alpha stamp, since
+        the rest of the image is solid black and can be drawn with a fill."""
         pygame.sprite.Sprite.__init__(self)
         
         self.image = vision_limiter
         self.rect = self.image.get_rect()
         self.__center = 0
         
+        # The lit circle is the only part of the image that is not fully opaque, so
+        # its area within the image is found once from the inverted alpha mask
+        lit_mask = pygame.mask.from_surface(self.image, 254)
+        lit_mask.invert()
+        lit_rects = lit_mask.get_bounding_rects()
+        if lit_rects:
+            self.__lit_area = lit_rects[0].unionall(lit_rects[1:])
+        else:
+            self.__lit_area = self.image.get_rect()
+        self.__stamp = self.image.subsurface(self.__lit_area).copy()
+        
     def set_center(self, player_center_position):
         self.__center = player_center_position
         
+    def get_lit_rect(self):
+        """This accessor method returns the rect of the screen that is visible
+        through the lit circle. Everything outside of it is covered in black."""
+        return self.__lit_area.move(self.rect.topleft)
+        
     def update(self):
         self.rect.center = self.__center
+        
+    def draw(self, screen):
+        """This method covers the screen in darkness. The four bands around the lit
+        circle are filled with solid black, and only the circle itself is blended
+        with the alpha stamp. It returns the rect of the lit circle."""
+        lit_rect = self.get_lit_rect()
+        width, height = screen.get_size()
+        
+        # Above, below, left and right of the lit circle
+        screen.fill((0, 0, 0), (0, 0, width, lit_rect.top))
+        screen.fill((0, 0, 0), (0, lit_rect.bottom, width, height - lit_rect.bottom))
+        screen.fill((0, 0, 0), (0, lit_rect.top, lit_rect.left, lit_rect.height))
+        screen.fill((0, 0, 0), (lit_rect.right, lit_rect.top, width - lit_rect.right, lit_rect.height))
+        
+        screen.blit(self.__stamp, lit_rect)
+        return lit_rect
          
 class NoVisionLimiter(pygame.sprite.Sprite):
-    
-    def __init__(self, screen, no_vision_limiter):
+    """This class represents the complete darkness when the flashlight is off."""
+    def __init__(self, screen):
         pygame.sprite.Sprite.__init__(self)
         
-        self.image = no_vision_limiter
-        self.rect = self.image.get_rect()
-        self.__center = 0
+        self.rect = screen.get_rect()
         
-    def set_center(self, player_center_position):
-        self.__center = player_center_position
-        
-    def update(self):
-        self.rect.center = self.__center
+    def draw(self, screen):
+        """This method covers the whole screen with a solid black fill, and returns
+        the rect that was covered."""
+        return screen.fill((0, 0, 0), self.rect)
 
-class Stone(pygame.sprite.Sprite):
-    """This class inherits from the Sprite class and represents each
-    wall block that composes the maze."""
-    
-    def __init__(self, stone_type, x, y, can_disappear):
-        """This method initializes the Stone class, and sets unique attributes for the 
-        stone_type, the ability of a stone to disappear, and the x and y positions, in 
-        pixels, of a stone object. It accepts the stone_type, x position of the brick, 
-        y position of the brick, and can_disappear as parameters."""
-        
-        pygame.sprite.Sprite.__init__(self)
-        
-        # A flag that indicates whether or not one of the maze_walls has the ability
-        # to be killed under certain conditions
-        self.__can_disappear = can_disappear
-        
-        # Following suit with the countdown timer, this sets a timer of 450, 
-        # representing 15 seconds in total
-        self.__timer = 450
-        
-        self.__stone_type = stone_type
-        
-        # Decides what image to use depending on the randomly generated
-        # stone_type integer
-        if self.__stone_type == 0:
-            self.image = pygame.image.load("./misc/MiscImages/stone_brick.jpg")
-        elif self.__stone_type == 1:
-            self.image = pygame.image.load("./misc/MiscImages/cobble_stone.png")
-        else:
-            self.image = pygame.image.load("./misc/MiscImages/moss_stone.png")
+def load_stone_image(stone_type):
+    """This function returns the wall image used for a stone_type, an integer
+    from 0 to 3. Type 0 is a stone brick, type 1 is cobble stone, and any other
+    type is moss stone."""
+    if stone_type == 0:
+        return src.labyrinthAssets.load_image("./misc/MiscImages/stone_brick.jpg")
+    elif stone_type == 1:
+        return src.labyrinthAssets.load_image("./misc/MiscImages/cobble_stone.png")
+    else:
+        return src.labyrinthAssets.load_image("./misc/MiscImages/moss_stone.png")
 
-        self.rect = self.image.get_rect()
-        self.rect.x = x
-        self.rect.y = y  
-        
-    def update(self):
-        """This method updates the local timer of the Stone Class, and is used to 
-        kill specific walls after 15 seconds have passed in order to release the Minotaur.
-        It is important to note that this only VISUALLY kills the sprite - it does not
-        allow the Player or Minotaur to freely pass through that tile."""
-        
-        # The timer is decreased by one per iteration of the game loop (30 times a second)
-        self.__timer -= 1
-        
-        # If a maze_wall block is able to be killed, specified by the flag above,
-        # then the block will be killed after 15 seconds
-        if self.__can_disappear:
-            if self.__timer <= 0:
-                self.kill()   
-        
 class GearPieces(pygame.sprite.Sprite):
     def __init__(self, gear_num, x, y):
         """This method initializes the GearPieces class and sets
@@ -292,13 +151,13 @@ class GearPieces(pygame.sprite.Sprite):
         self.__gear_num = gear_num
         
         if self.__gear_num == 0:
-            self.image = pygame.image.load("./misc/MiscImages/diamondchestplate.png")
+            self.image = src.labyrinthAssets.load_image("./misc/MiscImages/diamondchestplate.png")
         elif self.__gear_num == 1:
-            self.image = pygame.image.load("./misc/MiscImages/diamondhelmet.png")
+            self.image = src.labyrinthAssets.load_image("./misc/MiscImages/diamondhelmet.png")
         elif self.__gear_num == 2:
-            self.image = pygame.image.load("./misc/MiscImages/diamondsword.png")
+            self.image = src.labyrinthAssets.load_image("./misc/MiscImages/diamondsword.png")
         elif self.__gear_num == 3:
-            self.image = pygame.image.load("./misc/MiscImages/diamondboots.png")
+            self.image = src.labyrinthAssets.load_image("./misc/MiscImages/diamondboots.png")
             
         self.rect = self.image.get_rect()
         self.rect.x = x
@@ -308,8 +167,9 @@ class Countdown(pygame.sprite.Sprite):
     def __init__(self):
         pygame.sprite.Sprite.__init__(self)
         self.__time = 15
-        self.__font1 = pygame.font.Font("./misc/Fonts/DIOGENES.ttf", 40)
-        self.__font2 = pygame.font.Font("./misc/Fonts/greekhouse.ttf", 18)
+        
+        # The message is only rendered again when the time it shows has changed
+        self.__shown_time = None
         
     def decrease_time(self, time):
         """This mutator method accepts time as a parameter, and updates the value
@@ -323,14 +183,17 @@ class Countdown(pygame.sprite.Sprite):
     def update(self):
         """This method updates the countdown message, renders the font, and initializes 
         the rect attributes for the Countdown class. The countdown message displayed 
-        is dependent on the time left."""
+        is dependent on the time left, and is only rendered when the time changes."""
+        if self.__time == self.__shown_time:
+            return
+        self.__shown_time = self.__time
         
         # If the countdown timer has not yet hit 0
         if self.__time > 0:
             
             # Displays the grace period time in seconds
             countdown_message = str(self.__time)
-            self.image = self.__font1.render(countdown_message, 1, (255, 255, 255))
+            self.image = src.labyrinthAssets.render_text("./misc/Fonts/DIOGENES.ttf", 40, countdown_message)
             self.rect = self.image.get_rect()
             
             # Message is positioned in the center of the screen near the top
@@ -341,7 +204,7 @@ class Countdown(pygame.sprite.Sprite):
             
             # Notifies the Player that the Minotaur has escaped from his contained area
             release_message = "he has been released"
-            self.image = self.__font2.render(release_message, 1, (255, 255, 255))
+            self.image = src.labyrinthAssets.render_text("./misc/Fonts/greekhouse.ttf", 18, release_message)
             self.rect = self.image.get_rect()
             
             # Message is positioned in the center of the screen near the top
@@ -351,8 +214,8 @@ class GearTracker(pygame.sprite.Sprite):
     def __init__(self):
         pygame.sprite.Sprite.__init__(self)
         
-        self.__font = pygame.font.Font("./misc/Fonts/geek.ttf", 22)
         self.__num_gear_collected = 0
+        self.__shown_gear = None
         
     def add_gear_piece(self):
         """This mutator method increases the number of collected gear pieces by 1."""
@@ -364,23 +227,32 @@ class GearTracker(pygame.sprite.Sprite):
         return self.__num_gear_collected
         
     def update(self):
-        """This method updates the gear collected message, renders the font, and initializes the rect attributes for the GearTracker class."""
+        """This method updates the gear collected message, renders the font, and initializes the rect attributes for the GearTracker class.
+        The message is only rendered when the number of gear pieces changes."""
+        if self.__num_gear_collected == self.__shown_gear:
+            return
+        self.__shown_gear = self.__num_gear_collected
+        
         gear_message = "GEAR COLLECTED: %d" % \
             self.__num_gear_collected + "/4"
-        self.image = self.__font.render(gear_message, 1, (255, 255, 255))
+        self.image = src.labyrinthAssets.render_text("./misc/Fonts/geek.ttf", 22, gear_message)
         self.rect = self.image.get_rect()
         
         # This message is positioned in the top-left corner of the screen
         self.rect.topleft = (10, 10)
        
 class HealthKeeper(pygame.sprite.Sprite):
-    def __init__(self, screen):
+    def __init__(self, screen, num_lives=3):
+        """This method initializes the HealthKeeper class. It accepts num_lives, the
+        number of lives the Player starts with, as an optional parameter."""
         pygame.sprite.Sprite.__init__(self)
         
-        self.image_heart = pygame.image.load("./misc/MiscImages/heart.png")
-        self.image = pygame.Surface((150, 50))
+        self.image_heart = src.labyrinthAssets.load_image("./misc/MiscImages/heart.png")
+        self.__max_lives = num_lives
+        self.image = pygame.Surface((self.__max_lives*50, 50))
         self.rect = self.image.get_rect()
-        self.__num_lives = 3
+        self.__num_lives = num_lives
+        self.__shown_lives = None
         
     def lose_life(self):
         """This mutator method subtracts one from the total number of Player lives'."""
@@ -393,300 +265,93 @@ class HealthKeeper(pygame.sprite.Sprite):
         
     def update(self):
         """This method visually updates the number of lives the player has, and 
-        initializes the rect attributes for the HealthKeeper class."""
+        initializes the rect attributes for the HealthKeeper class. The strip of
+        hearts for each number of lives is built once, and only swapped in when a
+        life is lost."""
+        if self.__num_lives == self.__shown_lives:
+            return
+        self.__shown_lives = self.__num_lives
+        
+        self.image = src.labyrinthAssets.get_surface(("hearts", self.__max_lives, self.__num_lives),
+                                                     self.__build_hearts)
+        self.rect = self.image.get_rect()
         
-        # Creates a surface on which 3 hearts can be blitted
-        self.image = pygame.Surface((150, 50))
+        # The surface's rect is set in the top-right corner of the screen
+        self.rect.right = 800
+        self.rect.y = 0
+        
+    def __build_hearts(self):
+        """This helper method returns a new strip with a heart for each of the Player's
+        remaining lives, and room for every starting life."""
+        
+        # Creates a surface on which every starting life's heart can be blitted
+        hearts = pygame.Surface((self.__max_lives*50, 50))
         
         # Blits each of the remaining Player lives' onto this surface
         for life in range(self.__num_lives): 
             
             # Each heart image is 50x50 pixels, and so they are blitted 50 pixels apart
-            self.image.blit(self.image_heart, (life*50, 0))
+            hearts.blit(self.image_heart, (life*50, 0))
             
-        self.image.set_colorkey((0, 0, 0))
-        self.rect = self.image.get_rect()
-        
-        # The surface's rect is set in the top-right corner of the screen
-        self.rect.x = 650
-        self.rect.y = 0
+        hearts.set_colorkey((0, 0, 0))
+        return hearts
 
 class Minotaur(pygame.sprite.Sprite):
-    def __init__(self, screen, maze_arrangement):
+    """This class represents the Minotaur Sprite, and inherits from the Sprite class.
+    It draws the Minotaur from the Walker of the simulation, which owns the Minotaur's
+    position and pathing AI."""
+    def __init__(self, screen, walker):
+        """This method instantiates the Minotaur class, and loads 4 sets of images for
+        each animation cycle. It accepts walker, the Walker of the Minotaur in the
+        LabyrinthSim, as a parameter."""
         pygame.sprite.Sprite.__init__(self)
         
-        self.__walk_down = [pygame.image.load("./misc/MinotaurImages/minotaur_stand_down.png"), \
-                            pygame.image.load("./misc/MinotaurImages/minotaur_walk1_down.png"), \
-                            pygame.image.load("./misc/MinotaurImages/minotaur_stand_down.png"), \
-                            pygame.image.load("./misc/MinotaurImages/minotaur_walk2_down.png"), \
-                            pygame.image.load("./misc/MinotaurImages/minotaur_stand_down.png")]
-        
-        self.__walk_up = [pygame.image.load("./misc/MinotaurImages/minotaur_stand_up.png"), \
-                          pygame.image.load("./misc/MinotaurImages/minotaur_walk1_up.png"), \
-                          pygame.image.load("./misc/MinotaurImages/minotaur_stand_up.png"), \
-                          pygame.image.load("./misc/MinotaurImages/minotaur_walk2_up.png"), \
-                          pygame.image.load("./misc/MinotaurImages/minotaur_stand_up.png")]    
-        
-        self.__walk_right = [pygame.image.load("./misc/MinotaurImages/minotaur_stand_right.png"), \
-                             pygame.image.load("./misc/MinotaurImages/minotaur_walk1_right.png"), \
-                             pygame.image.load("./misc/MinotaurImages/minotaur_stand_right.png"), \
-                             pygame.image.load("./misc/MinotaurImages/minotaur_walk2_right.png"), \
-                             pygame.image.load("./misc/MinotaurImages/minotaur_stand_right.png")]
-        
-        self.__walk_left = [pygame.image.load("./misc/MinotaurImages/minotaur_stand_left.png"), \
-                            pygame.image.load("./misc/MinotaurImages/minotaur_walk1_left.png"), \
-                            pygame.image.load("./misc/MinotaurImages/minotaur_stand_left.png"), \
-                            pygame.image.load("./misc/MinotaurImages/minotaur_walk2_left.png"), \
-                            pygame.image.load("./misc/MinotaurImages/minotaur_stand_left.png")]
-        
-        self.image = self.__walk_down[0]
-        self.rect = self.image.get_rect()
-        
-        self.__direction = "DOWN"
-        self.__frame_index = 0
-        self.__animating = False
-        self.__move_length = 0
-        
-        self.__maze_arrangement = maze_arrangement
-        
-        self.rect.x = 350
-        self.rect.y = 400 
-        
-        self.__minotaur_x = self.rect.x // 50
-        self.__minotaur_y = self.rect.y // 50        
-        self.__x = self.rect.x
-        self.__y = self.rect.y   
-    
-    # Determines if the Minotaur is within reasonable range of player
-    def is_close(self, player_x, player_y):
-        """This method determines if the Minotaur is within a reasonable range
-        of the player, and returns a string specifying the distance proximity.
-        It accepts the player's rect.x and rect.y values as parameters. If the 
-        Minotaur is NOT within a reasonable range, this function returns False."""
-        x_distance = (self.__minotaur_x - (player_x // 50))
-        y_distance = (self.__minotaur_y - (player_y // 50))
-        
-        # If the Minotaur is a distance of 3 to 4 tiles away from the player
-        if 3 < ((abs(x_distance)**2) + (abs(y_distance)**2))**0.5 <= 4:
-            return "far"
-        
-        # If the Minotaur is a distance of 2 to 3 tiles away from the player
-        elif 2 < ((abs(x_distance)**2) + (abs(y_distance)**2))**0.5 <= 3:
-            return "medium"
-        
-        # If the Minotaur is a distance of 1 to 2 tiles away from the player
-        elif 1 < ((abs(x_distance)**2) + (abs(y_distance)**2))**0.5 <= 2:
-            return "close"
-        
-        # If the Minotaur is NOT within a reasonable range, returns false
-        # i.e. The player is outside the audible range of the Minotaur
-        else:
-            return False
-        
-    def follow_player(self, player_x, player_y):
-        """This method determines the movement of the Minotaur by using simple pathing
-        based off the Player's position. This method accepts the Player's rect.x and 
-        rect.y as parameters, and returns nothing."""
-        
-        # Determines the horizontal and vertical distance between the Player and the
-        # Minotaur, converting them into that are measured by the tiles (Dividing the
-        # difference by 50 turns each of these values into integers that represent tile
-        # distances)
-        x_distance = (self.rect.x - player_x) // 50 
-        y_distance = (self.rect.y - player_y) // 50 
-    
-        # If the Minotaur is NOT on the same tile as the Player i.e. touching them
-        if x_distance != 0 and y_distance != 0:
-        
-            # Check if the Player is situated ABOVE the Minotaur and if the Minotaur is
-            # not currently animating
-            if y_distance > 0 and not self.__animating:
-                
-                # If the tile above the Minotaur is free, then set direction as up, set
-                # animating to True, and change the minotaur_y (Tile space)
-                if (self.__maze_arrangement[self.__minotaur_x][self.__minotaur_y - 1] != 1):
-                    self.__direction = "UP"
-                    self.__animating = True
-                    self.__minotaur_y -= 1
-                
-                # If the tile above the Minotaur is NOT free, and the tile to the left
-                # of the Minotaur IS free, then set direction to left, set animating
-                # to True, and change the minotaur_x (Tile space) accordingly
-                elif self.__maze_arrangement[self.__minotaur_x][self.__minotaur_y - 1] and \
-                    (self.__maze_arrangement[self.__minotaur_x - 1][self.__minotaur_y]  != 1) and \
-                     player_x < self.rect.x:
-                    self.__direction = "LEFT"
-                    self.__animating = True
-                    self.__minotaur_x -= 1
-                
-                # If the tile above the Minotaur is NOT free, and the tile to the RIGHT
-                # of the Minotaur IS free, then set direction to right, set animating
-                # to True, and change the minotaur_x (Tile space) accordingly              
-                elif self.__maze_arrangement[self.__minotaur_x][self.__minotaur_y - 1] and \
-                    (self.__maze_arrangement[self.__minotaur_x + 1][self.__minotaur_y] != 1) and \
-                     player_x > self.rect.x:
-                    self.__direction = "RIGHT"
-                    self.__animating = True
-                    self.__minotaur_x += 1                
-    
-            # Check if the Player is situated BELOW the Minotaur and if the Minotaur is
-            # not currently animating 
-            if y_distance < 0 and not self.__animating:
-                
-                # If the tile below the Minotaur is free, then set direction as down, set
-                # animating to True, and change the minotaur_y (Tile space)                
-                if (self.__maze_arrangement[self.__minotaur_x][self.__minotaur_y + 1] != 1):
-                    self.__direction = "DOWN"
-                    self.__animating = True
-                    self.__minotaur_y += 1
-                
-                # If the tile below the Minotaur is NOT free, and the tile to the RIGHT
-                # of the Minotaur IS free, then set direction to right, set animating
-                # to True, and change the minotaur_x (Tile space) accordingly                
-                elif self.__maze_arrangement[self.__minotaur_x][self.__minotaur_y + 1] and \
-                    (self.__maze_arrangement[self.__minotaur_x + 1][self.__minotaur_y] != 1) and \
-                     player_x > self.rect.x:
-                    self.__direction = "RIGHT"
-                    self.__animating = True
-                    self.__minotaur_x += 1
-                
-                # If the tile below the Minotaur is NOT free, and the tile to the LEFT
-                # of the Minotaur IS free, then set direction to left, set animating
-                # to True, and change the minotaur_x (Tile space) accordingly                              
-                elif self.__maze_arrangement[self.__minotaur_x][self.__minotaur_y + 1] and \
-                    (self.__maze_arrangement[self.__minotaur_x - 1][self.__minotaur_y] != 1) and \
-                     player_x < self.rect.x:
-                    self.__direction = "LEFT"
-                    self.__animating = True
-                    self.__minotaur_x -= 1                
- 
-            # Check if the Player is situated RIGHT of the Minotaur and if the Minotaur is
-            # not currently animating   
-            if x_distance < 0  and not self.__animating:
-                
-                # If the tile to the right of the Minotaur is free, then set direction as 
-                # right, set animating to True, and change the minotaur_x  (Tile space)                        
-                if (self.__maze_arrangement[self.__minotaur_x + 1][self.__minotaur_y] != 1):
-                    self.__direction = "RIGHT"
-                    self.__animating = True
-                    self.__minotaur_x += 1     
-                
-                # If the tile to the right of the Minotaur is NOT free, and the tile ABOVE
-                # the Minotaur IS free, then set direction to up, set animating
-                # to True, and change the minotaur_y (Tile space) accordingly                    
-                elif self.__maze_arrangement[self.__minotaur_x + 1][self.__minotaur_y] and \
-                    (self.__maze_arrangement[self.__minotaur_x][self.__minotaur_y - 1] != 1) and \
-                     player_y < self.rect.y:
-                    self.__direction = "UP"
-                    self.__animating = True
-                    self.__minotaur_y -= 1
-                    
-                # If the tile to the right of the Minotaur is NOT free, and the tile BELOW
-                # the Minotaur IS free, then set direction to down, set animating
-                # to True, and change the minotaur_y (Tile space) accordingly                        
-                elif self.__maze_arrangement[self.__minotaur_x + 1][self.__minotaur_y] and \
-                    (self.__maze_arrangement[self.__minotaur_x][self.__minotaur_y + 1] != 1) and \
-                     player_y > self.rect.y:
-                    self.__direction = "DOWN"
-                    self.__animating = True
-                    self.__minotaur_y += 1            
-    
-            # Check if the Player is situated LEFT of the Minotaur and if the Minotaur is
-            # not currently animating      
-            if x_distance > 0  and not self.__animating:
-                
-                # If the tile to the LEFT of the Minotaur is free, then set direction as 
-                # left, set animating to True, and change the minotaur_x (Tile space)                
-                if (self.__maze_arrangement[self.__minotaur_x - 1][self.__minotaur_y] != 1):
-                    self.__direction = "LEFT"
-                    self.__animating = True
-                    self.__minotaur_x -= 1
-                
-                # If the tile to the LEFT of the Minotaur is NOT free, and the tile BELOW
-                # the Minotaur IS free, then set direction to down, set animating
-                # to True, and change the minotaur_y (Tile space) accordingly                 
-                elif self.__maze_arrangement[self.__minotaur_x - 1][self.__minotaur_y] and \
-                    (self.__maze_arrangement[self.__minotaur_x][self.__minotaur_y + 1] != 1) and \
-                     player_y > self.rect.y:
-                    self.__direction = "DOWN"
-                    self.__animating = True
-                    self.__minotaur_y += 1
-                
-                # If the tile to the LEFT of the Minotaur is NOT free, and the tile ABOVE
-                # the Minotaur IS free, then set direction to up, set animating
-                # to True, and change the minotaur_y (Tile space) accordingly                         
-                elif self.__maze_arrangement[self.__minotaur_x - 1][self.__minotaur_y] and \
-                    (self.__maze_arrangement[self.__minotaur_x][self.__minotaur_y - 1] != 1) and \
-                     player_y > self.rect.y:
-                    self.__direction = "UP"
-                    self.__animating = True
-                    self.__minotaur_y -= 1
-        
-    def reset_position(self):
-        """This mutator method resets the Minotaur's sprite position to its original
-        spawn point in the maze, in the center chamber."""        
-        self.rect.x = 400
-        self.rect.y = 400
-        
-        # Specifies the Player's spawnpoint as maze_arrangement[8][8], representing
-        # the tile in the center of the maze       
-        self.__minotaur_x = 8
-        self.__minotaur_y = 8
-        
-    def set_position(self, x_position, y_position):
-        """This mutator method sets the NEW rect cordinates for the Minotaur's sprite
-        acccording to its tile position in the maze. It accepts x_position, an integer
-        representing the Minotaur's x tile, and y_position, an integer representing
-        the Minotaur's y tile, as parameters. It returns the new rect.x and rect.y 
-        of the Minotaur."""        
-        
-        # Checks if the tile position is within the x boundaries of the maze
-        if x_position >= 0 and x_position <= 18:  
-            
-            # The new self.rect.x is determined by multiplying the tile value by 50,
-            # representing the pixel position of the sprite, and adding 3 as a slight
-            # offset to center the image more appropriately on the tile            
-            self.rect.x = (x_position*50) + 3
-            
-        # Checks if the tile position is within the y boundaries of the maze      
-        if y_position >= 0 and y_position <= 18:
-            
-            # The new self.rect.y is determined by multiplying the tile value by 50,
-            # representing the pixel position of the sprite, and adding 3 as a slight
-            # offset to center the image more appropriately on the tile              
-            self.rect.y = (y_position*50)
+        self.__walk_cycles = load_walk_cycles(src.labyrinthAtlas.MINOTAUR_ATLAS, "minotaur_%s_%s")
+        self.__walker = walker
         
-        # Returns the updated self.rect.x and self.rect.y to the caller
-        return self.rect.x, self.rect.y
+        self.image = self.__walk_cycles["DOWN"][0]
+        self.rect = self.image.get_rect()
+        self.rect.topleft = self.__walker.get_pixel_position()
 
-    def animate(self, direction):
-        if direction == "DOWN" and self.__move_length < 10:
-            self.image = self.__walk_down[self.__frame_index // 2]
-            self.__y += 5 
-        if direction == "UP" and self.__move_length < 10:
-            self.image = self.__walk_up[self.__frame_index // 2]
-            self.__y -= 5
-        if direction == "LEFT" and self.__move_length < 10:
-            self.image = self.__walk_left[self.__frame_index // 2]
-            self.__x -= 5
-        if direction == "RIGHT" and self.__move_length < 10:
-            self.image = self.__walk_right[self.__frame_index // 2]
-            self.__x += 5 
-     
-        self.__move_length += 1
-        self.__frame_index += 1
-        self.__frame_index %= 10
+    def update(self, alpha=1.0):
+        """This method shows the image of the walk cycle the Walker is on, facing
+        its direction. It accepts alpha, the fraction of the way from the previous
+        tick to the next one the frame is drawn at, and places the image between
+        the Walker's pixel positions on those two ticks."""
+        walk_cycle = self.__walk_cycles[self.__walker.get_direction()]
+        self.image = walk_cycle[self.__walker.get_image_index()]
+        self.rect = self.image.get_rect()
+        self.rect.topleft = self.__walker.get_interpolated_position(alpha)
 
-        if self.__move_length >= 10:
-            self.__animating = False
-            self.__move_length = 0           
+class MinotaurHorde(object):
+    """This class draws every Minotaur of a Horde of the simulation. It is not a Sprite
+    for each Minotaur: only the Minotaurs on the tiles in view are looked up, and they
+    are all blitted with a single call."""
+    def __init__(self, horde, tile_size):
+        """This method instantiates the MinotaurHorde class. It accepts the Horde of the
+        LabyrinthSim and the size of a tile in pixels as parameters."""
+        self.__horde = horde
+        self.__tile_size = tile_size
+        self.__walk_cycles = load_walk_cycles(src.labyrinthAtlas.MINOTAUR_ATLAS, "minotaur_%s_%s")
 
-    def update(self):
-        if self.__animating:
-            self.animate(self.__direction)
-            self.rect = self.image.get_rect()
-            self.rect.x = self.__x
-            self.rect.y = self.__y
-        else:
-            self.set_position(self.__minotaur_x, self.__minotaur_y)
-            self.__x, self.__y = self.rect.x, self.rect.y       
+    def draw(self, screen, area, offset=(0, 0), alpha=1.0):
+        """This method draws the Minotaurs of the horde that overlap area, a rect of the
+        screen, whose top-left corner shows the pixel offset of the maze. It accepts
+        alpha, the fraction of the way from the previous tick to the next one the frame
+        is drawn at, and returns the number of Minotaurs drawn."""
+        # A Minotaur walking onto a tile in view may still be drawn from the tile next
+        # to it, so one more tile is looked up on every side
+        tile_size = self.__tile_size
+        left = (area.left + offset[0]) // tile_size - 1
+        top = (area.top + offset[1]) // tile_size - 1
+        right = (area.right + offset[0]) // tile_size + 1
+        bottom = (area.bottom + offset[1]) // tile_size + 1
+
+        horde = self.__horde
+        blits = []
+        for number in horde.get_numbers_in(left, top, right, bottom):
+            image = self.__walk_cycles[horde.get_direction(number)][horde.get_image_index(number)]
+            x, y = horde.get_interpolated_position(number, alpha)
+            blits.append((image, (x - offset[0], y - offset[1])))
+        screen.blits(blits, False)
+        return len(blits)
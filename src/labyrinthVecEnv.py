@@ -0,0 +1,309 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains a vectorized version of the "Minotaur Labyrinth"
+             simulation, for training and evaluating bots. VecLabyrinthEnv keeps N games
+             as NumPy arrays - the tiles of the Player and the Minotaur, the collected
+             gear as a bitmask, the lives, the timers and a stacked tensor of the mazes -
+             and steps all of them at once with array operations, following the same
+             rules as LabyrinthSim. The Minotaur's growl only produces a sound, so it is
+             not simulated here.
+
+             It imports the NumPy module, which is not needed by the game itself and
+             must be installed separately (pip install numpy), and the labyrinthMaze
+             and labyrinthSim modules for the layout and rules of the game.
+"""
+
+try:
+    import numpy
+except ImportError:
+    raise ImportError("The labyrinthVecEnv module requires NumPy (pip install numpy)")
+
+import src.labyrinthMaze, src.labyrinthSim
+
+# Each action is a bitmask of the inputs held during the tick, like the actions
+# of LabyrinthSim.step()
+ACTION_NONE = 0
+ACTION_DOWN = 1
+ACTION_UP = 2
+ACTION_RIGHT = 4
+ACTION_LEFT = 8
+ACTION_LIGHT = 16
+
+# The arrow keys in the order they are tried, with their bit and tile offset
+PLAYER_MOVES = ((ACTION_DOWN, 0, 1), (ACTION_UP, 0, -1), (ACTION_RIGHT, 1, 0), (ACTION_LEFT, -1, 0))
+
+# The Minotaur's steps in the order they are tried, matching labyrinthPathing.DIRECTIONS
+MINOTAUR_MOVES = ((0, -1), (0, 1), (-1, 0), (1, 0))
+
+# The distance stored for the tiles the breadth-first search has not reached
+UNREACHED = numpy.iinfo(numpy.int16).max
+
+# The result of each game
+RUNNING, WIN, LOSE = 0, 1, -1
+
+class VecLabyrinthEnv(object):
+    """This class represents N games of "Minotaur Labyrinth" played in lockstep."""
+    def __init__(self, num_games, seed=None, layout=None,
+                 grace_period=src.labyrinthSim.GRACE_PERIOD,
+                 movement_delay=src.labyrinthSim.MOVEMENT_DELAY,
+                 flicker_chance=src.labyrinthSim.FLICKER_CHANCE,
+                 lives=src.labyrinthSim.STARTING_LIVES, auto_reset=True):
+        """This method instantiates the VecLabyrinthEnv class. It accepts the number of
+        games, the seed of the random number generator, the MazeLayout shared by every
+        game (the original maze if None), and the same game parameters as
+        LabyrinthSim. If auto_reset is True, a game that ends starts over on the next
+        step, so the batch never stalls."""
+        if layout is None:
+            layout = src.labyrinthMaze.default_layout()
+        self.__player_spawn = layout.get_player_spawn()
+        self.__minotaur_spawn = layout.get_minotaur_spawn()
+        self.__minotaur_respawn = layout.get_minotaur_respawn()
+
+        # The MazeGrid of the layout is viewed as an array without being converted
+        columns, rows = layout.get_size()
+        self.__layout = layout.new_maze_arrangement().to_numpy()
+
+        # Opening the gates clears the wall flag of every gate tile at once
+        self.__gates_mask = numpy.where(self.__layout & src.labyrinthMaze.GATE,
+                                        numpy.uint8(~src.labyrinthMaze.WALL & 0xFF), numpy.uint8(0xFF))
+        self.__num_games = num_games
+        self.__rng = numpy.random.default_rng(seed)
+        self.__grace_period = grace_period
+        self.__movement_delay = movement_delay
+        self.__flicker_chance = flicker_chance
+        self.__starting_lives = lives
+        self.__auto_reset = auto_reset
+        self.__games = numpy.arange(num_games)
+
+        # The state of every game. These arrays are only ever updated in place, so the
+        # read-only views handed out by get_observations() always show the current state
+        self.__mazes = numpy.empty((num_games, columns, rows), dtype=numpy.uint8)
+        self.__player = numpy.empty((num_games, 2), dtype=numpy.int16)
+        self.__minotaur = numpy.empty((num_games, 2), dtype=numpy.int16)
+        self.__player_from = numpy.empty((num_games, 2), dtype=numpy.int16)
+        self.__minotaur_from = numpy.empty((num_games, 2), dtype=numpy.int16)
+        self.__player_move = numpy.empty(num_games, dtype=numpy.int8)
+        self.__minotaur_move = numpy.empty(num_games, dtype=numpy.int8)
+        self.__cooldown = numpy.empty(num_games, dtype=numpy.int16)
+        self.__gear = numpy.empty((num_games, src.labyrinthSim.NUM_GEAR_PIECES, 2), dtype=numpy.int16)
+        self.__gear_mask = numpy.empty(num_games, dtype=numpy.uint8)
+        self.__lives = numpy.empty(num_games, dtype=numpy.int8)
+        self.__tick = numpy.empty(num_games, dtype=numpy.int32)
+        self.__countdown = numpy.empty(num_games, dtype=numpy.int16)
+        self.__gates_open = numpy.empty(num_games, dtype=bool)
+        self.__player_hit = numpy.empty(num_games, dtype=bool)
+        self.__blackout = numpy.empty(num_games, dtype=bool)
+        self.__result = numpy.empty(num_games, dtype=numpy.int8)
+
+        # The distance of every tile to the Player, for the Minotaur to follow, and
+        # whether it must be recomputed before the Minotaur next decides on a step
+        self.__distances = numpy.empty((num_games, columns, rows), dtype=numpy.int16)
+        self.__stale = numpy.empty(num_games, dtype=bool)
+
+        # The tiles on which a gear piece may be hidden, found once for the layout
+        self.__gear_cells = numpy.array(layout.get_free_cell_index().get_cells(), dtype=numpy.int16)
+
+        self.__observations = {}
+        for name, array in (("maze", self.__mazes), ("player", self.__player),
+                            ("minotaur", self.__minotaur), ("gear", self.__gear),
+                            ("gear_mask", self.__gear_mask), ("lives", self.__lives),
+                            ("tick", self.__tick), ("countdown", self.__countdown),
+                            ("blackout", self.__blackout), ("result", self.__result)):
+            view = array.view()
+            view.setflags(write=False)
+            self.__observations[name] = view
+
+        self.reset()
+
+    def reset(self, mask=None):
+        """This mutator method starts over the games selected by mask, a boolean array
+        of length N (every game if None), and returns the observations."""
+        if mask is None:
+            mask = numpy.ones(self.__num_games, dtype=bool)
+        games = numpy.flatnonzero(mask)
+        if len(games) == 0:
+            return self.__observations
+
+        self.__mazes[games] = self.__layout
+        self.__player[games] = self.__player_spawn
+        self.__minotaur[games] = self.__minotaur_spawn
+        self.__player_from[games] = self.__player_spawn
+        self.__minotaur_from[games] = self.__minotaur_spawn
+        self.__player_move[games] = 0
+        self.__minotaur_move[games] = 0
+        self.__cooldown[games] = 0
+        self.__gear_mask[games] = 0
+        self.__lives[games] = self.__starting_lives
+        self.__tick[games] = 0
+        self.__countdown[games] = self.__grace_period
+        self.__gates_open[games] = False
+        self.__player_hit[games] = False
+        self.__blackout[games] = False
+        self.__result[games] = RUNNING
+        self.__stale[games] = True
+
+        # Samples the gear tiles of each game without replacement, by keeping the
+        # smallest of one random key per valid tile
+        keys = self.__rng.random((len(games), len(self.__gear_cells)))
+        chosen = numpy.argpartition(keys, src.labyrinthSim.NUM_GEAR_PIECES - 1, axis=1)
+        self.__gear[games] = self.__gear_cells[chosen[:, :src.labyrinthSim.NUM_GEAR_PIECES]]
+        return self.__observations
+
+    def step(self, actions):
+        """This method advances every running game by one tick. It accepts actions, an
+        integer array of length N holding a bitmask of ACTION_* inputs for each game.
+        It returns the observations, the rewards (1 for a win, -1 for a loss, 0
+        otherwise) and a boolean array of the games that ended on this tick."""
+        actions = numpy.asarray(actions)
+        running = self.__result == RUNNING
+        started = running.copy()
+        games = self.__games
+
+        self.__cooldown[running & (self.__cooldown > 0)] -= 1
+
+        # Toggles the flashlight
+        light = running & ((actions & ACTION_LIGHT) != 0)
+        self.__blackout[light] = ~self.__blackout[light]
+
+        # Moves the Player in the first free direction among the held arrow keys. Any
+        # held arrow key starts the cooldown, even when the Player cannot move
+        ready = running & (self.__cooldown == 0)
+        can_walk = ready & (self.__player_move == 0)
+        for bit, x_offset, y_offset in PLAYER_MOVES:
+            wants = can_walk & ((actions & bit) != 0)
+            target_x = self.__player[:, 0] + x_offset
+            target_y = self.__player[:, 1] + y_offset
+            free = (self.__mazes[games, target_x, target_y] & src.labyrinthMaze.WALL) == 0
+            walks = wants & free
+            self.__player_from[walks] = self.__player[walks]
+            self.__player[walks, 0] = target_x[walks]
+            self.__player[walks, 1] = target_y[walks]
+            self.__player_move[walks] = src.labyrinthSim.MOVE_TICKS
+            self.__stale[walks] = True
+            can_walk &= ~walks
+        self.__cooldown[ready & ((actions & (ACTION_DOWN | ACTION_UP | ACTION_RIGHT | ACTION_LEFT)) != 0)] = \
+            self.__movement_delay
+
+        # Picks up the gear pieces on the Player's tiles
+        on_gear = (self.__gear == self.__player[:, None, :]).all(axis=2)
+        for piece in range(src.labyrinthSim.NUM_GEAR_PIECES):
+            self.__gear_mask[running & on_gear[:, piece]] |= 1 << piece
+
+        # Checks if the Player and the Minotaur have met, either on the same tile or
+        # by walking through each other while swapping tiles
+        full_gear = self.__gear_mask == (1 << src.labyrinthSim.NUM_GEAR_PIECES) - 1
+        swapped = ((self.__player_move > 0) & (self.__minotaur_move > 0) &
+                   (self.__player == self.__minotaur_from).all(axis=1) &
+                   (self.__minotaur == self.__player_from).all(axis=1))
+        met = running & ((self.__player == self.__minotaur).all(axis=1) | swapped)
+        self.__player_hit[running & ~met] = False
+        caught = met & ~full_gear & ~self.__player_hit
+        self.__player[caught] = self.__player_spawn
+        self.__minotaur[caught] = self.__minotaur_respawn
+        self.__player_from[caught] = self.__player_spawn
+        self.__minotaur_from[caught] = self.__minotaur_respawn
+        self.__player_move[caught] = 0
+        self.__minotaur_move[caught] = 0
+        self.__lives[caught] -= 1
+        self.__player_hit[caught] = True
+        self.__stale[caught] = True
+        self.__result[met & full_gear] = WIN
+        self.__result[caught & (self.__lives <= 0)] = LOSE
+        running &= self.__result == RUNNING
+
+        # Reduces the grace period timer by one second every 30 ticks, and opens the
+        # gates of the Minotaur's chamber once it has run out
+        self.__tick[running] += 1
+        self.__countdown[running] = self.__grace_period - self.__tick[running] // src.labyrinthSim.TICK_RATE
+        opening = numpy.flatnonzero(running & (self.__countdown <= 0) & ~self.__gates_open)
+        self.__mazes[opening] &= self.__gates_mask
+        self.__gates_open[opening] = True
+        self.__stale[opening] = True
+
+        self.__follow_player(running & (self.__minotaur_move == 0))
+        self.__player_move[running & (self.__player_move > 0)] -= 1
+        self.__minotaur_move[running & (self.__minotaur_move > 0)] -= 1
+
+        # The flashlight has a random chance of flickering off while it is on
+        flicker = self.__rng.integers(1, self.__flicker_chance + 1, self.__num_games) == 1
+        self.__blackout[running & ~self.__blackout & flicker] = True
+
+        dones = started & (self.__result != RUNNING)
+        rewards = numpy.where(dones, self.__result, 0).astype(numpy.float32)
+        if self.__auto_reset and dones.any():
+            self.reset(dones)
+        return self.__observations, rewards, dones
+
+    def __search(self, games):
+        """This helper method runs a breadth-first search from the Player's tile in each
+        of the given games at once, expanding the frontier of every game by one tile per
+        iteration. A game stops expanding as soon as it reaches its Minotaur, since the
+        Minotaur only ever needs the distances of the tiles closer than himself."""
+        count = len(games)
+        batch = numpy.arange(count)
+        walkable = (self.__mazes[games] & src.labyrinthMaze.WALL) == 0
+        distances = numpy.full(walkable.shape, UNREACHED, dtype=numpy.int16)
+        frontier = numpy.zeros(walkable.shape, dtype=bool)
+        player = self.__player[games]
+        minotaur = self.__minotaur[games]
+        frontier[batch, player[:, 0], player[:, 1]] = True
+        distances[frontier] = 0
+
+        distance = 0
+        while frontier.any():
+            distance += 1
+            grown = numpy.zeros_like(frontier)
+            grown[:, 1:, :] |= frontier[:, :-1, :]
+            grown[:, :-1, :] |= frontier[:, 1:, :]
+            grown[:, :, 1:] |= frontier[:, :, :-1]
+            grown[:, :, :-1] |= frontier[:, :, 1:]
+            grown &= walkable & (distances == UNREACHED)
+            distances[grown] = distance
+            frontier = grown
+
+            reached = distances[batch, minotaur[:, 0], minotaur[:, 1]] != UNREACHED
+            frontier[reached] = False
+
+        self.__distances[games] = distances
+        self.__stale[games] = False
+
+    def __follow_player(self, deciding):
+        """This helper method moves each idle Minotaur one tile closer to his Player."""
+        games = numpy.flatnonzero(deciding)
+        if len(games) == 0:
+            return
+
+        stale = games[self.__stale[games]]
+        if len(stale):
+            self.__search(stale)
+
+        x = self.__minotaur[games, 0]
+        y = self.__minotaur[games, 1]
+        distance = self.__distances[games, x, y].astype(numpy.int32)
+        undecided = (distance != 0) & (distance != UNREACHED)
+        columns, rows = self.__layout.shape
+        for x_offset, y_offset in MINOTAUR_MOVES:
+            next_x = numpy.clip(x + x_offset, 0, columns - 1)
+            next_y = numpy.clip(y + y_offset, 0, rows - 1)
+            steps = undecided & (self.__distances[games, next_x, next_y] == distance - 1)
+            stepping = games[steps]
+            self.__minotaur_from[stepping] = self.__minotaur[stepping]
+            self.__minotaur[stepping, 0] = next_x[steps]
+            self.__minotaur[stepping, 1] = next_y[steps]
+            self.__minotaur_move[stepping] = src.labyrinthSim.MOVE_TICKS
+            undecided &= ~steps
+
+    def get_observations(self):
+        """This accessor method returns a dictionary of read-only views of the state
+        of every game: "maze" (N x columns x rows of labyrinthMaze flag bits), "player"
+        and "minotaur" (N x 2 tiles),
+        "gear" (N x 4 x 2 tiles), "gear_mask", "lives", "tick", "countdown", "blackout"
+        and "result". The views share memory with the environment, so they are never
+        copied and always show the current state."""
+        return self.__observations
+
+    def get_num_games(self):
+        """This accessor method returns the number of games played in lockstep."""
+        return self.__num_games
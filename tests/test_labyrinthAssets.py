@@ -0,0 +1,179 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the tests of the labyrinthAssets module: the shared
+             cache must hand out working fonts, sounds and music after Pygame has been
+             quit and initialized again. A font kept from before Pygame was quit can
+             crash the interpreter, so each cycle runs in a process of its own. Run it
+             from the root of the repository:
+                 python -m pytest tests
+
+             The Preloader must add the assets it read to the cache it was given, and
+             drop them if that cache was emptied while they were read. The SoundBank
+             must decode each sound once, and keep within its budget by evicting the
+             sounds used the longest ago that are not playing.
+
+             It imports the OS, Subprocess and Sys modules, the Pygame module and the
+             labyrinthAssets module.
+"""
+
+import os, subprocess, sys
+import pygame, src.labyrinthAssets
+
+# Plays two init/quit cycles of Pygame, loading the same assets through the shared
+# cache in each, with quit_pygame() or with the given way of quitting
+CYCLE_SCRIPT = """
+import pygame, src.labyrinthAssets
+for cycle in range(2):
+    pygame.init()
+    pygame.display.set_mode((64, 64))
+    src.labyrinthAssets.load_image("./misc/MiscImages/heart.png")
+    font = src.labyrinthAssets.load_font("./misc/Fonts/PressStart2P.ttf", 18)
+    font.render("cycle %%d" %% cycle, 1, (255, 255, 255))
+    src.labyrinthAssets.render_text("./misc/Fonts/geek.ttf", 22, "Lives")
+    src.labyrinthAssets.play_sound("./misc/Sounds/click.wav", 0.5)
+    src.labyrinthAssets.load_music("./misc/Sounds/eerie_music.mp3")
+    pygame.mixer.music.play(-1)
+    %s
+print("ok")
+"""
+
+def run_cycles(quit_call):
+    """This function runs CYCLE_SCRIPT with quit_call in a new process from the root of
+    the repository, without a window or a sound card, and returns the process."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    return subprocess.run([sys.executable, "-c", CYCLE_SCRIPT % quit_call], cwd=root, env=environment,
+                          capture_output=True, text=True, timeout=60)
+
+def test_assets_work_after_pygame_is_initialized_again():
+    process = run_cycles("src.labyrinthAssets.quit_pygame()")
+    assert process.returncode == 0, process.stderr
+    assert process.stdout.strip().endswith("ok")
+
+def test_quit_pygame_empties_the_cache():
+    process = run_cycles("src.labyrinthAssets.quit_pygame(); assert src.labyrinthAssets.get_stats()['images'] == 0")
+    assert process.returncode == 0, process.stderr
+
+# The assets read by the Preloader in the tests
+IMAGES = ["./misc/MiscImages/heart.png", "./misc/MiscImages/background.jpg"]
+SOUNDS = ["./misc/Sounds/click.wav"]
+FONTS = [("./misc/Fonts/geek.ttf", 22), ("./misc/Fonts/geek.ttf", 30)]
+
+def start_pygame():
+    """This function initializes Pygame without a window or a sound card."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((64, 64))
+    pygame.font.init()
+    pygame.mixer.init()
+
+def test_preloader_fills_the_cache_on_wait():
+    start_pygame()
+    asset_cache = src.labyrinthAssets.AssetCache()
+    preloader = src.labyrinthAssets.Preloader(IMAGES, SOUNDS, FONTS, asset_cache)
+    preloader.start()
+    assert preloader.wait(10)
+    assert preloader.get_error() is None
+
+    assert all(asset_cache.has_image(path) for path in IMAGES)
+    assert all(asset_cache.has_font(path, size) for path, size in FONTS)
+    assert asset_cache.get_sound_bank().has_sound(SOUNDS[0])
+    assert asset_cache.get_stats()["misses"] == len(IMAGES) + len(FONTS)
+
+    # The images were converted for the display on the main thread
+    assert asset_cache.get_image(IMAGES[1]).get_bitsize() == pygame.display.get_surface().get_bitsize()
+    assert asset_cache.get_font(*FONTS[0]).render("Lives", 1, (255, 255, 255)).get_width() > 0
+    assert asset_cache.get_sound(SOUNDS[0]).get_length() > 0
+
+def test_preloader_skips_assets_already_cached():
+    start_pygame()
+    asset_cache = src.labyrinthAssets.AssetCache()
+    image = asset_cache.get_image(IMAGES[0])
+    preloader = src.labyrinthAssets.Preloader(IMAGES, (), (), asset_cache)
+    assert preloader.wait(10)
+    assert asset_cache.get_image(IMAGES[0]) is image
+
+def test_preloader_drops_assets_of_an_emptied_cache():
+    start_pygame()
+    asset_cache = src.labyrinthAssets.AssetCache()
+    preloader = src.labyrinthAssets.Preloader(IMAGES, SOUNDS, FONTS, asset_cache)
+    preloader.start()
+    asset_cache.clear()
+    assert preloader.wait(10)
+    stats = asset_cache.get_stats()
+    assert stats["images"] == stats["fonts"] == stats["sounds"] == 0
+
+# The sounds decoded by the SoundBank in the tests, of different lengths
+BANK_SOUNDS = ["./misc/Sounds/click.wav", "./misc/Sounds/shock.wav",
+               "./misc/Sounds/sword_clash.wav", "./misc/Sounds/player_walking.wav"]
+
+def get_sizes(paths):
+    """This function returns a dictionary mapping each of paths to the bytes of its
+    decoded audio."""
+    sound_bank = src.labyrinthAssets.SoundBank()
+    for path in paths:
+        sound_bank.get(path)
+    return sound_bank.get_decoded_bytes()
+
+def test_sound_bank_decodes_each_sound_once():
+    start_pygame()
+    sound_bank = src.labyrinthAssets.SoundBank()
+    sound = sound_bank.get(BANK_SOUNDS[0])
+    assert sound_bank.get(BANK_SOUNDS[0]) is sound
+    stats = sound_bank.get_stats()
+    assert (stats["sound_hits"], stats["sound_misses"], stats["sounds"]) == (1, 1, 1)
+    assert sound_bank.get_total_bytes() == memoryview(sound).nbytes
+
+    # The volume belongs to the playback, so the shared sound keeps its own
+    channel = sound_bank.play(BANK_SOUNDS[0], 0.25)
+    assert abs(channel.get_volume() - 0.25) < 0.01
+    assert sound.get_volume() == 1.0
+    channel.stop()
+
+def test_sound_bank_evicts_the_sounds_used_the_longest_ago():
+    start_pygame()
+    sizes = get_sizes(BANK_SOUNDS)
+    budget = sizes[BANK_SOUNDS[0]] + sizes[BANK_SOUNDS[1]] + sizes[BANK_SOUNDS[2]]
+    sound_bank = src.labyrinthAssets.SoundBank(budget)
+    for path in BANK_SOUNDS[:3]:
+        sound_bank.get(path)
+    assert sound_bank.get_total_bytes() == budget
+
+    # The first sound is used again, so the second is the one used the longest ago
+    sound_bank.get(BANK_SOUNDS[0])
+    sound_bank.get(BANK_SOUNDS[3])
+    assert not sound_bank.has_sound(BANK_SOUNDS[1])
+    assert all(sound_bank.has_sound(path) for path in (BANK_SOUNDS[0], BANK_SOUNDS[2], BANK_SOUNDS[3]))
+    assert sound_bank.get_total_bytes() <= budget
+    assert sound_bank.get_total_bytes() == sum(sound_bank.get_decoded_bytes().values())
+
+    sound_bank.set_budget(sizes[BANK_SOUNDS[3]])
+    assert list(sound_bank.get_decoded_bytes()) == [BANK_SOUNDS[3]]
+    assert sound_bank.get_stats()["sound_evictions"] == 3
+
+def test_sound_bank_keeps_the_sounds_playing():
+    start_pygame()
+    sizes = get_sizes(BANK_SOUNDS)
+    sound_bank = src.labyrinthAssets.SoundBank(sizes[BANK_SOUNDS[0]] + sizes[BANK_SOUNDS[1]])
+    channel = sound_bank.play(BANK_SOUNDS[0], loops=-1)
+    try:
+        sound_bank.get(BANK_SOUNDS[1])
+        sound_bank.get(BANK_SOUNDS[2])
+
+        # The sound playing is the one used the longest ago, but the next one goes
+        assert sound_bank.has_sound(BANK_SOUNDS[0])
+        assert not sound_bank.has_sound(BANK_SOUNDS[1])
+        assert sound_bank.has_sound(BANK_SOUNDS[2])
+
+        # With no room left, the budget is exceeded rather than a playing sound or
+        # the sound just decoded evicted
+        sound_bank.set_budget(0)
+        assert list(sound_bank.get_decoded_bytes()) == [BANK_SOUNDS[0], BANK_SOUNDS[2]]
+    finally:
+        channel.stop()
+
+    sound_bank.set_budget(0)
+    assert list(sound_bank.get_decoded_bytes()) == [BANK_SOUNDS[2]]
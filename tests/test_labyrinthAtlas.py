@@ -0,0 +1,95 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the tests of the labyrinthAtlas module: the frames
+             laid out by pack() must stay within the sheet without overlapping, and
+             every frame of the sheets shipped with the game must be the same, pixel
+             for pixel, as the loose image it was packed from. Run it from the root of
+             the repository:
+                 python -m pytest tests
+
+             It imports the Glob, OS and Random modules, the Pygame module and the
+             labyrinthAtlas module.
+"""
+
+import glob, os, random
+import pygame, src.labyrinthAtlas
+
+def start_pygame():
+    """This function initializes the display of Pygame without a window."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((64, 64))
+
+def get_pixels(surface):
+    """This function returns the bytes of the pixels of surface, with their alpha."""
+    return pygame.image.tostring(surface, "RGBA")
+
+def check_layout(images, size, frames, padding):
+    """This function checks that every frame of images has a rect of its size in
+    frames, within the sheet of size, and padding pixels away from every other."""
+    assert sorted(frames) == sorted(images)
+    sheet_rect = pygame.Rect((0, 0), size)
+    padded = []
+    for name, rect in frames.items():
+        rect = pygame.Rect(rect)
+        assert rect.size == tuple(images[name]), name
+        assert sheet_rect.contains(rect), name
+        padded.append(pygame.Rect(rect.x, rect.y, rect.width + padding, rect.height + padding))
+    for index, rect in enumerate(padded):
+        assert rect.collidelist(padded[index + 1:]) == -1
+
+def test_pack_stays_in_bounds():
+    rng = random.Random(5)
+    for padding in (0, 1, 3):
+        for trial in range(50):
+            images = {"frame%d" % number: (rng.randint(1, 80), rng.randint(1, 80))
+                      for number in range(rng.randint(1, 40))}
+            size, frames = src.labyrinthAtlas.pack(images, padding)
+            check_layout(images, size, frames, padding)
+
+    # A frame wider than the square of the sheet's area gets a shelf of its own
+    images = {"wide": (500, 2), "small": (4, 4), "tall": (3, 90)}
+    size, frames = src.labyrinthAtlas.pack(images)
+    check_layout(images, size, frames, 1)
+    assert size[0] == 500
+
+def test_shipped_atlases_match_their_images():
+    start_pygame()
+    for manifest_path, pattern in src.labyrinthAtlas.ATLAS_SOURCES.items():
+        image_path, frames = src.labyrinthAtlas.read_manifest(manifest_path)
+        sheet = pygame.image.load(image_path)
+        paths = sorted(glob.glob(pattern))
+        assert sorted(frames) == sorted(os.path.splitext(os.path.basename(path))[0] for path in paths)
+
+        for path in paths:
+            name = os.path.splitext(os.path.basename(path))[0]
+            image = pygame.image.load(path)
+            assert get_pixels(sheet.subsurface(frames[name])) == get_pixels(image), name
+
+def test_loaded_frames_are_subsurfaces_of_the_sheet():
+    start_pygame()
+    atlas = src.labyrinthAtlas.load_atlas(src.labyrinthAtlas.PLAYER_ATLAS)
+    assert src.labyrinthAtlas.load_atlas(src.labyrinthAtlas.PLAYER_ATLAS) is atlas
+    image_path, frames = src.labyrinthAtlas.read_manifest(src.labyrinthAtlas.PLAYER_ATLAS)
+    assert atlas.get_names() == sorted(frames)
+    for name in atlas.get_names():
+        frame = atlas.get_frame(name)
+        assert frame is atlas.get_frame(name)
+        assert frame.get_parent() is atlas.get_image()
+        assert frame.get_abs_offset() == frames[name][:2]
+
+def test_build_atlas_copies_every_pixel(tmp_path):
+    start_pygame()
+    paths = sorted(glob.glob(src.labyrinthAtlas.ATLAS_SOURCES[src.labyrinthAtlas.MINOTAUR_ATLAS]))
+    manifest_path = str(tmp_path / "minotaur_atlas.json")
+    frames = src.labyrinthAtlas.build_atlas(paths, manifest_path, padding=2)
+    assert src.labyrinthAtlas.read_manifest(manifest_path) == (str(tmp_path / "minotaur_atlas.png"), frames)
+
+    sheet = pygame.image.load(str(tmp_path / "minotaur_atlas.png"))
+    check_layout({name: rect[2:] for name, rect in frames.items()}, sheet.get_size(), frames, 2)
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        assert get_pixels(sheet.subsurface(frames[name])) == get_pixels(pygame.image.load(path)), name
@@ -0,0 +1,84 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the tests of the labyrinthAudio module's
+             ProximityMap: the growl band must follow the walking distance through the
+             corridors rather than the distance through the walls, and must only be
+             looked up again when a tile or the walls have changed. Run it from the
+             root of the repository:
+                 python -m pytest tests
+
+             It imports the labyrinthAudio, labyrinthMaze and labyrinthPathing modules.
+"""
+
+import src.labyrinthAudio, src.labyrinthMaze, src.labyrinthPathing
+
+class CountingFlowField(src.labyrinthPathing.FlowField):
+    """This class represents a FlowField that counts the distances looked up in it."""
+    def __init__(self, maze_arrangement):
+        """This method instantiates the CountingFlowField class. It accepts the
+        maze_arrangement, a MazeGrid, as a parameter."""
+        super().__init__(maze_arrangement)
+        self.lookups = 0
+
+    def get_distance(self, x, y):
+        """This accessor method counts the lookup, and returns the walking distance from
+        the tile at column x and row y to the target."""
+        self.lookups += 1
+        return super().get_distance(x, y)
+
+def test_band_follows_the_corridors():
+    maze_arrangement = src.labyrinthMaze.default_layout().new_maze_arrangement()
+    flow_field = src.labyrinthPathing.FlowField(maze_arrangement)
+    proximity_map = src.labyrinthAudio.ProximityMap(flow_field)
+    player_tile = (1, 1)
+
+    columns, rows = maze_arrangement.get_size()
+    heard = set()
+    for x in range(columns):
+        for y in range(rows):
+            band = proximity_map.get_band((x, y), player_tile)
+            distance = flow_field.get_distance(x, y)
+            assert band == src.labyrinthAudio.CORRIDOR_BANDS.get(distance, False), (x, y)
+            if band:
+                heard.add(band)
+
+                # A band is only heard within the audible range of the corridors,
+                # however close the tiles are through the walls
+                assert abs(x - player_tile[0]) + abs(y - player_tile[1]) <= distance
+    assert heard == set(src.labyrinthAudio.GROWL_VOLUMES)
+
+    # Three tiles straight down, through two walls, but five along the corridors
+    assert flow_field.get_distance(1, 4) == 5
+    assert proximity_map.get_band((1, 4), player_tile) is False
+
+def test_band_is_looked_up_only_when_a_tile_changes():
+    layout = src.labyrinthMaze.default_layout()
+    maze_arrangement = layout.new_maze_arrangement()
+    flow_field = CountingFlowField(maze_arrangement)
+    proximity_map = src.labyrinthAudio.ProximityMap(flow_field)
+
+    band = proximity_map.get_band((2, 2), (1, 1))
+    assert band == "close"
+    for tick in range(10):
+        assert proximity_map.get_band((2, 2), (1, 1)) == band
+    assert flow_field.lookups == 1
+    assert flow_field.get_recompute_count() == 1
+
+    # The Minotaur moving looks the band up again, but does not recompute the field
+    assert proximity_map.get_band((2, 3), (1, 1)) == "medium"
+    assert flow_field.lookups == 2
+    assert flow_field.get_recompute_count() == 1
+
+    # The Player moving recomputes the field
+    assert proximity_map.get_band((2, 3), (2, 1)) == "close"
+    assert flow_field.lookups == 3
+    assert flow_field.get_recompute_count() == 2
+
+    # The walls opening recomputes the field once it is invalidated
+    maze_arrangement.open_gates()
+    flow_field.invalidate()
+    proximity_map.get_band((2, 3), (2, 1))
+    assert flow_field.lookups == 4
+    assert flow_field.get_recompute_count() == 3
@@ -0,0 +1,40 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the tests of the labyrinthBalance module: the rows
+             of the report with no games or no wins to average, and the command line
+             refusing a sweep without seeds. Run it from the root of the repository:
+                 python -m pytest tests
+
+             It imports the Pytest module and the labyrinthBalance and labyrinthSim
+             modules.
+"""
+
+import pytest
+import src.labyrinthBalance, src.labyrinthSim
+
+SETTINGS = {"grace_period": 0, "movement_delay": 3, "flicker_chance": 0, "lives": 1}
+
+def test_summarize_without_games():
+    row = src.labyrinthBalance.summarize(SETTINGS, [])
+    assert row["games"] == 0
+    for field in ("win_rate", "loss_rate", "timeout_rate", "mean_time_to_death", "mean_time_to_win"):
+        assert row[field] is None
+
+def test_summarize_rates():
+    results = [{"result": "win", "ticks": 600, "death_ticks": []},
+               {"result": "lose", "ticks": 300, "death_ticks": [300]},
+               {"result": "timeout", "ticks": 900, "death_ticks": []},
+               {"result": "lose", "ticks": 120, "death_ticks": [120]}]
+    row = src.labyrinthBalance.summarize(SETTINGS, results)
+    assert row["games"] == 4
+    assert (row["win_rate"], row["loss_rate"], row["timeout_rate"]) == (0.25, 0.5, 0.25)
+    assert row["mean_time_to_win"] == 600 / src.labyrinthSim.TICK_RATE
+    assert row["mean_time_to_death"] == 210 / src.labyrinthSim.TICK_RATE
+
+def test_main_refuses_a_sweep_without_seeds(capsys):
+    with pytest.raises(SystemExit) as error:
+        src.labyrinthBalance.main(["--seeds", "0"])
+    assert error.value.code == 2
+    assert "--seeds" in capsys.readouterr().err
@@ -0,0 +1,79 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the tests of the labyrinthLeaderboard module: the
+             top of the leaderboard merged from the scores already written and the
+             scores still waiting for the writer thread, read without waiting for a
+             locked database, and the writer recovering from a failed write. Run it
+             from the root of the repository:
+                 python -m pytest tests
+
+             It imports the SQLite3 and Time modules and the labyrinthLeaderboard
+             module.
+"""
+
+import sqlite3
+import time
+import src.labyrinthLeaderboard
+
+def test_top_merges_pending_and_written_scores(tmp_path):
+    path = str(tmp_path / "leaderboard.db")
+    leaderboard = src.labyrinthLeaderboard.Leaderboard(path)
+    try:
+        written = [leaderboard.record("Ariadne", 40.0, 2, 1), leaderboard.record("Theseus", 55.5, 3, 2)]
+        leaderboard.flush()
+        assert leaderboard.get_written() == 2
+
+        # Another connection holds the write lock, so the next scores stay pending
+        blocker = sqlite3.connect(path)
+        blocker.execute("BEGIN EXCLUSIVE")
+        try:
+            pending = [leaderboard.record("Icarus", 40.0, 3, 3), leaderboard.record("Daedalus", 70.0, 1, 4)]
+            start = time.perf_counter()
+            top = leaderboard.top()
+            assert time.perf_counter() - start < 0.5
+            assert leaderboard.get_written() == 2
+        finally:
+            blocker.rollback()
+            blocker.close()
+
+        expected = [pending[0], written[0], written[1], pending[1]]
+        assert top == expected
+        leaderboard.flush()
+        assert leaderboard.get_written() == 4
+        assert leaderboard.top() == expected
+        assert leaderboard.top(2) == expected[:2]
+    finally:
+        leaderboard.close()
+
+def test_scores_outlive_the_leaderboard(tmp_path):
+    path = str(tmp_path / "leaderboard.db")
+    leaderboard = src.labyrinthLeaderboard.Leaderboard(path)
+    scores = [leaderboard.record("Player %d" % number, 100.0 - number, number % 4, number)
+              for number in range(30)]
+    leaderboard.close()
+
+    leaderboard = src.labyrinthLeaderboard.Leaderboard(path)
+    try:
+        leaderboard.flush()
+        assert leaderboard.top() == sorted(scores, key=src.labyrinthLeaderboard.get_rank_key)[:10]
+    finally:
+        leaderboard.close()
+
+def test_a_failed_write_does_not_disable_the_database(tmp_path):
+    leaderboard = src.labyrinthLeaderboard.Leaderboard(str(tmp_path / "leaderboard.db"))
+    try:
+        # A seed SQLite cannot store makes the write of its score fail
+        leaderboard.record("Minos", 30.0, 1, seed=[1, 2])
+        leaderboard.flush()
+        assert isinstance(leaderboard.get_error(), sqlite3.Error)
+        assert leaderboard.top() == []
+
+        score = leaderboard.record("Pasiphae", 45.0, 2, 5)
+        leaderboard.flush()
+        assert leaderboard.get_error() is None
+        assert leaderboard.get_written() == 1
+        assert leaderboard.top() == [score]
+    finally:
+        leaderboard.close()
@@ -0,0 +1,93 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the tests of the labyrinthMaze module: the layouts
+             built by generate_layout() at every small size, and the sampling of the
+             FreeCellIndex the gear pieces are hidden with. Run it from the root of
+             the repository:
+                 python -m pytest tests
+
+             It imports the Random module, the labyrinthMaze module and the
+             labyrinthSim module, which hides the gear of each layout.
+"""
+
+import random
+import src.labyrinthMaze, src.labyrinthSim
+
+# The generated sizes checked, and the seeds each of them is generated from
+SIZES = range(src.labyrinthMaze.MIN_SIZE, 33)
+SEEDS = range(100)
+
+def test_generated_layouts_start_a_game():
+    # Every generated maze must be able to start a game, which hides its gear
+    for size in SIZES:
+        for seed in SEEDS:
+            layout = src.labyrinthMaze.generate_layout(size, seed)
+            sim = src.labyrinthSim.LabyrinthSim(seed, layout=layout)
+            assert len(sim.get_gear_pieces()) == src.labyrinthSim.NUM_GEAR_PIECES, (size, seed)
+
+def test_generated_layouts_index_every_gear_piece():
+    for size in SIZES:
+        for seed in SEEDS:
+            layout = src.labyrinthMaze.generate_layout(size, seed)
+            slots = layout.get_gear_slots()
+            assert len(slots) >= src.labyrinthMaze.NUM_GEAR_PIECES, (size, seed)
+            assert sorted(layout.get_free_cell_index().get_cells()) == sorted(slots), (size, seed)
+
+def test_generated_layouts_are_reproducible():
+    first = src.labyrinthMaze.generate_layout(21, 7)
+    second = src.labyrinthMaze.generate_layout(21, 7)
+    assert first.new_maze_arrangement().get_buffer() == second.new_maze_arrangement().get_buffer()
+    assert first.get_gear_slots() == second.get_gear_slots()
+
+def test_generate_layout_rejects_small_sizes():
+    size = src.labyrinthMaze.MIN_SIZE - 1
+    try:
+        src.labyrinthMaze.generate_layout(size, 0)
+    except ValueError:
+        return
+    assert False, "a %dx%d maze was generated" % (size, size)
+
+def test_free_cells_avoid_the_spawn_and_the_chamber():
+    layout = src.labyrinthMaze.default_layout()
+    player_x, player_y = layout.get_player_spawn()
+    chamber = set(layout.get_minotaur_chamber())
+    maze_arrangement = layout.new_maze_arrangement()
+    cells = layout.get_free_cell_index().get_cells()
+    assert cells
+    for x, y in cells:
+        assert not maze_arrangement.is_wall(x, y)
+        assert (x, y) not in chamber and x != player_x and y != player_y
+
+def test_sample_draws_distinct_cells_and_leaves_the_index_unchanged():
+    index = src.labyrinthMaze.default_layout().get_free_cell_index()
+    cells = index.get_cells()
+    for seed in range(50):
+        chosen = index.sample(random.Random(seed), 10)
+        assert len(set(chosen)) == 10
+        assert set(chosen) <= set(cells)
+        assert index.get_cells() == cells
+
+def test_sample_is_reproducible():
+    index = src.labyrinthMaze.default_layout().get_free_cell_index()
+    assert index.sample(random.Random(3), 4) == index.sample(random.Random(3), 4)
+
+def test_sample_rejects_more_items_than_cells():
+    index = src.labyrinthMaze.default_layout().get_free_cell_index()
+    try:
+        index.sample(random.Random(0), len(index) + 1)
+    except ValueError:
+        return
+    assert False, "more items than cells were sampled"
+
+def test_gear_slots_are_the_only_cells_indexed():
+    default = src.labyrinthMaze.default_layout()
+    slots = [(3, 4), (11, 5), (5, 12), (14, 14), (4, 11)]
+    layout = src.labyrinthMaze.MazeLayout(src.labyrinthMaze.MAZE_LAYOUT, default.get_player_spawn(),
+                                          default.get_minotaur_spawn(), default.get_minotaur_respawn(),
+                                          default.get_minotaur_chamber(), default.get_gate_cells(),
+                                          gear_slots=slots)
+    assert sorted(layout.get_free_cell_index().get_cells()) == sorted(slots)
+    sim = src.labyrinthSim.LabyrinthSim(0, layout=layout)
+    assert set(sim.get_gear_pieces()) <= set(slots)
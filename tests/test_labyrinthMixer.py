@@ -0,0 +1,92 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the tests of the labyrinthMixer module: the stereo
+             pan of a sound, and the AudioScheduler's pool of channels, which must
+             limit the voices of each cue, hold a cue back during its cooldown, and
+             let a cue steal the channel of the oldest voice of a lower priority when
+             every channel is busy. Run it from the root of the repository:
+                 python -m pytest tests
+
+             It imports the OS module, the Pygame module and the labyrinthAssets and
+             labyrinthMixer modules.
+"""
+
+import os
+import pygame, src.labyrinthAssets, src.labyrinthMixer
+
+# A sound long enough to still be playing at the end of each test
+LONG_SOUND = "./misc/Sounds/player_death.wav"
+
+def start_scheduler(num_channels):
+    """This function initializes the mixer of Pygame without a sound card, and
+    returns an AudioScheduler with a pool of num_channels channels."""
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+    return src.labyrinthMixer.AudioScheduler(src.labyrinthAssets.SoundBank(), num_channels)
+
+def test_pan_follows_the_source():
+    assert src.labyrinthMixer.get_pan(300, 300) == 0.0
+    assert src.labyrinthMixer.get_pan(400, 300) == 0.5
+    assert src.labyrinthMixer.get_pan(0, 300) == -1.0
+    assert src.labyrinthMixer.get_pan(900, 300) == 1.0
+
+    assert src.labyrinthMixer.get_stereo_volumes(0.8, 0.0) == (0.8, 0.8)
+    assert src.labyrinthMixer.get_stereo_volumes(0.8, 0.5) == (0.4, 0.8)
+    assert src.labyrinthMixer.get_stereo_volumes(0.8, -1.0) == (0.8, 0.0)
+
+def test_cue_restarts_its_oldest_voice():
+    scheduler = start_scheduler(4)
+    try:
+        scheduler.add_cue("step", LONG_SOUND, max_voices=2)
+        first = scheduler.play("step", now=0)
+        second = scheduler.play("step", now=10)
+        assert first is not None and second is not None and first != second
+
+        # The third voice takes the channel of the first, however many are free
+        assert scheduler.play("step", now=20) == first
+        assert scheduler.play("step", now=30) == second
+        assert scheduler.get_stats()["playing"] == 2
+    finally:
+        scheduler.stop()
+
+def test_cue_waits_for_its_cooldown():
+    scheduler = start_scheduler(4)
+    try:
+        scheduler.add_cue("growl", LONG_SOUND, cooldown=500, max_voices=4)
+        assert scheduler.play("growl", now=1000) is not None
+        assert scheduler.play("growl", now=1499) is None
+        assert scheduler.play("growl", now=1500) is not None
+        stats = scheduler.get_stats()
+        assert (stats["plays"], stats["drops"], stats["playing"]) == (2, 1, 2)
+    finally:
+        scheduler.stop()
+
+def test_higher_priority_steals_the_oldest_lower_voice():
+    scheduler = start_scheduler(3)
+    try:
+        scheduler.add_cue("step", LONG_SOUND, priority=0, max_voices=3)
+        scheduler.add_cue("click", LONG_SOUND, priority=1, max_voices=3)
+        scheduler.add_cue("death", LONG_SOUND, priority=2)
+        oldest_step = scheduler.play("step", now=0)
+        click = scheduler.play("click", now=10)
+        newest_step = scheduler.play("step", now=20)
+
+        # With every channel busy, a cue with no voice of a lower priority is dropped
+        assert scheduler.play("step", now=30) is None
+
+        # The lowest priority goes first, then the oldest voice within it
+        assert scheduler.play("death", now=40) == oldest_step
+        assert scheduler.play("click", now=50) == newest_step
+        assert scheduler.play("click", now=60) is None
+        stats = scheduler.get_stats()
+        assert (stats["steals"], stats["drops"], stats["playing"]) == (2, 2, 3)
+
+        # A voice that has ended frees its channel without anything being stolen
+        click.stop()
+        assert scheduler.play("step", now=70) == click
+        assert scheduler.get_stats()["steals"] == 2
+    finally:
+        scheduler.stop()
@@ -0,0 +1,82 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the tests of the labyrinthPathing module's FlowField:
+             its distances must be the walking distances through the maze, its steps
+             must lead to the target, and it must only be recomputed when the target
+             changes tile or the walls are invalidated. Run it from the root of the
+             repository:
+                 python -m pytest tests
+
+             It imports the labyrinthMaze and labyrinthPathing modules.
+"""
+
+import src.labyrinthMaze, src.labyrinthPathing
+
+def find_distances(maze_arrangement, target):
+    """This function returns a dictionary mapping every tile that can reach target to
+    its walking distance, found by relaxing every tile until nothing changes."""
+    distances = {target: 0}
+    changed = True
+    while changed:
+        changed = False
+        for (x, y), distance in list(distances.items()):
+            for direction, next_x, next_y in maze_arrangement.get_open_neighbours(x, y):
+                if distances.get((next_x, next_y), distance + 2) > distance + 1:
+                    distances[(next_x, next_y)] = distance + 1
+                    changed = True
+    return distances
+
+def test_distances_are_walking_distances():
+    for layout in (src.labyrinthMaze.default_layout(), src.labyrinthMaze.generate_layout(25, 3)):
+        maze_arrangement = layout.new_maze_arrangement()
+        flow_field = src.labyrinthPathing.FlowField(maze_arrangement)
+        target = layout.get_player_spawn()
+        flow_field.set_target(*target)
+        expected = find_distances(maze_arrangement, target)
+
+        columns, rows = maze_arrangement.get_size()
+        for x in range(columns):
+            for y in range(rows):
+                assert flow_field.get_distance(x, y) == expected.get((x, y)), (x, y)
+
+                # Every step leads one tile closer to the target
+                direction = flow_field.next_step(x, y)
+                if expected.get((x, y)):
+                    steps = dict((name, (next_x, next_y)) for name, next_x, next_y
+                                 in maze_arrangement.get_open_neighbours(x, y))
+                    assert expected[steps[direction]] == expected[(x, y)] - 1
+                else:
+                    assert direction is None
+
+def test_field_is_recomputed_only_when_needed():
+    layout = src.labyrinthMaze.default_layout()
+    maze_arrangement = layout.new_maze_arrangement()
+    flow_field = src.labyrinthPathing.FlowField(maze_arrangement)
+    assert flow_field.get_distances() is None
+
+    assert flow_field.set_target(1, 1)
+    distances = flow_field.get_distances()
+    for tick in range(10):
+        assert not flow_field.set_target(1, 1)
+    assert flow_field.get_recompute_count() == 1
+    assert flow_field.get_distances() is distances
+
+    assert flow_field.set_target(1, 2)
+    assert flow_field.get_recompute_count() == 2
+    assert flow_field.set_target(1, 1)
+    assert flow_field.get_recompute_count() == 3
+
+    # Opening the gates is only seen once the walls are invalidated
+    minotaur_x, minotaur_y = layout.get_minotaur_spawn()
+    assert flow_field.get_distance(minotaur_x, minotaur_y) is None
+    maze_arrangement.open_gates()
+    assert not flow_field.set_target(1, 1)
+    assert flow_field.get_distance(minotaur_x, minotaur_y) is None
+
+    flow_field.invalidate()
+    assert flow_field.set_target(1, 1)
+    assert flow_field.get_recompute_count() == 4
+    expected = find_distances(maze_arrangement, (1, 1))
+    assert flow_field.get_distance(minotaur_x, minotaur_y) == expected[(minotaur_x, minotaur_y)]
@@ -0,0 +1,124 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the tests of the labyrinthProfiler module's
+             FrameProfiler: it must add up the time of each phase of a frame, keep the
+             newest frames in its ring buffer, report their percentiles, write them to
+             a CSV file, and not time anything while it is off. The clock is replaced by
+             one that only moves when told to, so every time is known. Run it from the
+             root of the repository:
+                 python -m pytest tests
+
+             It imports the CSV and OS modules, the Pygame module and the
+             labyrinthProfiler module.
+"""
+
+import csv, os
+import pygame, src.labyrinthProfiler
+
+class FakeClock(object):
+    """This class represents a clock that only moves forward when told to."""
+    def __init__(self):
+        """This method instantiates the FakeClock class at 0 nanoseconds."""
+        self.now = 0
+        self.reads = 0
+
+    def perf_counter_ns(self):
+        """This accessor method returns the time of the clock, in nanoseconds."""
+        self.reads += 1
+        return self.now
+
+    def advance(self, milliseconds):
+        """This mutator method moves the clock forward by milliseconds."""
+        self.now += int(milliseconds * 1000000)
+
+def make_profiler(monkeypatch, **settings):
+    """This function returns a FakeClock and a FrameProfiler timed with it."""
+    clock = FakeClock()
+    monkeypatch.setattr(src.labyrinthProfiler.time, "perf_counter_ns", clock.perf_counter_ns)
+    return clock, src.labyrinthProfiler.FrameProfiler(**settings)
+
+def play_frame(profiler, clock, phases):
+    """This function times one frame made of phases, a list of (phase, milliseconds)
+    tuples in the order they run."""
+    profiler.begin_frame()
+    for phase, milliseconds in phases:
+        clock.advance(milliseconds)
+        profiler.mark(phase)
+    profiler.end_frame()
+
+def test_phases_add_up_within_a_frame(monkeypatch):
+    clock, profiler = make_profiler(monkeypatch, enabled=True, phases=("events", "draw"))
+    play_frame(profiler, clock, [("tick", 2), ("events", 1), ("tick", 3), ("draw", 4)])
+    assert profiler.get_frames() == [(10000000, {"tick": 5000000, "events": 1000000, "draw": 4000000})]
+
+    # The phases that were named come first, then the others in the order first marked
+    stats = profiler.get_stats()
+    assert list(stats["phases"]) == ["events", "draw", "tick"]
+    assert stats["last"] == stats["p50"] == stats["p99"] == 10
+
+def test_ring_buffer_keeps_the_newest_frames(monkeypatch):
+    clock, profiler = make_profiler(monkeypatch, enabled=True, capacity=5)
+    for frame in range(1, 13):
+        play_frame(profiler, clock, [("draw", frame)])
+    assert [total // 1000000 for total, phases in profiler.get_frames()] == [8, 9, 10, 11, 12]
+
+    stats = profiler.get_stats()
+    assert (stats["p50"], stats["p99"], stats["last"]) == (10, 12, 12)
+    assert stats["phases"] == {"draw": 10}
+
+def test_disabled_profiler_does_not_read_the_clock(monkeypatch):
+    clock, profiler = make_profiler(monkeypatch, enabled=False)
+    for frame in range(3):
+        play_frame(profiler, clock, [("draw", 1)])
+    assert clock.reads == 0
+    assert profiler.get_frames() == []
+    assert profiler.get_stats() is None
+    assert profiler.write_csv() is None
+
+    # Switching it on in the middle of a frame only times the frames after it
+    profiler.begin_frame()
+    profiler.toggle()
+    profiler.mark("draw")
+    profiler.end_frame()
+    assert profiler.get_frames() == []
+    play_frame(profiler, clock, [("draw", 1)])
+    assert len(profiler.get_frames()) == 1
+
+    # Switching it off drops the frame in progress
+    profiler.begin_frame()
+    profiler.toggle()
+    profiler.mark("draw")
+    profiler.end_frame()
+    assert len(profiler.get_frames()) == 1
+
+def test_write_csv(monkeypatch, tmp_path):
+    path = str(tmp_path / "profile.csv")
+    clock, profiler = make_profiler(monkeypatch, enabled=True, csv_path=path)
+    play_frame(profiler, clock, [("events", 0.5), ("draw", 2)])
+    play_frame(profiler, clock, [("draw", 3)])
+    assert profiler.write_csv() == path
+
+    with open(path, newline="") as source:
+        rows = list(csv.reader(source))
+    assert rows == [["frame", "total_us", "events_us", "draw_us"],
+                    ["0", "2500", "500", "2000"],
+                    ["1", "3000", "0", "3000"]]
+
+def test_overlay_is_drawn_only_when_shown(monkeypatch):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    screen = pygame.Surface((400, 300))
+
+    clock, profiler = make_profiler(monkeypatch, enabled=True, overlay=True)
+    assert profiler.draw(screen) is None
+    play_frame(profiler, clock, [("events", 1), ("draw", 2)])
+    overlay_rect = profiler.draw(screen)
+    assert overlay_rect.topleft == src.labyrinthProfiler.OVERLAY_POSITION
+    assert screen.get_at(overlay_rect.topleft)[:3] == src.labyrinthProfiler.OVERLAY_COLOUR
+
+    clock, profiler = make_profiler(monkeypatch, enabled=True, overlay=False)
+    play_frame(profiler, clock, [("draw", 2)])
+    assert profiler.draw(screen) is None
@@ -0,0 +1,275 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the tests of the labyrinthRender module: the
+             WallLayer must draw a stone on every wall tile and the background on
+             every other tile, and patch the background over the gates once they are
+             opened. The Camera must stay within the maze, and the chunks of the
+             WallLayer must only be rendered when they come into view, stay within
+             the memory cap of their cache, and look the same when rendered again
+             after being evicted. The DirtyTracker must push only the regions that
+             changed, each pixel once, and the whole screen when asked to. The
+             HUDLayer must only be composited again when one of its widgets shows a new
+             value, and look like its widgets drawn one by one. Run it from the root
+             of the repository:
+                 python -m pytest tests
+
+             It imports the OS module, the Pygame module and the labyrinthMaze,
+             labyrinthRender and labyrinthSprites modules.
+"""
+
+import os
+import pygame, src.labyrinthMaze, src.labyrinthRender, src.labyrinthSprites
+
+# The size of a tile of the tests, in pixels
+TILE_SIZE = 50
+
+def start_pygame():
+    """This function initializes the display and the fonts of Pygame without a
+    window."""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode((64, 64))
+
+def make_background():
+    """This function returns a background whose size is not a multiple of a tile,
+    with a different colour on every pixel of it, so that a tile drawn from the wrong
+    part of it is noticed."""
+    background = pygame.Surface((120, 90)).convert()
+    for x in range(120):
+        for y in range(90):
+            background.set_at((x, y), (x * 2, y * 2, (x + y) % 256))
+    return background
+
+def tile_background(background, size):
+    """This function returns a surface of size covered by copies of background."""
+    surface = pygame.Surface(size).convert()
+    for x in range(0, size[0], background.get_width()):
+        for y in range(0, size[1], background.get_height()):
+            surface.blit(background, (x, y))
+    return surface
+
+def get_pixels(surface, rect):
+    """This function returns the bytes of the pixels of surface within rect."""
+    return pygame.image.tostring(surface.subsurface(rect), "RGB")
+
+def draw_layer(wall_layer):
+    """This function returns a surface with the whole of wall_layer drawn on it."""
+    surface = pygame.Surface(wall_layer.get_size()).convert()
+    wall_layer.draw(surface)
+    return surface
+
+def test_wall_layer_draws_stones_on_walls_only():
+    start_pygame()
+    background = make_background()
+    maze_arrangement = src.labyrinthMaze.default_layout().new_maze_arrangement()
+    wall_layer = src.labyrinthRender.WallLayer(maze_arrangement, background, TILE_SIZE, seed=7)
+    drawn = draw_layer(wall_layer)
+    expected = tile_background(background, wall_layer.get_size())
+
+    columns, rows = maze_arrangement.get_size()
+    for x in range(columns):
+        for y in range(rows):
+            rect = wall_layer.get_cell_rect(x, y)
+            if not maze_arrangement.is_wall(x, y):
+                assert get_pixels(drawn, rect) == get_pixels(expected, rect), (x, y)
+                continue
+
+            # A wall tile is one of the stones over the background behind it
+            stones = []
+            for stone_type in range(3):
+                tile = pygame.Surface(rect.size).convert()
+                tile.blit(expected, (0, 0), rect)
+                tile.blit(src.labyrinthSprites.load_stone_image(stone_type), (0, 0))
+                stones.append(get_pixels(tile, tile.get_rect()))
+            assert get_pixels(drawn, rect) in stones, (x, y)
+
+def test_open_cell_patches_the_background_over_a_gate():
+    start_pygame()
+    background = make_background()
+    maze_arrangement = src.labyrinthMaze.default_layout().new_maze_arrangement()
+    wall_layer = src.labyrinthRender.WallLayer(maze_arrangement, background, TILE_SIZE, seed=7)
+    before = draw_layer(wall_layer)
+    expected = tile_background(background, wall_layer.get_size())
+
+    maze_arrangement.open_gates()
+    changed_rects = [wall_layer.open_cell(x, y) for x, y in src.labyrinthMaze.GATE_CELLS]
+    after = draw_layer(wall_layer)
+
+    for (x, y), rect in zip(src.labyrinthMaze.GATE_CELLS, changed_rects):
+        assert rect == wall_layer.get_cell_rect(x, y)
+        assert get_pixels(before, rect) != get_pixels(expected, rect)
+        assert get_pixels(after, rect) == get_pixels(expected, rect)
+
+    # Every other tile is left as it was
+    columns, rows = maze_arrangement.get_size()
+    for x in range(columns):
+        for y in range(rows):
+            if (x, y) not in src.labyrinthMaze.GATE_CELLS:
+                rect = wall_layer.get_cell_rect(x, y)
+                assert get_pixels(after, rect) == get_pixels(before, rect), (x, y)
+
+def test_camera_stays_within_the_maze():
+    camera = src.labyrinthRender.Camera((800, 600), (2000, 1500))
+    assert camera.get_offset() == (0, 0)
+
+    assert camera.follow((1000, 700))
+    assert camera.get_offset() == (600, 400)
+    assert not camera.follow((1000, 700))
+    assert camera.to_screen((650, 450, 50, 50)) == pygame.Rect(50, 50, 50, 50)
+
+    # The view stops at the edges of the maze
+    assert camera.follow((1990, 1490))
+    assert camera.get_view_rect() == pygame.Rect(1200, 900, 800, 600)
+    assert camera.follow((-50, 10))
+    assert camera.get_offset() == (0, 0)
+
+    # A maze smaller than the window is shown from its top-left corner
+    camera = src.labyrinthRender.Camera((800, 600), (400, 300))
+    assert not camera.follow((390, 290))
+    assert camera.get_offset() == (0, 0)
+
+def test_chunks_are_rendered_only_when_seen():
+    start_pygame()
+    maze_arrangement = src.labyrinthMaze.generate_layout(40, 1).new_maze_arrangement()
+    chunk_size = src.labyrinthRender.CHUNK_TILES * TILE_SIZE
+    wall_layer = src.labyrinthRender.WallLayer(maze_arrangement, make_background(), TILE_SIZE, seed=3)
+    assert wall_layer.get_size() == (2000, 2000)
+    screen = pygame.Surface((chunk_size, chunk_size)).convert()
+
+    # A view aligned with a chunk draws that chunk alone, and one across the corner
+    # of four chunks draws those four
+    wall_layer.draw(screen, (chunk_size, chunk_size))
+    assert wall_layer.get_cache_stats()["misses"] == 1
+    wall_layer.draw(screen, (chunk_size // 2, chunk_size // 2))
+    stats = wall_layer.get_cache_stats()
+    assert (stats["misses"], stats["hits"], stats["chunks"]) == (4, 1, 4)
+
+    # Drawing the same view again renders nothing
+    wall_layer.draw(screen, (chunk_size // 2, chunk_size // 2))
+    assert wall_layer.get_cache_stats()["misses"] == 4
+
+    # Only the visible part of the chunks is drawn, however small
+    wall_layer.draw_area(screen, (0, 0, 1, 1), (chunk_size * 4, 0))
+    assert wall_layer.get_cache_stats()["chunks"] == 5
+
+def test_chunk_cache_stays_within_its_cap():
+    start_pygame()
+    maze_arrangement = src.labyrinthMaze.generate_layout(40, 1).new_maze_arrangement()
+    chunk_size = src.labyrinthRender.CHUNK_TILES * TILE_SIZE
+    cache_bytes = 3 * chunk_size * chunk_size * 4
+    background = make_background()
+    wall_layer = src.labyrinthRender.WallLayer(maze_arrangement, background, TILE_SIZE,
+                                               cache_bytes=cache_bytes, seed=3)
+    uncapped_layer = src.labyrinthRender.WallLayer(maze_arrangement, background, TILE_SIZE, seed=3)
+    expected = draw_layer(uncapped_layer)
+
+    # Sweeps a camera the size of a chunk over the whole maze, twice
+    screen = pygame.Surface((chunk_size, chunk_size)).convert()
+    width, height = wall_layer.get_size()
+    for sweep in range(2):
+        for x in range(0, width, chunk_size):
+            for y in range(0, height, chunk_size):
+                wall_layer.draw(screen, (x, y))
+                assert wall_layer.get_cache_stats()["bytes"] <= cache_bytes
+
+                # A chunk rendered again after it was evicted looks the same
+                view_rect = pygame.Rect((x, y), screen.get_size()).clip(expected.get_rect())
+                assert get_pixels(screen, (0, 0) + view_rect.size) == get_pixels(expected, view_rect)
+
+    stats = wall_layer.get_cache_stats()
+    assert stats["chunks"] <= 3
+    assert stats["misses"] == 2 * 25
+    assert stats["evictions"] == stats["misses"] - stats["chunks"]
+
+def test_dirty_tracker_pushes_only_the_changed_regions():
+    start_pygame()
+    screen = pygame.display.get_surface()
+    width, height = screen.get_size()
+    dirty_tracker = src.labyrinthRender.DirtyTracker(screen)
+
+    # The first frame pushes the whole screen, and a frame without changes nothing
+    assert dirty_tracker.present() == width * height
+    assert dirty_tracker.present() == 0
+
+    # Overlapping rects are pushed as their union, and rects off the screen are clipped
+    dirty_tracker.add_rects([(0, 0, 10, 10), (5, 5, 10, 10), (width - 4, height - 4, 10, 10)])
+    assert dirty_tracker.present() == 15 * 15 + 4 * 4
+    assert dirty_tracker.present() == 0
+
+    dirty_tracker.add((10, 10, 0, 20))
+    assert dirty_tracker.present() == 0
+
+    dirty_tracker.add((0, 0, 8, 8))
+    dirty_tracker.invalidate()
+    assert dirty_tracker.present() == width * height
+    assert dirty_tracker.get_average_pixels_pushed() == (2 * width * height + 15 * 15 + 4 * 4) / 6
+
+def test_disabled_dirty_tracker_flips_every_frame():
+    start_pygame()
+    screen = pygame.display.get_surface()
+    dirty_tracker = src.labyrinthRender.DirtyTracker(screen, enabled=False)
+    for frame in range(3):
+        assert dirty_tracker.present() == screen.get_width() * screen.get_height()
+
+def make_hud():
+    """This function returns the widgets of the game's HUD, and the HUDLayer of them."""
+    gear_tracker = src.labyrinthSprites.GearTracker()
+    health_keeper = src.labyrinthSprites.HealthKeeper(pygame.display.get_surface())
+    countdown = src.labyrinthSprites.Countdown()
+    widgets = [gear_tracker, health_keeper, countdown]
+    return widgets, src.labyrinthRender.HUDLayer(widgets)
+
+def test_hud_is_composited_only_when_a_value_changes():
+    start_pygame()
+    screen = pygame.Surface((800, 600))
+    (gear_tracker, health_keeper, countdown), hud = make_hud()
+    assert hud.draw(screen) == []
+
+    hud.update()
+    rect = hud.get_rect()
+    assert hud.get_builds() == 1
+    assert rect in hud.draw(screen)
+    images = [widget.image for widget in (gear_tracker, health_keeper, countdown)]
+
+    # Frames without a new value neither render the widgets again nor composite them
+    for frame in range(10):
+        countdown.decrease_time(countdown.get_time())
+        hud.update()
+        assert hud.draw(screen) == []
+    assert hud.get_builds() == 1
+    assert [widget.image for widget in (gear_tracker, health_keeper, countdown)] == images
+
+    # Each new value composites the layer once, and pushes where it was and is now
+    for change in (lambda: countdown.decrease_time(14), gear_tracker.add_gear_piece, health_keeper.lose_life):
+        builds = hud.get_builds()
+        change()
+        hud.update()
+        hud.update()
+        assert hud.get_builds() == builds + 1
+        assert hud.draw(screen) == [rect, hud.get_rect()]
+        rect = hud.get_rect()
+
+def test_hud_looks_like_its_widgets():
+    start_pygame()
+    widgets, hud = make_hud()
+    widgets[0].add_gear_piece()
+    widgets[1].lose_life()
+    hud.update()
+
+    composited = pygame.Surface((800, 600))
+    composited.fill((40, 60, 80))
+    separate = composited.copy()
+    hud.draw(composited)
+    for widget in widgets:
+        separate.blit(widget.image, widget.rect)
+
+    # The run-length encoded layer may round the blending of an edge by one step
+    rect = hud.get_rect().clip(composited.get_rect())
+    for x in range(rect.left, rect.right):
+        for y in range(rect.top, rect.bottom):
+            colour, expected = composited.get_at((x, y)), separate.get_at((x, y))
+            assert all(abs(colour[channel] - expected[channel]) <= 1 for channel in range(3)), (x, y)
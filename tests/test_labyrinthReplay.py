@@ -0,0 +1,146 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the tests of the labyrinthReplay module: a game
+             recorded, saved and loaded again must play back to the same game, from
+             its start or from any tick it is sought to. Run it from the root of the
+             repository:
+                 python -m pytest tests
+
+             It imports the JSON and Random modules, and the labyrinthReplay,
+             labyrinthSim and labyrinthMaze modules.
+"""
+
+import json, random
+import src.labyrinthReplay, src.labyrinthSim, src.labyrinthMaze
+
+# The settings of the recorded games, with enough lives for the Player to survive them
+SETTINGS = {"grace_period": 1, "movement_delay": 0, "flicker_chance": 20, "lives": 1000}
+
+def get_state(sim):
+    """This function returns the state of sim as it is stored in a keyframe."""
+    return json.loads(json.dumps(sim.get_state()))
+
+def record_game(replay, num_ticks, seed=0):
+    """This function records num_ticks ticks of the Player holding random keys for a
+    few ticks at a time, and returns the LabyrinthSim of the recorded game."""
+    rng = random.Random(seed)
+    sim = replay.new_sim()
+    actions = set()
+    for tick in range(num_ticks):
+        if tick % 7 == 0:
+            actions = {rng.choice(src.labyrinthSim.MOVE_ORDER)}
+            if rng.random() < 0.2:
+                actions.add("LIGHT")
+        replay.record(actions, sim)
+        sim.step(actions)
+    return sim
+
+def save_and_load(replay, tmp_path):
+    path = str(tmp_path / "game.replay")
+    replay.save(path)
+    return src.labyrinthReplay.load(path)
+
+def test_saved_replay_plays_back_the_recorded_game(tmp_path):
+    replay = src.labyrinthReplay.Replay(11, settings=SETTINGS)
+    sim = record_game(replay, 1000)
+    loaded = save_and_load(replay, tmp_path)
+
+    assert loaded.get_num_ticks() == 1000
+    assert loaded.get_settings() == replay.get_settings()
+    assert loaded.get_keyframe_ticks() == [0, 300, 600, 900]
+    assert [loaded.get_actions(tick) for tick in range(1000)] == [replay.get_actions(tick) for tick in range(1000)]
+
+    stats = loaded.play_headless()
+    assert stats["ticks"] == 1000
+    assert stats["result"] == sim.get_result()
+    assert get_state(loaded.seek(1000)) == get_state(sim)
+
+def test_generated_maze_and_horde_are_replayed(tmp_path):
+    settings = dict(SETTINGS, horde_size=6)
+    replay = src.labyrinthReplay.Replay(5, maze_size=21, settings=settings)
+    sim = record_game(replay, 700, seed=5)
+    loaded = save_and_load(replay, tmp_path)
+    loaded.play_headless()
+    assert get_state(loaded.seek(700)) == get_state(sim)
+
+def test_seek_matches_playing_from_the_start():
+    replay = src.labyrinthReplay.Replay(3, settings=SETTINGS)
+    record_game(replay, 800, seed=3)
+    for tick in (0, 1, 299, 300, 301, 650, 800):
+        sim = replay.new_sim()
+        for played_tick in range(tick):
+            sim.step(replay.get_actions(played_tick))
+        assert get_state(replay.seek(tick)) == get_state(sim), tick
+
+def test_play_headless_from_a_sought_tick():
+    replay = src.labyrinthReplay.Replay(8, settings=SETTINGS)
+    sim = record_game(replay, 500, seed=8)
+    stats = replay.play_headless(start_tick=420)
+    assert stats["ticks"] == 80
+    assert stats["result"] == sim.get_result()
+
+def test_seek_past_the_end_is_rejected(tmp_path):
+    replay = src.labyrinthReplay.Replay(2, settings=SETTINGS)
+    record_game(replay, 27)
+    for tick in (28, 100, -1):
+        try:
+            replay.seek(tick)
+        except src.labyrinthReplay.ReplayError:
+            continue
+        assert False, "sought to tick %d of 27" % tick
+
+    path = str(tmp_path / "short.replay")
+    replay.save(path)
+    assert src.labyrinthReplay.main(["play", path, "--headless", "--seek", "100"]) == 2
+    assert src.labyrinthReplay.main(["play", path, "--headless", "--seek", "27"]) == 0
+
+def test_other_files_are_not_loaded(tmp_path):
+    path = tmp_path / "other.replay"
+    path.write_bytes(b"not a replay at all")
+    try:
+        src.labyrinthReplay.load(str(path))
+    except src.labyrinthReplay.ReplayError:
+        return
+    assert False, "a file that is not a replay was loaded"
+
+def test_games_are_only_recorded_on_request(monkeypatch):
+    monkeypatch.delenv(src.labyrinthReplay.REPLAY_VARIABLE, raising=False)
+    assert src.labyrinthReplay.get_replay_path() is None
+    monkeypatch.setenv(src.labyrinthReplay.REPLAY_VARIABLE, "")
+    assert src.labyrinthReplay.get_replay_path() is None
+    monkeypatch.setenv(src.labyrinthReplay.REPLAY_VARIABLE, "game.replay")
+    assert src.labyrinthReplay.get_replay_path() == "game.replay"
+
+def test_keyframes_restore_the_maze_without_storing_it():
+    # The gates open after a second, and the Player collects some of the gear
+    layout = src.labyrinthMaze.generate_layout(13, 4)
+    sim = src.labyrinthSim.LabyrinthSim(4, layout=layout, **SETTINGS)
+    rng = random.Random(4)
+    for tick in range(3000):
+        sim.step({rng.choice(src.labyrinthSim.MOVE_ORDER)})
+    state = get_state(sim)
+    assert "maze" not in state
+    assert sim.get_state()["gates_open"]
+
+    restored = src.labyrinthSim.LabyrinthSim(4, layout=layout, **SETTINGS)
+    restored.load_state(state)
+    assert restored.get_maze_arrangement().get_buffer() == sim.get_maze_arrangement().get_buffer()
+    assert get_state(restored) == state
+
+def test_replays_of_version_2_are_read(tmp_path):
+    # A replay of version 2 has the same header, and keyframes that also hold the maze
+    replay = src.labyrinthReplay.Replay(6, settings=SETTINGS)
+    sim = record_game(replay, 400, seed=6)
+    inputs = bytearray(src.labyrinthReplay.encode_actions(replay.get_actions(tick)) for tick in range(400))
+    keyframes = {tick: dict(get_state(replay.seek(tick)), maze="00") for tick in replay.get_keyframe_ticks()}
+    path = tmp_path / "old.replay"
+    src.labyrinthReplay.Replay(6, settings=replay.get_settings(), inputs=inputs, keyframes=keyframes).save(str(path))
+    data = bytearray(path.read_bytes())
+    data[len(src.labyrinthReplay.MAGIC)] = 2
+    path.write_bytes(bytes(data))
+
+    loaded = src.labyrinthReplay.load(str(path))
+    assert loaded.play_headless()["ticks"] == 400
+    assert get_state(loaded.seek(400)) == get_state(sim)
@@ -0,0 +1,47 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the tests of the labyrinthSim module's Horde: its
+             Minotaurs must spawn far enough from the Player to be escaped, and catch
+             the Player no sooner than they can walk there. Run it from the root of the
+             repository:
+                 python -m pytest tests
+
+             It imports the labyrinthSim, labyrinthMaze and labyrinthPathing modules.
+"""
+
+import src.labyrinthSim, src.labyrinthMaze, src.labyrinthPathing
+
+def get_spawn_distances(layout):
+    """This function returns the walking distance of every tile of layout to the
+    Player's spawn, once the gates are open, indexed by x*rows + y."""
+    maze_arrangement = layout.new_maze_arrangement()
+    maze_arrangement.open_gates()
+    flow_field = src.labyrinthPathing.FlowField(maze_arrangement)
+    flow_field.set_target(*layout.get_player_spawn())
+    return flow_field.get_distances()
+
+def test_horde_spawns_away_from_the_player():
+    for size, horde_size in ((16, 20), (25, 60), (40, 200)):
+        for seed in range(10):
+            layout = src.labyrinthMaze.generate_layout(size, seed)
+            distances = get_spawn_distances(layout)
+            rows = layout.get_size()[1]
+            horde = src.labyrinthSim.LabyrinthSim(seed, layout=layout, horde_size=horde_size).get_horde()
+            for number in range(horde_size):
+                x, y = horde.get_tile_position(number)
+                assert distances[x*rows + y] >= src.labyrinthMaze.MIN_SPAWN_DISTANCE, (size, seed, number)
+
+def test_horde_does_not_catch_the_player_at_once():
+    # With no grace period and the Player standing still, a Minotaur of the horde must
+    # walk at least MIN_SPAWN_DISTANCE tiles, and catches the Player as it starts on
+    # the last of them
+    ticks = (src.labyrinthMaze.MIN_SPAWN_DISTANCE - 1) * src.labyrinthSim.MOVE_TICKS
+    for seed in range(20):
+        sim = src.labyrinthSim.LabyrinthSim(seed, layout=src.labyrinthMaze.generate_layout(16, seed),
+                                            grace_period=0, horde_size=30)
+        lives = sim.get_lives()
+        for tick in range(ticks):
+            sim.step()
+        assert sim.get_lives() == lives, seed
@@ -0,0 +1,73 @@
+"""
+Name: proxlu
+Date: Oct 30, 2024
+
+Description: This module contains the tests of the labyrinthVecEnv module: every game
+             of a VecLabyrinthEnv must play out like a LabyrinthSim given the same
+             inputs, tick for tick, down to the tick on which a life is lost. Run it
+             from the root of the repository:
+                 python -m pytest tests
+
+             It imports the Random module, the Pytest module, and the labyrinthMaze,
+             labyrinthSim and labyrinthVecEnv modules, which are skipped if NumPy is
+             not installed.
+"""
+
+import random
+import pytest
+import src.labyrinthMaze, src.labyrinthSim
+
+pytest.importorskip("numpy")
+import src.labyrinthVecEnv
+
+# The inputs of LabyrinthSim.step() matching each arrow bit of VecLabyrinthEnv.step()
+ARROWS = (("DOWN", src.labyrinthVecEnv.ACTION_DOWN), ("UP", src.labyrinthVecEnv.ACTION_UP),
+          ("RIGHT", src.labyrinthVecEnv.ACTION_RIGHT), ("LEFT", src.labyrinthVecEnv.ACTION_LEFT))
+
+# The results of VecLabyrinthEnv matching those of LabyrinthSim
+RESULTS = {src.labyrinthVecEnv.RUNNING: None, src.labyrinthVecEnv.WIN: "win",
+           src.labyrinthVecEnv.LOSE: "lose"}
+
+def get_random_inputs(rng):
+    """This function returns a random set of held arrow keys, often none."""
+    return set(direction for direction, bit in ARROWS if rng.random() < 0.2)
+
+def play_lockstep(layout, num_games, num_ticks, seed):
+    """This function plays num_games games of the VecLabyrinthEnv and as many
+    LabyrinthSims on layout with the same random inputs, checking that their states
+    match on every tick. It returns the list of the ticks on which the Player of each
+    game lost a life."""
+    settings = {"grace_period": 1, "movement_delay": 5, "flicker_chance": 1000000, "lives": 3}
+    env = src.labyrinthVecEnv.VecLabyrinthEnv(num_games, seed=seed, layout=layout, auto_reset=False,
+                                              **settings)
+    sims = [src.labyrinthSim.LabyrinthSim(seed + number, layout=layout, **settings)
+            for number in range(num_games)]
+    rng = random.Random(seed)
+    death_ticks = [[] for sim in sims]
+
+    for tick in range(num_ticks):
+        inputs = [get_random_inputs(rng) for sim in sims]
+        actions = [sum(bit for direction, bit in ARROWS if direction in held) for held in inputs]
+        observations, rewards, dones = env.step(actions)
+
+        for number, sim in enumerate(sims):
+            for event, detail in sim.step(inputs[number]):
+                if event == "player_death":
+                    death_ticks[number].append(sim.get_tick())
+            state = (tuple(observations["player"][number]), tuple(observations["minotaur"][number]),
+                     int(observations["lives"][number]), int(observations["tick"][number]),
+                     int(observations["countdown"][number]), RESULTS[int(observations["result"][number])])
+            expected = (sim.get_player().get_tile_position(), sim.get_minotaur().get_tile_position(),
+                        sim.get_lives(), sim.get_tick(), sim.get_countdown(), sim.get_result())
+            assert state == expected, (number, tick)
+    return death_ticks
+
+def test_games_match_the_sim():
+    death_ticks = play_lockstep(src.labyrinthMaze.default_layout(), 8, 900, 11)
+
+    # Every game is lost, so the ticks of every life lost and the results were compared
+    assert all(len(ticks) == 3 for ticks in death_ticks)
+
+def test_games_on_a_generated_maze_match_the_sim():
+    death_ticks = play_lockstep(src.labyrinthMaze.generate_layout(21, 5), 8, 900, 23)
+    assert any(death_ticks)